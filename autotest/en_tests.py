@@ -99,6 +99,184 @@ def par_gauss_draw_consistency_test():
         d = (pe - pe_org).apply(np.abs)
         assert d.max().max() < 1.0e-10,d.max().sort_values(ascending=False)
 
+def chunked_gauss_draw_test():
+    pst = pyemu.Pst(os.path.join("pst","pest.pst"))
+    pst.parameter_data.loc[pst.par_names[3::2],"partrans"] = "fixed"
+    pst.parameter_data.loc[pst.par_names[0],"pargp"] = "test"
+    x = np.random.RandomState(0).randn(pst.npar, pst.npar)
+    cov = pyemu.Cov(x=np.dot(x, x.T) / pst.npar + np.eye(pst.npar) * 0.01, names=pst.par_names)
+    dcov = pyemu.Cov.from_parameter_data(pst)
+    for kwargs in [{}, {"cov": dcov}, {"cov": cov}, {"cov": cov, "by_groups": False},
+                   {"cov": cov, "by_groups": False, "factor": "svd"},
+                   {"cov": cov, "fill": False}]:
+        np.random.seed(2)
+        pe1 = pyemu.ParameterEnsemble.from_gaussian_draw(pst, num_reals=23, **kwargs)
+        np.random.seed(2)
+        pe2 = pyemu.ParameterEnsemble.from_gaussian_draw(pst, num_reals=23, chunk=5, **kwargs)
+        assert pe1.shape == pe2.shape
+        assert np.allclose(pe1.values, pe2.values)
+
+    oe1 = pyemu.ObservationEnsemble.from_gaussian_draw(pst, num_reals=23)
+    oe2 = pyemu.ObservationEnsemble.from_gaussian_draw(pst, num_reals=23, chunk=4)
+    assert oe1.shape == oe2.shape
+
+    # the draws still have the right covariance
+    pe = pyemu.ParameterEnsemble.from_gaussian_draw(pst, cov=cov, num_reals=20000,
+                                                    by_groups=False, chunk=3000)
+    pe.transform()
+    emp = np.cov(pe.loc[:, pst.adj_par_names].values, rowvar=False)
+    assert np.abs(emp - cov.get(pst.adj_par_names).x).max() < 0.15
+
+
+def factor_cache_draw_test():
+    from pyemu.en import Ensemble
+    pst = pyemu.Pst(os.path.join("pst","pest.pst"))
+    x = np.random.RandomState(0).randn(pst.npar, pst.npar)
+    cov = pyemu.Cov(x=np.dot(x, x.T) / pst.npar + np.eye(pst.npar) * 0.01, names=pst.par_names)
+    for factor in ["cholesky", "lowrank"]:
+        pe = pyemu.ParameterEnsemble.from_gaussian_draw(pst, cov=cov, num_reals=20000,
+                                                        by_groups=False, factor=factor)
+        pe.transform()
+        emp = np.cov(pe.loc[:, pst.adj_par_names].values, rowvar=False)
+        assert np.abs(emp - cov.get(pst.adj_par_names).x).max() < 0.15
+        # the factor is memoized on cov and reused
+        assert (factor, None) in cov._factor_cache()
+        np.random.seed(2)
+        pe1 = pyemu.ParameterEnsemble.from_gaussian_draw(pst, cov=cov, num_reals=10,
+                                                         by_groups=False, factor=factor)
+        np.random.seed(2)
+        pe2 = pyemu.ParameterEnsemble.from_gaussian_draw(pst, cov=cov, num_reals=10,
+                                                         by_groups=False, factor=factor)
+        assert np.allclose(pe1.values, pe2.values)
+
+    # changing the values of cov drops the memoized factors
+    cov.x[:, :] *= 2.0
+    assert len(cov._factor_cache()) == 0
+
+    # a smooth, large cov is truncated by the low rank factor but the
+    # variances are preserved by the residual
+    n = 1000
+    xy = np.linspace(0, 100, n)
+    names = ["p{0}".format(i) for i in range(n)]
+    cov = pyemu.Cov(x=np.exp(-np.abs(xy[:, None] - xy[None, :]) / 30.0), names=names)
+    proj, std = Ensemble._get_lowrank_projection_matrix(cov.x)
+    assert proj.shape[1] < n
+    assert np.allclose((proj ** 2).sum(axis=1) + std ** 2, 1.0)
+    mean_values = pd.Series(np.zeros(n), index=names)
+    df = Ensemble._gaussian_draw(cov, mean_values, 5000, factor="lowrank")
+    emp = np.cov(df.values, rowvar=False)
+    assert np.abs(np.diag(emp) - 1.0).max() < 0.15
+    assert np.abs(emp - cov.x).max() < 0.15
+
+
+def parallel_group_draw_test():
+    pst = pyemu.Pst(os.path.join("pst","pest.pst"))
+    par = pst.parameter_data
+    par.loc[pst.par_names[:-1], "pargp"] = ["p{0}".format(i % 4) for i in range(pst.npar - 1)]
+    x = np.random.RandomState(0).randn(pst.npar, pst.npar)
+    cov = pyemu.Cov(x=np.dot(x, x.T) / pst.npar + np.eye(pst.npar) * 0.01, names=pst.par_names)
+    pes = []
+    for num_workers in [None, 1, 3]:
+        np.random.seed(2)
+        pes.append(pyemu.ParameterEnsemble.from_gaussian_draw(pst, cov=cov, num_reals=13,
+                                                              num_workers=num_workers, chunk=5))
+    for pe in pes[1:]:
+        assert np.allclose(pes[0].values, pe.values)
+    np.random.seed(3)
+    pe = pyemu.ParameterEnsemble.from_gaussian_draw(pst, cov=cov, num_reals=13, num_workers=3)
+    assert not np.allclose(pes[0].values, pe.values)
+
+    # a bad group cov is saved and reported
+    cov.x[1, 1] = np.NaN
+    try:
+        pyemu.ParameterEnsemble.from_gaussian_draw(pst, cov=cov, num_reals=13, num_workers=3)
+    except Exception as e:
+        assert "p1" in str(e)
+    else:
+        raise Exception("should have failed")
+    assert os.path.exists("trouble_p1.cov")
+    os.remove("trouble_p1.cov")
+
+    # an indefinite group cov fails the factorization check
+    names = pst.par_names[:3]
+    par.loc[:, "pargp"] = "other"
+    par.loc[names, "pargp"] = "g"
+    cov = pyemu.Cov.from_parameter_data(pst).to_2d()
+    cov.x[:3, :3] = np.array([[1.0, 2.0, 0.0], [2.0, 1.0, 0.0], [0.0, 0.0, 1.0]])
+    for factor in ["eigen", "cholesky"]:
+        try:
+            pyemu.ParameterEnsemble.from_gaussian_draw(pst, cov=cov, num_reals=13, factor=factor)
+        except Exception as e:
+            assert "'g'" in str(e)
+        else:
+            raise Exception("should have failed")
+        assert os.path.exists("trouble_g.cov")
+        os.remove("trouble_g.cov")
+
+    # but a nearly singular (gaussian variogram) group cov is fine
+    xx, yy = np.meshgrid(np.arange(10) * 100.0, np.arange(10) * 100.0)
+    names = ["p{0}".format(i) for i in range(100)]
+    gs = pyemu.geostats.GeoStruct(variograms=[pyemu.geostats.GauVario(1.0, 2000.0)])
+    cov = gs.covariance_matrix(xx.ravel(), yy.ravel(), names=names)
+    for factor in ["eigen", "cholesky"]:
+        df = pyemu.Ensemble._gaussian_draw(cov, pd.Series(0.0, index=names), 10,
+                                           grouper={"g": names}, factor=factor)
+        assert df.shape == (10, 100)
+        assert np.all(np.isfinite(df.values))
+        assert not os.path.exists("trouble_g.cov")
+
+
+def seeded_draw_test():
+    pst = pyemu.Pst(os.path.join("pst","pest.pst"))
+    par = pst.parameter_data
+    par.loc[pst.par_names[:-1], "pargp"] = ["p{0}".format(i % 4) for i in range(pst.npar - 1)]
+    x = np.random.RandomState(0).randn(pst.npar, pst.npar)
+    cov = pyemu.Cov(x=np.dot(x, x.T) / pst.npar + np.eye(pst.npar) * 0.01, names=pst.par_names)
+    dcov = pyemu.Cov.from_parameter_data(pst)
+    for kwargs in [{"cov": dcov}, {"cov": cov}, {"cov": cov, "by_groups": False}]:
+        pe1 = pyemu.ParameterEnsemble.from_gaussian_draw(pst, num_reals=11, seed=7, **kwargs)
+        # independent of chunking, workers, the global stream and the seed type
+        np.random.seed(99)
+        pe2 = pyemu.ParameterEnsemble.from_gaussian_draw(pst, num_reals=11, chunk=3, num_workers=2,
+                                                         seed=np.random.SeedSequence(7), **kwargs)
+        # the deviates are identical, the products only differ by blas rounding
+        assert np.allclose(pe1.values, pe2.values, rtol=1.0e-12, atol=0.0)
+        if kwargs["cov"].isdiagonal:
+            assert np.array_equal(pe1.values, pe2.values)
+        # each realization is its own stream
+        pe3 = pyemu.ParameterEnsemble.from_gaussian_draw(pst, num_reals=4, seed=7, **kwargs)
+        assert np.allclose(pe1.values[:4], pe3.values, rtol=1.0e-12, atol=0.0)
+        pe4 = pyemu.ParameterEnsemble.from_gaussian_draw(pst, num_reals=11, seed=8, **kwargs)
+        assert not np.allclose(pe1.values, pe4.values)
+
+    # the global stream is not used
+    np.random.seed(1)
+    pyemu.ParameterEnsemble.from_gaussian_draw(pst, cov=cov, num_reals=11, seed=7)
+    v1 = np.random.random()
+    np.random.seed(1)
+    assert np.random.random() == v1
+
+    for method in [pyemu.ParameterEnsemble.from_uniform_draw,
+                   pyemu.ParameterEnsemble.from_triangular_draw]:
+        pe1 = method(pst, num_reals=11, seed=np.random.default_rng(3))
+        pe2 = method(pst, num_reals=11, seed=np.random.default_rng(3))
+        assert np.array_equal(pe1.values, pe2.values)
+        pe3 = method(pst, num_reals=11, seed=4)
+        assert not np.allclose(pe1.values, pe3.values)
+        adj = pst.adj_par_names
+        assert (pe1.loc[:, adj].values >= par.loc[adj, "parlbnd"].values).all()
+        assert (pe1.loc[:, adj].values <= par.loc[adj, "parubnd"].values).all()
+
+    how = {p: h for p, h in zip(pst.adj_par_names, ["gaussian", "uniform", "triangular"] * pst.npar)}
+    pe1 = pyemu.ParameterEnsemble.from_mixed_draws(pst, how, num_reals=11, seed=5)
+    pe2 = pyemu.ParameterEnsemble.from_mixed_draws(pst, how, num_reals=11, seed=5)
+    assert np.array_equal(pe1.values, pe2.values)
+
+    oe1 = pyemu.ObservationEnsemble.from_gaussian_draw(pst, num_reals=11, seed=5)
+    oe2 = pyemu.ObservationEnsemble.from_gaussian_draw(pst, num_reals=11, seed=5, chunk=2)
+    assert np.array_equal(oe1.values, oe2.values)
+
+
 def obs_gauss_draw_consistency_test():
 
     pst = pyemu.Pst(os.path.join("pst","pest.pst"))
@@ -260,6 +438,43 @@ def enforce_test():
     pe.enforce(how="drop")
     assert pe.shape[0] == num_reals - 1
 
+def enforce_summary_test():
+    pst = pyemu.Pst(os.path.join("pst", "pest.pst"))
+    par = pst.parameter_data
+    pe = pyemu.ParameterEnsemble.from_gaussian_draw(pst, num_reals=20, seed=1)
+    pe._df.loc[:, :] = par.parval1.values
+    pe._df.loc[3, pst.par_names[5]] = par.loc[pst.par_names[5], "parubnd"] * 2.0
+    pe._df.loc[7, pst.par_names[9]] = par.loc[pst.par_names[9], "parlbnd"] * 0.5
+    pe_drop = pe.copy()
+    summary = pe_drop.enforce(how="drop")
+    assert summary.index.tolist() == [3, 7]
+    assert summary.loc[3, "num_ubnd"] == 1 and summary.loc[7, "num_lbnd"] == 1
+    assert pe_drop.shape[0] == 18
+
+    pe.transform()
+    summary = pe.enforce(how="scale")
+    assert pe.istransformed
+    assert summary.index.tolist() == [3, 7]
+    assert summary.loc[3, "parnme"] == pst.par_names[5]
+    assert summary.loc[3, "bound"] == "ubnd"
+    assert summary.loc[7, "bound"] == "lbnd"
+    assert summary.scale_factor.max() < 1.0
+    pe.back_transform()
+    assert np.isclose(pe._df.loc[3, pst.par_names[5]], par.loc[pst.par_names[5], "parubnd"])
+    assert np.isclose(pe._df.loc[7, pst.par_names[9]], par.loc[pst.par_names[9], "parlbnd"])
+
+    # the same results when processed in blocks of realizations
+    pe = pyemu.ParameterEnsemble.from_gaussian_draw(pst, num_reals=20, seed=2)
+    pe._df *= np.random.RandomState(0).uniform(0.5, 2.0, size=pe.shape)
+    pe2 = pe.copy()
+    summary = pe.enforce(how="scale")
+    pe2.enforce_max_points = pst.npar * 3
+    summary2 = pe2.enforce(how="scale")
+    assert np.array_equal(pe.values, pe2.values)
+    assert summary.equals(summary2)
+    assert pe.enforce(how="scale").shape[0] == 0
+
+
 def pnulpar_test():
     import os
     import pyemu
@@ -589,6 +804,11 @@ def mixed_par_draw_test():
 if __name__ == "__main__":
     par_gauss_draw_consistency_test()
     obs_gauss_draw_consistency_test()
+    # chunked_gauss_draw_test()
+    # factor_cache_draw_test()
+    # parallel_group_draw_test()
+    # seeded_draw_test()
+    # enforce_summary_test()
     #phi_vector_test()
     #add_base_test()
     #nz_test()
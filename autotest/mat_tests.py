@@ -437,6 +437,233 @@ def coo_tests():
     assert np.array_equal(m.x, mm.x)
     os.remove(mname)
 
+def lazy_binary_test():
+    import os
+    import numpy as np
+    import pyemu
+
+    nrow = 50
+    ncol = 20
+
+    rnames = ["row_{0}".format(i) for i in range(nrow)]
+    cnames = ["col_{0}".format(i) for i in range(ncol)]
+    x = np.random.random((nrow, ncol))
+    x[x < 0.5] = 0.0
+    m = pyemu.Matrix(x=x, row_names=rnames, col_names=cnames)
+
+    mname = os.path.join("temp", "temp.jcb")
+    for write in [m.to_binary, m.to_coo]:
+        write(mname)
+        mm = pyemu.Matrix.from_binary(mname, lazy=True)
+        assert mm.islazy
+        assert mm.shape == m.shape
+        sub = mm.get(row_names=rnames[10:2:-1], col_names=cnames[5:9])
+        assert mm.islazy
+        assert np.array_equal(
+            sub.x, m.get(row_names=rnames[10:2:-1], col_names=cnames[5:9]).x
+        )
+        ext = mm.extract(col_names=cnames[:3])
+        assert np.array_equal(ext.x, x[:, :3])
+        assert mm.shape == (nrow, ncol - 3)
+        mm.drop(rnames[:5], axis=0)
+        assert np.array_equal(mm.x, x[5:, 3:])
+        assert not mm.islazy
+        os.remove(mname)
+
+    cov = pyemu.Cov(x=np.dot(x.T, x), names=cnames)
+    cov.to_binary(mname)
+    lcov = pyemu.Cov.from_binary(mname, lazy=True)
+    sub = lcov.get(cnames[::-2])
+    assert isinstance(sub, pyemu.Cov)
+    assert np.array_equal(sub.x, cov.get(cnames[::-2]).x)
+
+    # the values can still be read after changing directories
+    lcov = pyemu.Cov.from_binary(mname, lazy=True)
+    cwd = os.getcwd()
+    os.chdir("temp")
+    try:
+        assert np.array_equal(lcov.x, cov.x)
+    finally:
+        os.chdir(cwd)
+    os.remove(mname)
+
+def sparse_test():
+    import os
+    import numpy as np
+    import pyemu
+
+    nrow = 40
+    ncol = 30
+    rnames = ["row_{0}".format(i) for i in range(nrow)]
+    cnames = ["col_{0}".format(i) for i in range(ncol)]
+    x = np.random.random((nrow, ncol))
+    x[x < 0.8] = 0.0
+
+    jco = pyemu.Jco(x=x, row_names=rnames, col_names=cnames)
+    sjco = jco.to_sparse()
+    assert sjco.issparse
+    assert not jco.issparse
+    assert np.array_equal(sjco.to_dense().x, jco.x)
+
+    obscov = pyemu.Cov(x=np.random.random((nrow, 1)), names=rnames, isdiagonal=True)
+    parcov = pyemu.Cov(x=np.random.random((ncol, 1)), names=cnames, isdiagonal=True)
+
+    # linear algebra stays sparse where it can
+    xtqx = sjco.T * obscov * sjco
+    assert xtqx.issparse
+    assert np.allclose(xtqx.as_2d, (jco.T * obscov * jco).x)
+    assert np.allclose((xtqx + parcov).as_2d, ((jco.T * obscov * jco) + parcov).x)
+    assert np.allclose((sjco.T * jco).x, (jco.T * jco).x)
+    assert np.allclose((sjco + sjco).as_2d, (jco + jco).x)
+    assert np.allclose((sjco + jco).x, (jco + jco).x)
+    assert np.allclose(sjco.hadamard_product(jco).as_2d, jco.hadamard_product(jco).x)
+    sub = sjco.get(row_names=rnames[::-3], col_names=cnames[5:1:-1])
+    assert sub.issparse
+    assert np.array_equal(
+        sub.as_2d, jco.get(row_names=rnames[::-3], col_names=cnames[5:1:-1]).x
+    )
+
+    cov = pyemu.Cov(x=np.dot(x.T, x), names=cnames).to_sparse()
+    assert isinstance(cov.get(cnames[:4]), pyemu.Cov)
+    assert cov.get(cnames[:4]).issparse
+    dcov = pyemu.Cov(x=np.dot(x.T, x), names=cnames)
+    diag = cov.get_diagonal_vector()
+    assert diag.shape == (ncol, 1)
+    assert diag.row_names == cnames
+    assert np.array_equal(diag.x, dcov.get_diagonal_vector().x)
+    assert np.allclose(cov.to_pearson().x, dcov.to_pearson().x)
+
+    mname = os.path.join("temp", "temp.jcb")
+    for write in [sjco.to_binary, sjco.to_coo]:
+        write(mname)
+        assert np.array_equal(pyemu.Jco.from_binary(mname).x, x)
+        sjco2 = pyemu.Jco.from_binary(mname, sparse=True)
+        assert sjco2.issparse
+        assert np.array_equal(sjco2.as_2d, x)
+        os.remove(mname)
+
+def cov_from_blocks_test():
+    import os
+    import numpy as np
+    import pyemu
+
+    names = ["par_{0}".format(i) for i in range(12)]
+    x = np.random.random((4, 4))
+    dense = pyemu.Cov(x=np.dot(x.T, x) + np.eye(4), names=names[2:6])
+    diag = pyemu.Cov(
+        x=np.random.random((5, 1)) + 0.1, names=names[6:11], isdiagonal=True
+    )
+    single = pyemu.Cov(x=np.array([[2.0]]), names=[names[11]])
+    first = pyemu.Cov(x=np.array([[1.0, 0.5], [0.5, 1.0]]), names=names[:2])
+    blocks = [first, dense, diag, single]
+
+    full = pyemu.Cov(x=np.zeros((12, 12)), names=names)
+    for block in blocks:
+        full.replace(block)
+
+    cov = pyemu.Cov.from_blocks(blocks)
+    assert cov.issparse
+    assert cov.row_names == names
+    assert np.allclose(cov.as_2d, full.x)
+
+    # block-wise inverse stays sparse
+    inv = cov.inv
+    assert inv.issparse
+    assert np.allclose(inv.as_2d, np.linalg.inv(full.x))
+
+    # reorder and stream to disk
+    rnames = names[::-1]
+    fname = os.path.join("temp", "blocks.jcb")
+    cov = pyemu.Cov.from_blocks(iter(blocks), names=rnames, filename=fname)
+    assert os.path.exists(fname)
+    assert cov.row_names == rnames
+    assert np.allclose(cov.as_2d, full.get(rnames).x)
+    assert np.allclose(pyemu.Cov.from_binary(fname).x, full.get(rnames).x)
+
+    for bad in [blocks[:-1], blocks + [single]]:
+        try:
+            pyemu.Cov.from_blocks(bad, names=names)
+        except Exception:
+            pass
+        else:
+            raise Exception("should have failed")
+    try:
+        pyemu.Cov.from_blocks(blocks, filename=fname)
+    except Exception:
+        pass
+    else:
+        raise Exception("should have failed")
+
+
+def binary_names_test():
+    import os
+    import numpy as np
+    import pyemu
+
+    rnames = ["obs_{0}".format(i) for i in range(10)]
+    rnames[3] = "a_very_long_observation_name"
+    cnames = ["par_{0}".format(i) for i in range(3)]
+    x = np.random.random((10, 3))
+    m = pyemu.Matrix(x=x, row_names=rnames, col_names=cnames)
+
+    mname = os.path.join("temp", "temp.jcb")
+    m.to_binary(mname)
+    assert os.path.getsize(mname) == 12 + (30 * 12) + (3 * 12) + (10 * 20)
+    mm = pyemu.Matrix.from_binary(mname)
+    assert mm.row_names[3] == rnames[3][: m.obs_length - 1]
+    assert mm.row_names[4:] == rnames[4:]
+    assert mm.col_names == cnames
+    assert np.array_equal(mm.x, x)
+
+    m.to_coo(mname, chunk=7)
+    mm = pyemu.Matrix.from_binary(mname)
+    assert mm.row_names == rnames
+    assert np.array_equal(mm.x, x)
+
+    sm = m.to_sparse().x.tocoo()
+    pyemu.mat.save_coo(sm, rnames, cnames, mname, chunk=4)
+    mm = pyemu.Matrix.from_binary(mname)
+    assert mm.row_names == rnames
+    assert np.array_equal(mm.x, x)
+    os.remove(mname)
+
+def stream_write_test():
+    import os
+    import numpy as np
+    import pyemu
+
+    nrow = 100
+    ncol = 37
+    rnames = ["row_{0}".format(i) for i in range(nrow)]
+    cnames = ["col_{0}".format(i) for i in range(ncol)]
+    x = np.random.random((nrow, ncol))
+    x[x < 0.5] = 0.0
+
+    mname = os.path.join("temp", "temp.jcb")
+    for chunk in [1, 250, 1000, 100000]:
+        m = pyemu.Matrix(x=x.copy(), row_names=rnames, col_names=cnames)
+        for write in [m.to_binary, m.to_coo]:
+            write(mname, chunk=chunk)
+            mm = pyemu.Matrix.from_binary(mname)
+            assert np.array_equal(mm.x, x)
+            os.remove(mname)
+
+    m = pyemu.Matrix(x=x.copy(), row_names=rnames, col_names=cnames)
+    m.to_binary(mname, droptol=0.75, chunk=300)
+    mm = pyemu.Matrix.from_binary(mname)
+    assert np.abs(mm.x[mm.x != 0.0]).min() >= 0.75
+    assert np.array_equal(mm.x, m.x)
+    os.remove(mname)
+
+    m.x[3, 30] = np.nan
+    try:
+        m.to_binary(mname, chunk=300)
+    except Exception:
+        pass
+    else:
+        raise Exception("should have failed")
+    assert not os.path.exists(mname)
+
 def df_tests():
     import os
     import numpy as np
@@ -487,6 +714,11 @@ if __name__ == "__main__":
     #df_tests()
     # cov_scale_offset_test()
     #coo_tests()
+    # lazy_binary_test()
+    # sparse_test()
+    # cov_from_blocks_test()
+    # binary_names_test()
+    # stream_write_test()
     # indices_test()
     #mat_test()
     # load_jco_test()
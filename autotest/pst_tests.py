@@ -880,6 +880,110 @@ def process_output_files_test():
     s2 = i2.read_output_file(out_files[1])
     assert s2.loc["h01_02","obsval"] == 1.024
 
+def instruction_file_plan_test():
+    import os
+    import numpy as np
+    from pyemu import pst_utils
+
+    ins_file = os.path.join("temp", "plan.ins")
+    with open(ins_file, "w") as f:
+        f.write("pif ~\n")
+        f.write("l2 [f1]1:8 [f2]9:16\n")
+        f.write("l1 [f3]1:8 [dum]9:16\n")
+        f.write("~heads~ l1 (s1)5:7 !h1!\n")
+        f.write("l1 [f4]3:10 w !h2!\n")
+    out_lines = ["header line",
+                 "   1.250 -2.5E+1",
+                 "  3.0E-2   99.0",
+                 "some text",
+                 "HEADS follow",
+                 "  12.5     7.25",
+                 "  -1.0e+2 skip 8.5"]
+    ins = pst_utils.InstructionFile(ins_file)
+    # the first two instruction lines are read in bulk
+    assert ins._bulk is not None
+    assert ins._bulk["names"] == ["f1", "f2", "f3"]
+    truth = {"f1": 1.25, "f2": -25.0, "f3": 0.03, "s1": 12.5, "h1": 7.25,
+             "f4": -100.0, "h2": 8.5}
+    for i, newline in enumerate(["\n", "\r\n"]):
+        out_file = os.path.join("temp", "plan{0}.out".format(i))
+        with open(out_file, "wb") as f:
+            f.write(newline.join(out_lines).encode())
+        # the same instance is reused across output files
+        df = ins.read_output_file(out_file)
+        assert len(df) == len(truth)
+        for oname, val in truth.items():
+            assert df.loc[oname, "obsval"] == val, (oname, df.loc[oname, "obsval"])
+        names, vals = ins.read_output_values(out_file)
+        assert names[:3] == ["f1", "f2", "f3"]
+        assert np.allclose(vals, [truth[n] for n in names])
+
+    with open(out_file, "w") as f:
+        f.write("\n".join(out_lines[:2]))
+    try:
+        ins.read_output_file(out_file)
+    except Exception as e:
+        assert "EOF" in str(e)
+    else:
+        raise Exception("should have failed")
+
+
+def process_output_files_parallel_test():
+    import os
+    import numpy as np
+    import pandas as pd
+    import pyemu
+    from pyemu import pst_utils
+
+    d = os.path.join("temp", "parallel_outputs")
+    if not os.path.exists(d):
+        os.makedirs(d)
+    nfiles, nobs = 20, 15
+    obs_names, ins_files, out_files = [], [], []
+    truth = {}
+    for i in range(nfiles):
+        ins_file = "out{0}.dat.ins".format(i)
+        out_file = "out{0}.dat".format(i)
+        vals = np.random.random(nobs)
+        names = ["o{0}_{1}".format(i, j) for j in range(nobs)]
+        with open(os.path.join(d, out_file), "w") as f:
+            f.write("header\n")
+            for v in vals:
+                f.write("  {0:15.10E}\n".format(v))
+        with open(os.path.join(d, ins_file), "w") as f:
+            f.write("pif ~\n~header~\n")
+            for n in names:
+                f.write("l1 !{0}!\n".format(n))
+        truth.update(dict(zip(names, vals)))
+        obs_names.extend(names)
+        ins_files.append(ins_file)
+        out_files.append(out_file)
+    # an observation that isnt in any instruction file
+    obs_names.append("missing")
+    pst = pyemu.Pst.from_par_obs_names(["p1"], obs_names)
+    pst.model_output_data = pd.DataFrame({"pest_file": ins_files,
+                                          "model_file": out_files}, index=ins_files)
+
+    df1 = pst.process_output_files(pst_path=d)
+    df2, timing = pst_utils.process_output_files(pst, pst_path=d, num_workers=4,
+                                                 return_timing=True)
+    assert list(df1.index) == pst.obs_names
+    assert np.isnan(df1.loc["missing", "obsval"])
+    df1 = df1.dropna()
+    assert df1.shape[0] == nfiles * nobs
+    t = pd.Series(truth).loc[df1.index]
+    assert np.abs(df1.obsval - t).max() < 1.0e-9
+    assert np.abs(df1.obsval - df2.loc[df1.index, "obsval"]).max() == 0.0
+    assert timing.shape[0] == nfiles
+    assert (timing.nobs == nobs).all()
+    assert (timing.seconds >= 0.0).all()
+
+    # instruction files are parsed once and reused
+    i1 = pst_utils._get_instruction_file(os.path.join(d, ins_files[0]))
+    i2 = pst_utils._get_instruction_file(os.path.join(d, ins_files[0]))
+    assert i1 is i2
+
+
 def new_format_path_mechanics_test():
     import pyemu
 
@@ -917,6 +1021,40 @@ def new_format_path_mechanics_test():
     assert options["sep"] == "w", options
 
 
+def file_cache_test():
+    import os
+    from pyemu.pst.pst_utils import _FileCache
+    cache = _FileCache(max_entries=2)
+    loads = []
+
+    def load(filename):
+        loads.append(filename)
+        return open(filename).read()
+
+    names = [os.path.join("temp", "cache_{0}.txt".format(i)) for i in range(3)]
+    for i, name in enumerate(names):
+        with open(name, "w") as f:
+            f.write("{0}\n".format(i))
+    assert cache.get(names[0], load) == "0\n"
+    assert cache.get(names[0], load) == "0\n"
+    assert len(loads) == 1
+    # least recently used entries are dropped
+    cache.get(names[1], load)
+    cache.get(names[0], load)
+    cache.get(names[2], load)
+    assert len(cache) == 2
+    assert names[0] in cache and names[1] not in cache
+    # changed files and rejected entries are reloaded
+    with open(names[0], "w") as f:
+        f.write("changed\n")
+    assert cache.get(names[0], load) == "changed\n"
+    nloads = len(loads)
+    cache.get(names[0], load, reuse=lambda obj: False)
+    assert len(loads) == nloads + 1
+    cache.clear()
+    assert len(cache) == 0
+
+
 def pi_helper_test():
     import os
     import numpy as np
@@ -929,6 +1067,9 @@ def pi_helper_test():
 if __name__ == "__main__":
 
     # process_output_files_test()
+    # instruction_file_plan_test()
+    # process_output_files_parallel_test()
+    # file_cache_test()
     # change_limit_test()
     # new_format_test()
     # lt_gt_constraint_names_test()
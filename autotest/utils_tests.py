@@ -40,6 +40,159 @@ def fac2real_test():
     # plt.colorbar(p)
     # plt.show()
 
+def fac2real_binary_test():
+    import os
+    import numpy as np
+    import pandas as pd
+    import pyemu
+    pp_file = os.path.join("utils", "points1.dat")
+    factors_file = os.path.join("utils", "factors1.dat")
+    arr1 = pyemu.geostats.fac2real(pp_file, factors_file, out_file=None)
+
+    bin_file = os.path.join("temp", "factors1.bin")
+    pyemu.geostats.convert_factors_file(factors_file, bin_file)
+    arr2 = pyemu.geostats.fac2real(pp_file, bin_file, out_file=None)
+    assert np.array_equal(arr1, arr2)
+
+    # back to text
+    txt_file = os.path.join("temp", "factors1.dat")
+    pyemu.geostats.convert_factors_file(bin_file, txt_file, binary=False)
+    arr3 = pyemu.geostats.fac2real(pp_file, txt_file, out_file=None)
+    # text factors are written with 8 significant digits
+    assert np.allclose(arr1, arr3, rtol=1.0e-6)
+    f1 = pyemu.geostats.read_factors_file(factors_file)
+    f3 = pyemu.geostats.read_factors_file(txt_file)
+    for key in ["cells", "itrans", "indptr", "indices"]:
+        assert np.array_equal(f1[key], f3[key])
+    assert np.allclose(f1["weights"], f3["weights"], rtol=1.0e-7)
+
+    # from kriging factors
+    class SR(object):
+        pass
+    sr = SR()
+    sr.nrow, sr.ncol = 20, 30
+    sr.xcentergrid, sr.ycentergrid = np.meshgrid(np.arange(30) * 10.0, np.arange(20) * 10.0)
+    rng = np.random.RandomState(0)
+    pp = pd.DataFrame({"name": ["pp{0}".format(i) for i in range(20)],
+                       "x": rng.uniform(0, 300, 20), "y": rng.uniform(0, 200, 20),
+                       "zone": 1, "parval1": rng.uniform(1, 10, 20)})
+    gs = pyemu.geostats.GeoStruct(variograms=pyemu.geostats.ExpVario(1.0, 100.0),
+                                  transform="log")
+    ok = pyemu.geostats.OrdinaryKrige(gs, pp)
+    ok.calc_factors_grid(sr, maxpts_interp=5)
+    ok.to_grid_factors_file(os.path.join("temp", "ok.fac"))
+    ok.to_grid_factors_file(os.path.join("temp", "ok.bin"), binary=True)
+    arr1 = pyemu.geostats.fac2real(pp, os.path.join("temp", "ok.fac"), out_file=None)
+    arr2 = pyemu.geostats.fac2real(pp.iloc[::-1], os.path.join("temp", "ok.bin"),
+                                   out_file=None)
+    assert arr2.shape == (20, 30)
+    assert np.abs(arr1 - arr2).max() < 1.0e-5
+    assert np.abs(arr2 - pp.parval1.values.mean()).max() < 10.0
+
+
+def fac2real_ensemble_test():
+    import os
+    import numpy as np
+    import pandas as pd
+    import pyemu
+    pp_file = os.path.join("utils", "points1.dat")
+    factors_file = os.path.join("utils", "factors1.dat")
+    pp_df = pyemu.pp_utils.pp_file_to_dataframe(pp_file)
+    pp_df.loc[:, "name"] = pp_df.name.str.lower()
+    rng = np.random.RandomState(0)
+    vals = pp_df.parval1.values * np.exp(rng.randn(5, pp_df.shape[0]))
+    arrs = pyemu.geostats.fac2real_ensemble(factors_file, vals, lower_lim=1.0e-10)
+    assert arrs.shape[0] == 5
+    for i in range(vals.shape[0]):
+        pp_df.loc[:, "parval1"] = vals[i]
+        arr = pyemu.geostats.fac2real(pp_df, factors_file, out_file=None,
+                                      lower_lim=1.0e-10)
+        assert np.array_equal(arr, arrs[i])
+
+    # pilot point values as a parameter ensemble, in a different order
+    par_names = ["par_{0}".format(n) for n in pp_df.name]
+    pst = pyemu.Pst.from_par_obs_names(par_names[::-1], ["obs1"])
+    df = pd.DataFrame(vals, columns=par_names).loc[:, par_names[::-1]]
+    pe = pyemu.ParameterEnsemble.from_dataframe(pst=pst, df=df)
+    pe.transform()
+    mm_file = os.path.join("temp", "fac2real_ensemble.npy")
+    arrs2 = pyemu.geostats.fac2real_ensemble(factors_file, pe, par_names=par_names,
+                                             lower_lim=1.0e-10, filename=mm_file,
+                                             chunk=2)
+    assert np.allclose(arrs, arrs2)
+    arrs3 = np.load(mm_file, mmap_mode="r")
+    assert np.array_equal(arrs2, arrs3)
+
+
+def fac2real_nodes_test():
+    import os
+    import numpy as np
+    import pandas as pd
+    import pyemu
+
+    class SR(object):
+        pass
+    sr = SR()
+    sr.nrow, sr.ncol = 20, 30
+    sr.xcentergrid, sr.ycentergrid = np.meshgrid(np.arange(30) * 10.0, np.arange(20) * 10.0)
+    zone_array = np.ones((20, 30), dtype=int)
+    zone_array[:, 15:] = 2
+    rng = np.random.RandomState(1)
+    pp = pd.DataFrame({"name": ["pp{0}".format(i) for i in range(20)],
+                       "x": rng.uniform(0, 300, 20), "y": rng.uniform(0, 200, 20),
+                       "parval1": rng.uniform(1, 10, 20)})
+    pp.loc[:, "zone"] = np.where(pp.x < 150, 1, 2)
+    gs = pyemu.geostats.GeoStruct(variograms=pyemu.geostats.ExpVario(1.0, 100.0),
+                                  transform="log")
+
+    # the structured grid cells as (shuffled) nodes
+    order = rng.permutation(20 * 30)
+    ok = pyemu.geostats.OrdinaryKrige(gs, pp)
+    ok.calc_factors_grid(sr, zone_array=zone_array, maxpts_interp=5,
+                         var_filename=os.path.join("temp", "grid_var.dat"))
+    ok.to_grid_factors_file(os.path.join("temp", "grid.bin"), binary=True)
+    grid_arr = pyemu.geostats.fac2real(pp, os.path.join("temp", "grid.bin"), out_file=None)
+    grid_var = np.loadtxt(os.path.join("temp", "grid_var.dat"))
+
+    ok = pyemu.geostats.OrdinaryKrige(gs, pp)
+    ok.calc_factors_nodes(sr.xcentergrid.ravel()[order], sr.ycentergrid.ravel()[order],
+                          zone_array=zone_array.ravel()[order], maxpts_interp=5,
+                          var_filename=os.path.join("temp", "node_var.dat"))
+    fac_file = os.path.join("temp", "node.bin")
+    ok.to_node_factors_file(fac_file)
+    try:
+        ok.to_grid_factors_file(os.path.join("temp", "node.fac"))
+    except Exception:
+        pass
+    else:
+        raise Exception("should have failed")
+    try:
+        pyemu.geostats.convert_factors_file(fac_file, os.path.join("temp", "node.fac"),
+                                            binary=False)
+    except Exception:
+        pass
+    else:
+        raise Exception("should have failed")
+
+    factors = pyemu.geostats.read_factors_file(fac_file)
+    assert factors["shape"] == (600,)
+    arr = pyemu.geostats.fac2real(pp, fac_file, out_file=None)
+    assert arr.shape == (600,)
+    assert np.allclose(arr, grid_arr.ravel()[order])
+    node_var = np.loadtxt(os.path.join("temp", "node_var.dat"))
+    assert np.allclose(node_var, grid_var.ravel()[order])
+    out_file = os.path.join("temp", "node.ref")
+    pyemu.geostats.fac2real(pp, fac_file, out_file=out_file)
+    assert np.allclose(np.loadtxt(out_file), arr)
+
+    vals = pp.parval1.values * np.exp(rng.randn(4, pp.shape[0]))
+    arrs = pyemu.geostats.fac2real_ensemble(fac_file, vals)
+    assert arrs.shape == (4, 600)
+    for i in range(vals.shape[0]):
+        pp.loc[:, "parval1"] = vals[i]
+        assert np.allclose(pyemu.geostats.fac2real(pp, fac_file, out_file=None), arrs[i])
+
+
 def vario_test():
     import numpy as np
     import pyemu
@@ -130,6 +283,46 @@ def covariance_matrix_test():
     print(struct.covariance_matrix(pts.x,pts.y,names=pts.name).x)
 
 
+def covariance_matrix_options_test():
+    import numpy as np
+    import pyemu
+    rng = np.random.RandomState(0)
+    n = 500
+    x, y = rng.uniform(0, 1000, n), rng.uniform(0, 1000, n)
+    names = ["p{0}".format(i) for i in range(n)]
+    v1 = pyemu.geostats.SphVario(1.0, 150.0, anisotropy=0.5, bearing=30.0)
+    v2 = pyemu.geostats.SphVario(0.5, 50.0)
+    gs = pyemu.geostats.GeoStruct(variograms=[v1, v2], nugget=0.1)
+    cov = gs.covariance_matrix(x, y, names)
+    assert np.array_equal(cov.x, cov.x.T)
+    assert np.allclose(np.diag(cov.x), gs.sill)
+    # the brute force covariance
+    for i in [0, 10, 499]:
+        # covariance_points() includes the nugget
+        c = gs.covariance_points(x[i], y[i], np.delete(x, i), np.delete(y, i)) - gs.nugget
+        assert np.allclose(np.delete(cov.x[i], i), c)
+
+    cov32 = gs.covariance_matrix(x, y, names, dtype=np.float32)
+    assert cov32.x.dtype == np.float32
+    assert np.allclose(cov32.x, cov.x, atol=1.0e-6)
+
+    # force the sparse tiles to be pruned
+    scov = pyemu.geostats._covariance_array_sparse(gs.variograms, x, y, gs.nugget,
+                                                   tile_size=50)
+    assert np.array_equal(scov.toarray(), cov.x)
+    scov = gs.covariance_matrix(x, y, names, sparse=True)
+    assert scov.issparse
+    assert scov.x.nnz == np.count_nonzero(cov.x)
+    assert np.array_equal(scov.x.toarray(), cov.x)
+
+    # adding to an existing cov
+    base = pyemu.Cov(x=np.ones((n, 1)), names=names, isdiagonal=True)
+    cov2 = gs.covariance_matrix(x, y, cov=base)
+    assert np.allclose(cov2.x, cov.x + np.eye(n))
+    vcov = v1.covariance_matrix(x, y, cov=pyemu.Cov(x=cov.x.copy(), names=names))
+    assert np.allclose(vcov.x, cov.x + v1.covariance_matrix(x, y, names).x)
+
+
 def setup_ppcov_simple():
     import os
     import platform
@@ -372,6 +565,53 @@ def write_tpl_test():
     pyemu.pst_utils.write_to_template(par_vals,tpl_file,in_file)
 
 
+def template_file_test():
+    import os
+    import numpy as np
+    import pandas as pd
+    import pyemu
+    tpl_file = os.path.join("temp", "template_file_test.tpl")
+    with open(tpl_file, "w") as f:
+        f.write("ptf ~\n")
+        f.write("{not a slot} ~ p1 ~ }\n")
+        f.write("~ P2              ~,~p1~\n")
+        f.write("no marker\n")
+        f.write("  last ~p2   ~")
+    t = pyemu.pst_utils.TemplateFile(tpl_file)
+    assert t.par_names == ["p1", "p2"]
+    parvals = pd.Series({"p1": 1.5, "p2": -2.0e10})
+    in_file = os.path.join("temp", "template_file_test.dat")
+    t.write_input_file(parvals, in_file)
+    with open(in_file, "r") as f:
+        lines = f.readlines()
+    assert lines[0] == "{not a slot} 1.500E+00 }\n", lines[0]
+    assert lines[1] == "      -2.000000E+10,1.500E+00\n", lines[1]
+    assert lines[2] == "no marker\n"
+    assert lines[3] == "  last -2.000E+10\n", lines[3]
+
+    # the cached plan is reused until the template changes
+    pyemu.pst_utils.write_to_template(parvals.to_dict(), tpl_file, in_file)
+    assert pyemu.pst_utils._get_template_file(tpl_file) is \
+           pyemu.pst_utils._get_template_file(tpl_file)
+    try:
+        t.write_input_file({"p1": 1.0}, in_file)
+    except KeyError:
+        pass
+    else:
+        raise Exception("should have failed")
+
+    # an odd number of markers on a line is an error
+    with open(tpl_file, "w") as f:
+        f.write("ptf ~\n")
+        f.write(" a ~ p1 ~ b ~ p2 \n")
+    try:
+        pyemu.pst_utils.write_to_template(parvals.to_dict(), tpl_file, in_file)
+    except Exception as e:
+        assert "template file error" in str(e)
+    else:
+        raise Exception("should have failed")
+
+
 def read_pestpp_runstorage_file_test():
     import os
     import pyemu
@@ -510,6 +750,141 @@ def ok_test():
         assert sum(kf.loc[i,"ifacts"]) == 1.0
     print(kf)
 
+def ok_kdtree_test():
+    import numpy as np
+    import pandas as pd
+    import pyemu
+    rng = np.random.RandomState(1)
+    npp = 200
+    pts_data = pd.DataFrame({"name":["pp{0}".format(i) for i in range(npp)],
+                             "x":rng.uniform(0,1000,npp),"y":rng.uniform(0,1000,npp)})
+    v = pyemu.geostats.ExpVario(1.0,300,anisotropy=2,bearing=30)
+    gs = pyemu.geostats.GeoStruct(variograms=[v],nugget=0.1)
+    # random points, a few exact point locations and a nan point
+    x = np.concatenate([rng.uniform(0,1000,500),pts_data.x.values[:3],[np.nan]])
+    y = np.concatenate([rng.uniform(0,1000,500),pts_data.y.values[:3],[np.nan]])
+    for kwargs in [{},{"maxpts_interp":8,"search_radius":150,"minpts_interp":3}]:
+        ok = pyemu.geostats.OrdinaryKrige(gs,pts_data)
+        org = ok._calc_factors_org(x,y,**kwargs)
+        ok = pyemu.geostats.OrdinaryKrige(gs,pts_data)
+        ok.block_size = 100
+        kd = ok.calc_factors(x,y,**kwargs)
+        assert np.allclose(org.err_var.values,kd.err_var.values,equal_nan=True)
+        for i in range(x.shape[0]):
+            assert list(org.inames.iloc[i]) == list(kd.inames.iloc[i])
+            assert np.allclose(org.ifacts.iloc[i],kd.ifacts.iloc[i],atol=1.0e-10)
+            assert np.allclose(org.idist.iloc[i],kd.idist.iloc[i])
+
+
+def ok_mp_test():
+    import numpy as np
+    import pandas as pd
+    import pyemu
+    rng = np.random.RandomState(2)
+    npp = 100
+    pts_data = pd.DataFrame({"name":["pp{0}".format(i) for i in range(npp)],
+                             "x":rng.uniform(0,1000,npp),"y":rng.uniform(0,1000,npp)})
+    gs = pyemu.geostats.GeoStruct(variograms=[pyemu.geostats.ExpVario(1.0,300)],nugget=0.1)
+    x = np.concatenate([rng.uniform(0,1000,1000),[np.nan]])
+    y = np.concatenate([rng.uniform(0,1000,1000),[np.nan]])
+    ok = pyemu.geostats.OrdinaryKrige(gs,pts_data)
+    ok.block_size = 150
+    serial = ok.calc_factors(x,y,maxpts_interp=10)
+    os_utils = pyemu.os_utils
+    try:
+        for mode in ["processes", "threads", "serial"]:
+            os_utils.set_executor(mode, num_workers=2)
+            ok = pyemu.geostats.OrdinaryKrige(gs,pts_data)
+            ok.block_size = 150
+            par = ok.calc_factors(x,y,maxpts_interp=10,num_threads=3)
+            assert np.array_equal(serial.err_var.values,par.err_var.values,equal_nan=True)
+            for col in ["inames","idist","ifacts"]:
+                for s,p in zip(serial.loc[:,col],par.loc[:,col]):
+                    assert np.array_equal(s,p)
+        # plain arrays are shared too
+        os_utils.set_executor("processes", num_workers=2)
+        arr = rng.uniform(size=(5, 3))
+        shared = os_utils._share(arr)
+        try:
+            assert np.array_equal(os_utils._get_shared(shared), arr)
+        finally:
+            os_utils._unshare(shared)
+    finally:
+        os_utils.set_executor()
+
+
+def ok_cache_test():
+    import os
+    import shutil
+    from types import SimpleNamespace
+    import numpy as np
+    import pandas as pd
+    import pyemu
+
+    cache_dir = os.path.join("temp", "krige_cache")
+    if os.path.exists(cache_dir):
+        shutil.rmtree(cache_dir)
+    rng = np.random.RandomState(3)
+    npp = 50
+    pts_data = pd.DataFrame(
+        {
+            "name": ["pp{0}".format(i) for i in range(npp)],
+            "x": rng.uniform(0, 1000, npp),
+            "y": rng.uniform(0, 1000, npp),
+            "zone": np.repeat([1, 2], npp // 2),
+        }
+    )
+    gs = pyemu.geostats.GeoStruct(
+        variograms=[pyemu.geostats.ExpVario(1.0, 300)], nugget=0.1
+    )
+    xx, yy = np.meshgrid(np.linspace(0, 1000, 30), np.linspace(0, 1000, 20))
+    sr = SimpleNamespace(xcentergrid=xx, ycentergrid=yy, nrow=20, ncol=30)
+    zone_array = np.ones_like(xx, dtype=int)
+    zone_array[:10, :] = 2
+
+    def cache_files():
+        return sorted([f for f in os.listdir(cache_dir) if f.endswith(".npz")])
+
+    try:
+        ok = pyemu.geostats.OrdinaryKrige(gs, pts_data)
+        no_cache = ok.calc_factors_grid(sr, zone_array=zone_array, maxpts_interp=10)
+        pyemu.geostats.OrdinaryKrige.factors_cache_dir = cache_dir
+        ok = pyemu.geostats.OrdinaryKrige(gs, pts_data)
+        first = ok.calc_factors_grid(sr, zone_array=zone_array, maxpts_interp=10)
+        # one entry per zone
+        assert len(cache_files()) == 2
+        ok = pyemu.geostats.OrdinaryKrige(gs, pts_data)
+        cached = ok.calc_factors_grid(sr, zone_array=zone_array, maxpts_interp=10)
+        assert len(cache_files()) == 2
+        for df in [first, cached]:
+            assert np.array_equal(
+                no_cache.err_var.values, df.err_var.values, equal_nan=True
+            )
+            for col in ["inames", "idist", "ifacts"]:
+                for n, c in zip(no_cache.loc[:, col], df.loc[:, col]):
+                    assert np.array_equal(n, c)
+        ok.to_grid_factors_file(os.path.join("temp", "cached_factors.dat"))
+
+        # moving a zone 2 point only re-krige zone 2
+        pts_data.loc[npp - 1, "x"] += 10.0
+        ok = pyemu.geostats.OrdinaryKrige(gs, pts_data)
+        ok.calc_factors_grid(sr, zone_array=zone_array, maxpts_interp=10)
+        assert len(cache_files()) == 3
+
+        # and a different search is a new entry
+        ok.calc_factors(xx.ravel(), yy.ravel(), maxpts_interp=5)
+        assert len(cache_files()) == 4
+
+        # eviction keeps the most recently used entries
+        sizes = [os.path.getsize(os.path.join(cache_dir, f)) for f in cache_files()]
+        pyemu.geostats.OrdinaryKrige.factors_cache_max_bytes = max(sizes)
+        ok.calc_factors(xx.ravel(), yy.ravel(), maxpts_interp=6)
+        assert len(cache_files()) == 1
+    finally:
+        pyemu.geostats.OrdinaryKrige.factors_cache_dir = None
+        pyemu.geostats.OrdinaryKrige.factors_cache_max_bytes = 2 ** 30
+
+
 def ok_grid_test():
 
     try:
@@ -737,6 +1112,51 @@ def geostat_prior_builder_test():
     assert cov.shape[0] == pst.npar_adj
 
 
+def geostat_prior_builder_blocks_test():
+    import os
+    import numpy as np
+    import pyemu
+    pst_file = os.path.join("pst","pest.pst")
+    pst = pyemu.Pst(pst_file)
+    tpl_file = os.path.join("utils", "pp_locs.tpl")
+    str_file = os.path.join("utils", "structure.dat")
+    df = pyemu.pp_utils.pp_tpl_to_dataframe(tpl_file)
+    df.loc[:, "zone"] = np.arange(df.shape[0]) % 2
+    sd = {str_file: df}
+
+    dense = pyemu.helpers.geostatistical_prior_builder(pst, sd)
+    sparse = pyemu.helpers.geostatistical_prior_builder(pst, sd, sparse=True)
+    assert sparse.issparse
+    assert sparse.row_names == dense.row_names
+    assert np.allclose(sparse.as_2d, dense.as_2d)
+
+    jcb = os.path.join("temp", "prior_blocks.jcb")
+    ondisk = pyemu.helpers.geostatistical_prior_builder(pst, sd, filename=jcb)
+    assert ondisk.issparse
+    assert np.allclose(ondisk.as_2d, dense.as_2d)
+    assert np.allclose(pyemu.Cov.from_binary(jcb).x, dense.as_2d)
+
+    # block-wise inverse
+    assert np.allclose(sparse.inv.as_2d, np.linalg.inv(dense.as_2d))
+
+    # schur with the block diagonal prior
+    jco = pyemu.Jco(x=np.random.RandomState(0).randn(5, dense.shape[0]),
+                    row_names=["o{0}".format(i) for i in range(5)],
+                    col_names=dense.row_names)
+    obscov = pyemu.Cov(x=np.ones((5, 1)), names=jco.row_names, isdiagonal=True)
+    sc_pst = pyemu.Pst.from_par_obs_names(dense.row_names, jco.row_names)
+    sc1 = pyemu.Schur(jco=jco, pst=sc_pst, parcov=dense, obscov=obscov)
+    sc2 = pyemu.Schur(jco=jco, pst=sc_pst, parcov=ondisk, obscov=obscov)
+    assert np.allclose(sc1.posterior_parameter.x, sc2.posterior_parameter.x)
+    s1, s2 = sc1.get_parameter_summary(), sc2.get_parameter_summary()
+    assert np.allclose(s1.post_var.values, s2.post_var.values)
+
+    pe = pyemu.ParameterEnsemble.from_gaussian_draw(pst, sparse, num_reals=10,
+                                                    by_groups=False)
+    assert pe.shape == (10, pst.npar)
+    assert pe.dropna().shape == pe.shape
+
+
 def geostat_draws_test():
     import os
     import numpy as np
@@ -1401,6 +1821,8 @@ def plot_id_bar_test():
 
 def jco_from_pestpp_runstorage_test():
     import os
+    import shutil
+    import numpy as np
     import pyemu
 
     jco_file = os.path.join("utils","pest.jcb")
@@ -1412,6 +1834,42 @@ def jco_from_pestpp_runstorage_test():
     diff = (jco - jco2).to_dataframe()
     print(diff)
 
+    # stream the columns straight to a jco file
+    jco_file3 = os.path.join("temp", "rnj.jcb")
+    jco3 = pyemu.helpers.jco_from_pestpp_runstorage(rnj_file, pst_file,
+                                                     jco_filename=jco_file3, chunk=3)
+    assert jco3.islazy
+    assert jco3.col_names == jco2.col_names
+    assert np.abs(jco3.x - jco2.x).max() < 1.0e-10
+
+    # failed runs and bad perturbations raise and don't leave a jco file
+    def patched(name, irun, r_status=None, base_pars=False):
+        rnj_patched = os.path.join("temp", name)
+        shutil.copy2(rnj_file, rnj_patched)
+        _, _, runs = pyemu.helpers._memmap_pestpp_runstorage(rnj_patched)
+        runs = np.memmap(rnj_patched, dtype=runs.dtype, mode="r+",
+                         offset=runs.offset, shape=runs.shape)
+        if r_status is not None:
+            runs["r_status"][irun] = r_status
+        if base_pars:
+            runs["par"][irun] = runs["par"][0]
+        runs.flush()
+        del runs
+        return rnj_patched
+
+    for rnj_patched in [patched("failed.rnj", 2, r_status=-1),
+                        patched("nodiff.rnj", 2, base_pars=True)]:
+        for kwargs in [{}, {"jco_filename": jco_file3, "chunk": 1}]:
+            if os.path.exists(jco_file3):
+                os.remove(jco_file3)
+            try:
+                pyemu.helpers.jco_from_pestpp_runstorage(rnj_patched, pst_file, **kwargs)
+            except Exception as e:
+                print(str(e))
+            else:
+                raise Exception("should have failed")
+            assert not os.path.exists(jco_file3)
+
 
 def hfb_test():
     import os
@@ -1507,6 +1965,7 @@ def hfb_zn_mult_test():
 
 def read_runstor_test():
     import os
+    import shutil
     import numpy as np
     import pandas as pd
     import pyemu
@@ -1525,6 +1984,36 @@ def read_runstor_test():
     assert pdif < 1.0e-6,pdif
     assert odif < 1.0e-6,odif
    
+    # run selection and completed-only filtering on a copy with some
+    # runs that did not complete
+    rns_file = os.path.join("temp", "pest.rns")
+    shutil.copy2(os.path.join(d, "pest.rns"), rns_file)
+    _, _, runs = pyemu.helpers._memmap_pestpp_runstorage(rns_file)
+    runs = np.memmap(rns_file, dtype=runs.dtype, mode="r+",
+                     offset=runs.offset, shape=runs.shape)
+    runs["r_status"][2] = -1
+    runs["r_status"][9] = 0
+    runs.flush()
+    del runs
+    _, _, meta_all = pyemu.helpers.read_pestpp_runstorage(
+        rns_file, [5, 2, 7], with_metadata=True)
+    assert list(meta_all.index) == [5, 2, 7]
+    assert list(meta_all.status) == ["completed", "failed", "completed"]
+    expected = list(meta_all.loc[meta_all.r_status == 1].index)
+    assert expected == [5, 7]
+    par_df3, obs_df3, meta = pyemu.helpers.read_pestpp_runstorage(
+        rns_file, [5, 2, 7], with_metadata=True, completed_only=True)
+    assert list(meta.index) == expected
+    assert list(par_df3.index) == expected
+    assert list(obs_df3.index) == expected
+    assert np.abs(par_df3.values - par_df.loc[expected, :].values).max() == 0.0
+    assert np.abs(obs_df3.values - obs_df.loc[expected, :].values).max() == 0.0
+    _, _, meta = pyemu.helpers.read_pestpp_runstorage(rns_file, "all",
+                                                      with_metadata=True, completed_only=True)
+    assert (meta.r_status == 1).all()
+    assert meta.shape[0] == par_df.shape[0] - 2
+    assert 2 not in meta.index and 9 not in meta.index
+
     try:
         pyemu.helpers.read_pestpp_runstorage(os.path.join(d, "pest.rns"), "junk")
     except:
@@ -1746,6 +2235,156 @@ def specsim_test():
         os.chdir(bd)
         raise(e)
 
+def specsim_seed_test():
+    import os
+    import numpy as np
+    import pyemu
+
+    nrow, ncol = 30, 25
+    delr = np.ones((ncol)) * 100
+    delc = np.ones((nrow)) * 100
+    variograms = [pyemu.geostats.ExpVario(contribution=1.0, a=500)]
+    gs = pyemu.geostats.GeoStruct(variograms=variograms, transform="log", nugget=0.1)
+    ss = pyemu.geostats.SpecSim2d(geostruct=gs, delx=delr, dely=delc)
+
+    # the same realizations regardless of chunking or the global stream
+    reals = ss.draw_arrays(num_reals=20, mean_value=10.0, seed=11)
+    np.random.seed(3)
+    reals2 = ss.draw_arrays(num_reals=20, mean_value=10.0, chunk_size=3,
+                            seed=np.random.SeedSequence(11))
+    assert np.array_equal(reals, reals2)
+    reals3 = ss.draw_arrays(num_reals=5, mean_value=10.0, seed=11)
+    assert np.array_equal(reals[:5], reals3)
+    reals4 = ss.draw_arrays(num_reals=5, mean_value=10.0, seed=12)
+    assert not np.allclose(reals3, reals4)
+    reals5 = ss.draw_arrays(num_reals=5, mean_value=10.0, batched=False, chunk_size=2, seed=11)
+    reals6 = ss.draw_arrays(num_reals=5, mean_value=10.0, batched=False, seed=11)
+    assert np.array_equal(reals5, reals6)
+
+    # geostatistical draws
+    pst = pyemu.Pst(os.path.join("pst", "pest.pst"))
+    tpl_file = os.path.join("utils", "pp_locs.tpl")
+    str_file = os.path.join("utils", "structure.dat")
+    pe1 = pyemu.helpers.geostatistical_draws(pst, {str_file: tpl_file}, num_reals=10, seed=2)
+    pe2 = pyemu.helpers.geostatistical_draws(pst, {str_file: tpl_file}, num_reals=10, seed=2)
+    assert np.array_equal(pe1.values, pe2.values)
+    pe3 = pyemu.helpers.geostatistical_draws(pst, {str_file: tpl_file}, num_reals=10, seed=3)
+    assert not np.allclose(pe1.values, pe3.values)
+
+
+def specsim_batched_test():
+    import os
+    import numpy as np
+    import pandas as pd
+    import pyemu
+
+    nrow, ncol = 30, 25
+    delr = np.ones((ncol)) * 100
+    delc = np.ones((nrow)) * 100
+    variograms = [pyemu.geostats.ExpVario(contribution=1.0, a=500, anisotropy=2)]
+    gs = pyemu.geostats.GeoStruct(variograms=variograms, transform="log", nugget=0.1)
+    ss = pyemu.geostats.SpecSim2d(geostruct=gs, delx=delr, dely=delc)
+
+    # same realizations regardless of chunking
+    np.random.seed(1)
+    reals = ss.draw_arrays(num_reals=50, mean_value=10.0)
+    np.random.seed(1)
+    out = np.lib.format.open_memmap(
+        os.path.join("temp", "specsim.npy"), mode="w+", dtype=float, shape=reals.shape
+    )
+    reals2 = ss.draw_arrays(num_reals=50, mean_value=10.0, out=out, chunk_size=7)
+    assert reals2 is out
+    assert np.allclose(reals, reals2)
+    out.flush()
+    del out, reals2
+    assert np.allclose(np.load(os.path.join("temp", "specsim.npy")), reals)
+
+    # batched and one-at-a-time draws have the same statistics
+    lreals = np.log10(ss.draw_arrays(num_reals=2000, mean_value=10.0))
+    oreals = np.log10(ss.draw_arrays(num_reals=2000, mean_value=10.0, batched=False))
+    for r in [lreals, oreals]:
+        assert np.abs(r.mean() - 1.0) < 0.05
+        assert np.abs(r.var(axis=0).mean() - gs.sill) < 0.1
+        lag = np.mean((r[:, :, :-3] - 1.0) * (r[:, :, 3:] - 1.0))
+        assert np.abs(lag - np.exp(-300.0 / 500.0)) < 0.1
+
+    # the spectrum is reused
+    ss2 = pyemu.geostats.SpecSim2d(geostruct=gs, delx=delr, dely=delc)
+    assert ss2.sqrt_fftc is ss.sqrt_fftc
+
+    # grid par helper
+    names = ["p_{0}_{1}".format(i, j) for i in range(nrow) for j in range(ncol)]
+    pst = pyemu.Pst.from_par_obs_names(names, ["obs1"])
+    par = pst.parameter_data
+    par.loc[:, "partrans"] = "log"
+    par.loc[:, "parval1"] = 1.0
+    par.loc[:, "parubnd"] = 10.0
+    par.loc[:, "parlbnd"] = 0.1
+    par.loc[names[::2], "pargp"] = "gr1"
+    par.loc[names[1::2], "pargp"] = "gr2"
+    gr_df = par.loc[:, ["parnme", "pargp"]].copy()
+    gr_df.loc[:, "i"] = [int(n.split("_")[1]) for n in names]
+    gr_df.loc[:, "j"] = [int(n.split("_")[2]) for n in names]
+    pe = ss.grid_par_ensemble_helper(pst, gr_df, num_reals=500, sigma_range=4)
+    assert pe.shape == (500, len(names))
+    var = np.log10(pe.loc[:, names]).var().mean()
+    assert np.abs(var - 0.25) < 0.05, var
+    assert ss.sqrt_fftc is ss2.sqrt_fftc
+
+
+def specsim_fft_backend_test():
+    import numpy as np
+    import pyemu
+
+    for n, fast_n in [(1, 1), (7, 8), (97, 100), (564, 576)]:
+        assert pyemu.geostats.SpecSim2d.next_fast_len(n) == fast_n
+
+    delr = np.ones((35)) * 100
+    variograms = [pyemu.geostats.SphVario(contribution=1.0, a=700)]
+    gs = pyemu.geostats.GeoStruct(variograms=variograms, transform="none")
+    reals = []
+    for backend in ["numpy", "scipy"]:
+        ss = pyemu.geostats.SpecSim2d(
+            geostruct=gs, delx=delr, dely=delr, fft_backend=backend, num_threads=2
+        )
+        assert ss.fft_backend == backend
+        assert ss.sqrt_fftc.shape[0] == pyemu.geostats.SpecSim2d.next_fast_len(
+            ss.sqrt_fftc.shape[0]
+        )
+        np.random.seed(2)
+        reals.append(ss.draw_arrays(num_reals=10, mean_value=0.0))
+    assert np.allclose(reals[0], reals[1])
+    try:
+        pyemu.geostats.SpecSim2d(geostruct=gs, delx=delr, dely=delr, fft_backend="junk")
+    except Exception:
+        pass
+    else:
+        raise Exception("should have failed")
+
+
+def specsim_fft_invest():
+    import numpy as np
+    import pyemu
+    from datetime import datetime
+
+    num_reals = 100
+    variograms = [pyemu.geostats.ExpVario(contribution=1.0, a=10.0)]
+    gs = pyemu.geostats.GeoStruct(variograms=variograms, transform="log")
+    for n in [100, 250, 500, 1000]:
+        delr = np.ones((n))
+        for backend in ["numpy", "scipy"]:
+            ss = pyemu.geostats.SpecSim2d(
+                geostruct=gs, delx=delr, dely=delr, fft_backend=backend
+            )
+            start = datetime.now()
+            ss.draw_arrays(num_reals=num_reals)
+            print(
+                "{0} X {1}, {2}: {3:.3f} sec".format(
+                    n, n, backend, (datetime.now() - start).total_seconds()
+                )
+            )
+
+
 def aniso_invest():
 
     try:
@@ -1801,6 +2440,63 @@ def run_test():
         raise Exception("should have failed")
 
 
+def executor_test():
+    import os
+    import numpy as np
+    import pandas as pd
+    import pyemu
+    from pyemu.utils import os_utils
+
+    df = pd.DataFrame({"model_file": ["a.dat", "b.dat", "c.dat"],
+                       "mlt_file": ["m1.dat", np.NaN, "m3.dat"],
+                       "upper_bound": [1.0, np.NaN, 3.0]},
+                      index=["x", "y", "z"])
+    s = pd.Series([1.5, 2.5, 3.5], index=["p1", "p2", "p3"], name="parval1_trans")
+
+    # round trip through shared memory
+    for data in [df, s]:
+        shared = os_utils._SharedFrame(data)
+        try:
+            loaded = shared.load()
+        finally:
+            shared.unlink()
+        if isinstance(data, pd.Series):
+            assert loaded.name == data.name
+            assert np.all(loaded == data)
+        else:
+            assert list(loaded.columns) == list(df.columns)
+            assert pd.isna(loaded.loc["y", "mlt_file"])
+            assert loaded.loc["z", "mlt_file"] == "m3.dat"
+            assert np.isnan(loaded.loc["y", "upper_bound"])
+        assert list(loaded.index) == list(data.index)
+
+    # write input files with each executor mode, reusing the executor
+    tpl_file = os.path.join("temp", "executor_test.tpl")
+    with open(tpl_file, "w") as f:
+        f.write("ptf ~\n~p1   ~ ~p2   ~\n~p3   ~\n")
+    pst = pyemu.Pst.from_par_obs_names(["p1", "p2", "p3"], ["o1"])
+    pst.model_input_data = pd.DataFrame({"pest_file": [tpl_file],
+                                         "model_file": [tpl_file.replace(".tpl", ".dat")]},
+                                        index=[tpl_file])
+    try:
+        for mode in ["serial", "threads", "processes"]:
+            os_utils.set_executor(mode, num_workers=2)
+            for mult in [1.0, 2.0]:
+                pst.parameter_data.loc[:, "parval1"] = s.values * mult
+                pst.write_input_files()
+                arr = np.loadtxt(tpl_file.replace(".tpl", ".dat"), max_rows=1)
+                assert np.allclose(arr, s.values[:2] * mult), (mode, arr)
+            assert os_utils.get_executor() is os_utils.get_executor()
+        try:
+            os_utils.set_executor("junk")
+        except Exception:
+            pass
+        else:
+            raise Exception("should have failed")
+    finally:
+        os_utils.set_executor()
+
+
 def maha_pdc_test():
     import pyemu
     l1_critical_value = 6.4 #chi squared value at df=1,p=0.01
@@ -1828,6 +2524,10 @@ if __name__ == "__main__":
 
     #run_test()
     #specsim_test()
+    # specsim_batched_test()
+    # specsim_seed_test()
+    # specsim_fft_backend_test()
+    # specsim_fft_invest()
     #aniso_invest()
     #fieldgen_dev()
     # smp_test()
@@ -1872,6 +2572,8 @@ if __name__ == "__main__":
     # smp_to_ins_test()
     # read_pestpp_runstorage_file_test()
     # write_tpl_test()
+    # executor_test()
+    # template_file_test()
     # pp_to_shapefile_test()
     # read_pval_test()
     # read_hob_test()
@@ -1883,6 +2585,11 @@ if __name__ == "__main__":
     #ppcov_simple_sparse_test()
     #ppcov_complex_sparse_test()
     #fac2real_test()
+    # fac2real_binary_test()
+    # fac2real_ensemble_test()
+    # fac2real_nodes_test()
+    # covariance_matrix_options_test()
+    # geostat_prior_builder_blocks_test()
     # vario_test()
     # geostruct_test()
     # aniso_test()
@@ -1890,6 +2597,9 @@ if __name__ == "__main__":
     # covariance_matrix_test()
     # add_pi_obj_func_test()
     # ok_test()
+    # ok_kdtree_test()
+    # ok_mp_test()
+    # ok_cache_test()
     # ok_grid_test()
     # ok_grid_zone_test()
     # ppk2fac_verf_test()
@@ -1,6 +1,7 @@
 import os
 import copy
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import pandas as pd
 
@@ -10,6 +11,44 @@ from .pyemu_warnings import PyemuWarning
 SEED = 358183147  # from random.org on 5 Dec 2016
 
 
+def _seed_sequence(seed):
+    """private: get a `numpy.random.SeedSequence` from `seed`, which can be an
+    `int` (or list of `int`), a `numpy.random.SeedSequence` or a
+    `numpy.random.Generator`.  Returns None if `seed` is None, which means
+    the global `numpy.random` stream is used
+    """
+    if seed is None or isinstance(seed, np.random.SeedSequence):
+        return seed
+    if isinstance(seed, np.random.Generator):
+        return np.random.SeedSequence(seed.bit_generator.random_raw(4))
+    return np.random.SeedSequence(seed)
+
+
+def _child_seeds(seed_seq, end, start=0):
+    """private: the `start` through `end`-1 children of `seed_seq`.  Unlike
+    `numpy.random.SeedSequence.spawn()`, the same children are returned on
+    every call, so any child stream can be (re)generated independently
+    """
+    return [
+        np.random.SeedSequence(
+            seed_seq.entropy,
+            spawn_key=tuple(seed_seq.spawn_key) + (i,),
+            pool_size=seed_seq.pool_size,
+        )
+        for i in range(start, end)
+    ]
+
+
+def _standard_normal(seed_seq, start, end, size):
+    """private: standard normal deviates for realizations `start` through
+    `end`-1, each realization drawn from its own child stream of `seed_seq`
+    """
+    snv = np.empty((end - start, size))
+    for i, child in enumerate(_child_seeds(seed_seq, end, start)):
+        snv[i, :] = np.random.default_rng(child).standard_normal(size)
+    return snv
+
+
 class Loc(object):
     """thin wrapper around `pandas.DataFrame.loc` to make sure returned type
     is `Ensemble` (instead of `pandas.DataFrame)`
@@ -390,11 +429,19 @@ class Ensemble(object):
 
     @staticmethod
     def _gaussian_draw(
-        cov, mean_values, num_reals, grouper=None, fill=True, factor="eigen"
+        cov,
+        mean_values,
+        num_reals,
+        grouper=None,
+        fill=True,
+        factor="eigen",
+        chunk=None,
+        num_workers=None,
+        seed=None,
     ):
 
         factor = factor.lower()
-        if factor not in ["eigen", "svd"]:
+        if factor not in ["eigen", "svd", "cholesky", "lowrank"]:
             raise Exception(
                 "Ensemble._gaussian_draw() error: unrecognized"
                 + "'factor': {0}".format(factor)
@@ -408,77 +455,205 @@ class Ensemble(object):
                 "Ensemble._gaussian_draw() error: the following cov names are not in "
                 "mean_values: {0}".format(",".join(missing))
             )
+        # realizations are drawn in chunks of rows - the standard normal
+        # deviates are generated in the same order regardless of chunk size.
+        # With a seed, stream 0 is for the ungrouped draws and stream i + 1 is
+        # for group i, and each realization has a child stream of its own
+        seed_seq = _seed_sequence(seed)
+
+        def stream(i):
+            if seed_seq is None:
+                return None
+            return _child_seeds(seed_seq, i + 1, i)[0]
+
+        if chunk is None:
+            chunk = num_reals
+        chunk = max(1, int(chunk))
+        chunks = [
+            (start, min(num_reals, start + chunk))
+            for start in range(0, num_reals, chunk)
+        ]
+        mv_values = mean_values.values.astype(float)
+        reals = np.zeros((num_reals, mean_values.shape[0]))
+        reals[:, :] = np.NaN
+        if fill:
+            reals[:, :] = mv_values
+        mv_map = {
+            n: i for n, i in zip(mean_values.index, np.arange(mean_values.shape[0]))
+        }
         if cov.isdiagonal:
             stds = {
                 name: std for name, std in zip(cov.row_names, np.sqrt(cov.x.flatten()))
             }
-            snv = np.random.randn(num_reals, mean_values.shape[0])
-            reals = np.zeros_like(snv)
-            reals[:, :] = np.NaN
-            for i, name in enumerate(mean_values.index):
-                if name in cov_names:
-                    reals[:, i] = (snv[:, i] * stds[name]) + mean_values.loc[name]
-                elif fill:
-                    reals[:, i] = mean_values.loc[name]
+            idxs = np.array(
+                [i for i, name in enumerate(mean_values.index) if name in cov_names],
+                dtype=int,
+            )
+            std = np.array([stds[mean_values.index[i]] for i in idxs])
+            mean = mv_values[idxs]
+            for start, end in chunks:
+                if seed_seq is None:
+                    snv = np.random.randn(end - start, mean_values.shape[0])[:, idxs]
+                else:
+                    snv = _standard_normal(stream(0), start, end, idxs.shape[0])
+                reals[start:end, idxs] = (snv * std) + mean
         else:
-            reals = np.zeros((num_reals, mean_values.shape[0]))
-            reals[:, :] = np.NaN
-            if fill:
-                for i, v in enumerate(mean_values.values):
-                    reals[:, i] = v
-            cov_map = {n: i for n, i in zip(cov.row_names, np.arange(cov.shape[0]))}
-            mv_map = {
-                n: i for n, i in zip(mean_values.index, np.arange(mean_values.shape[0]))
-            }
+            if grouper is None and cov.issparse:
+                # draw each independent block of a (block-diagonal) sparse cov
+                # separately, uncorrelated elements are drawn together
+                blocks = pyemu.mat.mat_handler._sparse_blocks(cov.x)
+                single = np.array([b[0] for b in blocks if b.shape[0] == 1], dtype=int)
+                if single.shape[0] > 0:
+                    names = [cov.row_names[i] for i in single]
+                    std = np.sqrt(cov.x.diagonal()[single])
+                    Ensemble._draw_group(
+                        reals, chunks, names, mv_map, mv_values, std=std, rng=stream(0)
+                    )
+                grouper = {
+                    "block_{0}".format(i): [cov.row_names[j] for j in b]
+                    for i, b in enumerate(blocks)
+                    if b.shape[0] > 1
+                }
+            # factors are memoized on cov for repeated draws
+            factors = cov._factor_cache()
             if grouper is not None:
-
-                for grp_name, names in grouper.items():
+                # groups are independent: each group draws from its own
+                # random stream (seeded from `seed` or the global stream) so
+                # the realizations do not depend on the number of workers
+                grp_items = list(grouper.items())
+                if seed_seq is None:
+                    seeds = np.random.randint(0, 2 ** 31 - 1, size=len(grp_items))
+                    rngs = [np.random.RandomState(s) for s in seeds]
+                else:
+                    rngs = _child_seeds(seed_seq, len(grp_items) + 1, 1)
+
+                def draw_grp(grp_name, names, rng):
                     print("drawing from group", grp_name)
-                    idxs = [mv_map[name] for name in names]
-                    snv = np.random.randn(num_reals, len(names))
-                    cov_grp = cov.get(names)
                     if len(names) == 1:
-                        std = np.sqrt(cov_grp.x)
-                        reals[:, idxs] = mean_values.loc[names].values[0] + (snv * std)
-                    else:
-                        if factor == "eigen":
-                            try:
-                                cov_grp.inv
-                            except:
-                                covname = "trouble_{0}.cov".format(grp_name)
-                                cov_grp.to_ascii(covname)
-                                raise Exception(
-                                    "error inverting cov for group '{0}',"
-                                    + "saved trouble cov to {1}".format(
-                                        grp_name, covname
-                                    )
-                                )
-
-                            a, i = Ensemble._get_eigen_projection_matrix(cov_grp.as_2d)
-                        elif factor == "svd":
-                            a, i = Ensemble._get_svd_projection_matrix(cov_grp.as_2d)
-                            snv[:, i:] = 0.0
-                        # process each realization
-                        group_mean_values = mean_values.loc[names]
-                        for i in range(num_reals):
-                            reals[i, idxs] = group_mean_values + np.dot(a, snv[i, :])
+                        std = np.sqrt(cov.get(names).as_2d[0])
+                        Ensemble._draw_group(
+                            reals, chunks, names, mv_map, mv_values, std=std, rng=rng
+                        )
+                        return
+                    a, std = Ensemble._get_projection(
+                        cov, names, factor, factors, grp_name=grp_name
+                    )
+                    Ensemble._draw_group(
+                        reals,
+                        chunks,
+                        names,
+                        mv_map,
+                        mv_values,
+                        std=std,
+                        proj=a,
+                        rng=rng,
+                    )
+
+                if num_workers is None or num_workers < 2 or len(grp_items) < 2:
+                    for (grp_name, names), rng in zip(grp_items, rngs):
+                        draw_grp(grp_name, names, rng)
+                else:
+                    # threads since the factorizations and products release
+                    # the GIL and each group fills its own columns of reals
+                    with ThreadPoolExecutor(
+                        max_workers=min(num_workers, len(grp_items))
+                    ) as pool:
+                        futures = [
+                            pool.submit(draw_grp, grp_name, names, rng)
+                            for (grp_name, names), rng in zip(grp_items, rngs)
+                        ]
+                        for f in futures:
+                            f.result()
 
             else:
-                snv = np.random.randn(num_reals, cov.shape[0])
-                if factor == "eigen":
-                    a, i = Ensemble._get_eigen_projection_matrix(cov.as_2d)
-                elif factor == "svd":
-                    a, i = Ensemble._get_svd_projection_matrix(cov.as_2d)
-                    snv[:, i:] = 0.0
-                cov_mean_values = mean_values.loc[cov.row_names].values
-                idxs = [mv_map[name] for name in cov.row_names]
-                for i in range(num_reals):
-                    reals[i, idxs] = cov_mean_values + np.dot(a, snv[i, :])
+                a, std = Ensemble._get_projection(cov, None, factor, factors)
+                Ensemble._draw_group(
+                    reals,
+                    chunks,
+                    cov.row_names,
+                    mv_map,
+                    mv_values,
+                    std=std,
+                    proj=a,
+                    rng=stream(0),
+                )
 
         df = pd.DataFrame(reals, columns=mean_values.index.values)
         df.dropna(inplace=True, axis=1)
         return df
 
+    @staticmethod
+    def _draw_group(
+        reals, chunks, names, mv_map, mv_values, std=None, proj=None, rng=None
+    ):
+        """private: draw the `names` columns of `reals` (in place), one chunk
+        of realizations at a time.  Uncorrelated draws use `std`, correlated
+        draws use the projection matrix `proj` (one column per leading standard
+        normal deviate) plus, if `std` is also passed, an independent residual
+        with standard deviations `std`.  Standard normal deviates come from
+        `rng`: a `np.random.RandomState`, a `np.random.SeedSequence` (one child
+        stream per realization) or the global stream if None
+        """
+        if rng is None:
+            rng = np.random
+        idxs = np.array([mv_map[name] for name in names], dtype=int)
+        mean = mv_values[idxs]
+        nsnv = idxs.shape[0]
+        if proj is not None and std is not None:
+            nsnv *= 2
+        for start, end in chunks:
+            if isinstance(rng, np.random.SeedSequence):
+                snv = _standard_normal(rng, start, end, nsnv)
+            else:
+                snv = rng.randn(end - start, nsnv)
+            if proj is None:
+                reals[start:end, idxs] = mean + (snv * std)
+                continue
+            # all realizations of the chunk with one matrix-matrix product
+            draws = mean + np.dot(snv[:, : proj.shape[1]], proj.T)
+            if std is not None:
+                draws += snv[:, idxs.shape[0] :] * std
+            reals[start:end, idxs] = draws
+
+    @staticmethod
+    def _get_projection(cov, names, factor, factors, grp_name=None):
+        """private: get the (memoized) projection matrix and residual standard
+        deviations (None unless `factor` is "lowrank") of `cov` or of the
+        `names` block of `cov`
+        """
+        key = (factor, None if names is None else tuple(names))
+        if key in factors:
+            return factors[key]
+        cov_grp = cov if names is None else cov.get(names)
+        std = None
+        # the factorization itself is the check that the (group) cov is valid:
+        # for groups, the eigen and cholesky factorizations fail on indefinite
+        # cov matrices
+        check = grp_name is not None
+        try:
+            x = cov_grp.as_2d
+            if not np.all(np.isfinite(x)):
+                raise Exception("non-finite values in cov")
+            if factor == "eigen":
+                a, i = Ensemble._get_eigen_projection_matrix(x, check=check)
+            elif factor == "svd":
+                a, i = Ensemble._get_svd_projection_matrix(x)
+            elif factor == "cholesky":
+                a = Ensemble._get_cholesky_projection_matrix(x, check=check)
+            elif factor == "lowrank":
+                a, std = Ensemble._get_lowrank_projection_matrix(x)
+        except Exception as e:
+            if grp_name is None:
+                raise
+            covname = "trouble_{0}.cov".format(grp_name)
+            cov_grp.to_ascii(covname)
+            raise Exception(
+                "error factorizing cov for group '{0}': {1}, "
+                "saved trouble cov to {2}".format(grp_name, str(e), covname)
+            )
+        factors[key] = (a, std)
+        return a, std
+
     @staticmethod
     def _get_svd_projection_matrix(x, maxsing=None, eigthresh=1.0e-7):
         if x.shape[0] != x.shape[1]:
@@ -488,48 +663,109 @@ class Ensemble(object):
 
         if maxsing is None:
             maxsing = pyemu.Matrix.get_maxsing_from_s(s, eigthresh=eigthresh)
-        u = u[:, :maxsing]
-        s = s[:maxsing]
-        v = v[:, :maxsing]
-
-        # fill in full size svd component matrices
-        s_full = np.zeros(x.shape)
-        s_full[: s.shape[0], : s.shape[1]] = np.sqrt(
-            s
-        )  # sqrt since sing vals are eigvals**2
-        v_full = np.zeros_like(s_full)
-        v_full[: v.shape[0], : v.shape[1]] = v
-        # form the projection matrix
-        proj = np.dot(v_full, s_full)
+        # form the projection matrix from the leading maxsing components
+        # sqrt since sing vals are eigvals**2
+        proj = v[:, :maxsing] * np.sqrt(s[:maxsing])
         return proj, maxsing
 
     @staticmethod
-    def _get_eigen_projection_matrix(x):
+    def _get_eigen_projection_matrix(x, check=False):
         # eigen factorization
         v, w = np.linalg.eigh(x)
+        if check:
+            if not np.all(np.isfinite(v)):
+                raise Exception("non-finite eigen values")
+            # (nearly) singular cov matrices are fine, only fail on eigen
+            # values that are clearly negative rather than rounding noise
+            if v.min() < -1.0e-8 * np.abs(v).max():
+                raise Exception(
+                    "cov is indefinite, smallest eigen value: {0}".format(v.min())
+                )
 
         # check for near zero eig values
-        for i in range(v.shape[0]):
-            if v[i] > 1.0e-10:
-                pass
-            else:
-                print(
-                    "near zero eigen value found",
-                    v[i],
-                    "at index",
-                    i,
-                    " of ",
-                    v.shape[0],
-                )
-                v[i] = 0.0
+        for i in np.flatnonzero(v <= 1.0e-10):
+            print(
+                "near zero eigen value found",
+                v[i],
+                "at index",
+                i,
+                " of ",
+                v.shape[0],
+            )
+        v[v <= 1.0e-10] = 0.0
 
         # form the projection matrix
-        vsqrt = np.sqrt(v)
-        vsqrt[i + 1 :] = 0.0
-        v = np.diag(vsqrt)
-        a = np.dot(w, v)
+        a = w * np.sqrt(v)
+
+        return a, v.shape[0] - 1
+
+    @staticmethod
+    def _get_cholesky_projection_matrix(x, check=False):
+        """private: the lower cholesky factor of `x`.  If `x` is not positive
+        definite, an increasing diagonal jitter is tried before falling back
+        to the eigen projection matrix.  If `check` is True, a factorization
+        that fails even with the largest jitter raises instead
+        """
+        scale = np.abs(np.diag(x)).mean()
+        if scale == 0.0:
+            scale = 1.0
+        for jitter in [0.0, 1.0e-10, 1.0e-8, 1.0e-6, 1.0e-4]:
+            xx = x
+            if jitter > 0.0:
+                xx = x + (np.eye(x.shape[0]) * jitter * scale)
+            try:
+                proj = np.linalg.cholesky(xx)
+            except np.linalg.LinAlgError:
+                continue
+            if jitter > 0.0:
+                warnings.warn(
+                    "cholesky factor required a diagonal jitter of {0}".format(
+                        jitter * scale
+                    ),
+                    PyemuWarning,
+                )
+            return proj
+        if check:
+            raise Exception(
+                "cholesky factorization failed, cov is not positive definite"
+            )
+        warnings.warn(
+            "cholesky factorization failed, using eigen factorization instead",
+            PyemuWarning,
+        )
+        return Ensemble._get_eigen_projection_matrix(x)[0]
 
-        return a, i
+    @staticmethod
+    def _get_lowrank_projection_matrix(x, eigthresh=1.0e-3, rank=64):
+        """private: a truncated projection matrix of `x` from a randomized
+        eigen decomposition plus the residual standard deviations that
+        preserve the diagonal of `x`.  The rank is doubled until the smallest
+        retained eigen value is less than `eigthresh` times the largest.
+        """
+        n = x.shape[0]
+        # a fixed seed so the factor is repeatable (and can be memoized)
+        rs = np.random.RandomState(0)
+        rank = min(rank, n)
+        while True:
+            if 2 * rank >= n:
+                return Ensemble._get_eigen_projection_matrix(x)[0], None
+            nsample = min(n, rank + 10)
+            y = np.dot(x, rs.randn(n, nsample))
+            # power iterations for a sharper range estimate
+            for _ in range(2):
+                q, _ = np.linalg.qr(y)
+                y = np.dot(x, q)
+            q, _ = np.linalg.qr(y)
+            v, w = np.linalg.eigh(np.dot(q.T, np.dot(x, q)))
+            v, w = v[::-1], w[:, ::-1]
+            v[v < 0.0] = 0.0
+            if v[rank - 1] <= eigthresh * v[0]:
+                break
+            rank *= 2
+        proj = np.dot(q, w[:, :rank]) * np.sqrt(v[:rank])
+        resid = np.diag(x) - (proj ** 2).sum(axis=1)
+        resid[resid < 0.0] = 0.0
+        return proj, np.sqrt(resid)
 
     def get_deviations(self, center_on=None):
         """get the deviations of the realizations around a certain
@@ -658,7 +894,16 @@ class ObservationEnsemble(Ensemble):
 
     @classmethod
     def from_gaussian_draw(
-        cls, pst, cov=None, num_reals=100, by_groups=True, fill=False, factor="eigen"
+        cls,
+        pst,
+        cov=None,
+        num_reals=100,
+        by_groups=True,
+        fill=False,
+        factor="eigen",
+        chunk=None,
+        num_workers=None,
+        seed=None,
     ):
         """generate an `ObservationEnsemble` from a (multivariate) gaussian
         distribution
@@ -677,9 +922,32 @@ class ObservationEnsemble(Ensemble):
             fill (`bool`): flag to fill in zero-weighted observations with control file
                 values.  Default is False.
             factor (`str`): how to factorize `cov` to form the projectin matrix.  Can
-                be "eigen" or "svd". The "eigen" option is default and is faster.  But
-                for (nearly) singular cov matrices (such as those generated empirically
-                from ensembles), "svd" is the only way.  Ignored for diagonal `cov`.
+                be "eigen", "svd", "cholesky" or "lowrank". The "eigen" option is default
+                and is faster than "svd".  But for (nearly) singular cov matrices (such as
+                those generated empirically from ensembles), "svd" is the only way.
+                "cholesky" is the fastest option for well-conditioned `cov` (a small
+                diagonal jitter is added if needed; for group draws, a factorization
+                that fails even with the jitter raises).  "lowrank" uses a truncated randomized
+                eigen decomposition (plus an independent residual that preserves the
+                variances) for very large, smoothly-correlated `cov`. Ignored for
+                diagonal `cov`.  Factors are memoized on `cov`, so repeated draws from
+                the same `cov` skip the factorization.
+            chunk (`int`): number of realizations to draw at a time.  Smaller chunks
+                reduce the peak memory used to draw realizations.  If None, all
+                realizations are drawn at once.  Default is None
+            num_workers (`int`): number of threads used to factorize and draw the
+                groups when `by_groups` is True.  Each group draws from its own
+                random stream, so the realizations do not depend on `num_workers`.
+                If None, groups are drawn serially.  Default is None.  Note: the
+                per-group streams are used even if `num_workers` is None, so draws
+                with `by_groups` True (and a non-diagonal `cov`) differ from those of
+                pyemu versions that drew all groups from the global stream, even
+                with the same `numpy.random.seed()`
+            seed (`int`, `numpy.random.SeedSequence` or `numpy.random.Generator`): seed
+                for reproducible draws.  Each realization (and group) is drawn from its
+                own child stream of `seed`, so the realizations are the same for any
+                `chunk` and `num_workers`.  If None, the global `numpy.random` stream is
+                used.  Default is None
 
         Returns:
             `ObservationEnsemble`: the realized `ObservationEnsemble` instance
@@ -734,6 +1002,9 @@ class ObservationEnsemble(Ensemble):
             grouper=grouper,
             fill=fill,
             factor=factor,
+            chunk=chunk,
+            num_workers=num_workers,
+            seed=seed,
         )
         if fill:
             df.loc[:, pst.zero_weight_obs_names] = pst.observation_data.loc[
@@ -814,12 +1085,25 @@ class ParameterEnsemble(Ensemble):
 
     """
 
+    # max number of values (realizations x parameters) processed together
+    # by the "scale" and "drop" bounds enforcement
+    enforce_max_points = 2 ** 24
+
     def __init__(self, pst, df, istransformed=False):
         super(ParameterEnsemble, self).__init__(pst, df, istransformed)
 
     @classmethod
     def from_gaussian_draw(
-        cls, pst, cov=None, num_reals=100, by_groups=True, fill=True, factor="eigen"
+        cls,
+        pst,
+        cov=None,
+        num_reals=100,
+        by_groups=True,
+        fill=True,
+        factor="eigen",
+        chunk=None,
+        num_workers=None,
+        seed=None,
     ):
         """generate a `ParameterEnsemble` from a (multivariate) (log) gaussian
         distribution
@@ -840,9 +1124,32 @@ class ParameterEnsemble(Ensemble):
             fill (`bool`): flag to fill in fixed and/or tied parameters with control file
                 values.  Default is True.
             factor (`str`): how to factorize `cov` to form the projectin matrix.  Can
-                be "eigen" or "svd". The "eigen" option is default and is faster.  But
-                for (nearly) singular cov matrices (such as those generated empirically
-                from ensembles), "svd" is the only way.  Ignored for diagonal `cov`.
+                be "eigen", "svd", "cholesky" or "lowrank". The "eigen" option is default
+                and is faster than "svd".  But for (nearly) singular cov matrices (such as
+                those generated empirically from ensembles), "svd" is the only way.
+                "cholesky" is the fastest option for well-conditioned `cov` (a small
+                diagonal jitter is added if needed; for group draws, a factorization
+                that fails even with the jitter raises).  "lowrank" uses a truncated randomized
+                eigen decomposition (plus an independent residual that preserves the
+                variances) for very large, smoothly-correlated `cov`. Ignored for
+                diagonal `cov`.  Factors are memoized on `cov`, so repeated draws from
+                the same `cov` skip the factorization.
+            chunk (`int`): number of realizations to draw at a time.  Smaller chunks
+                reduce the peak memory used to draw realizations.  If None, all
+                realizations are drawn at once.  Default is None
+            num_workers (`int`): number of threads used to factorize and draw the
+                groups when `by_groups` is True.  Each group draws from its own
+                random stream, so the realizations do not depend on `num_workers`.
+                If None, groups are drawn serially.  Default is None.  Note: the
+                per-group streams are used even if `num_workers` is None, so draws
+                with `by_groups` True (and a non-diagonal `cov`) differ from those of
+                pyemu versions that drew all groups from the global stream, even
+                with the same `numpy.random.seed()`
+            seed (`int`, `numpy.random.SeedSequence` or `numpy.random.Generator`): seed
+                for reproducible draws.  Each realization (and group) is drawn from its
+                own child stream of `seed`, so the realizations are the same for any
+                `chunk` and `num_workers`.  If None, the global `numpy.random` stream is
+                used.  Default is None
 
         Returns:
             `ParameterEnsemble`: the parameter ensemble realized from the gaussian
@@ -890,12 +1197,16 @@ class ParameterEnsemble(Ensemble):
             num_reals=num_reals,
             grouper=grouper,
             fill=fill,
+            factor=factor,
+            chunk=chunk,
+            num_workers=num_workers,
+            seed=seed,
         )
         df.loc[:, li] = 10.0 ** df.loc[:, li]
         return cls(pst, df, istransformed=False)
 
     @classmethod
-    def from_triangular_draw(cls, pst, num_reals=100, fill=True):
+    def from_triangular_draw(cls, pst, num_reals=100, fill=True, seed=None):
         """generate a `ParameterEnsemble` from a (multivariate) (log) triangular distribution
 
         Args:
@@ -903,6 +1214,10 @@ class ParameterEnsemble(Ensemble):
             num_reals (`int`, optional): number of realizations to generate.  Default is 100
             fill (`bool`): flag to fill in fixed and/or tied parameters with control file
                 values.  Default is True.
+            seed (`int`, `numpy.random.SeedSequence` or `numpy.random.Generator`): seed
+                for reproducible draws.  Each realization is drawn from its own child
+                stream of `seed`.  If None, the global `numpy.random` stream is used.
+                Default is None
 
         Returns:
             `ParameterEnsemble`: a parameter ensemble drawn from the multivariate (log) triangular
@@ -941,6 +1256,7 @@ class ParameterEnsemble(Ensemble):
         # set up some column names
         # real_names = ["{0:d}".format(i)
         #              for i in range(num_reals)]
+        seed_seq = _seed_sequence(seed)
         real_names = np.arange(num_reals, dtype=np.int64)
         arr = np.empty((num_reals, len(ub)))
         arr[:, :] = np.NaN
@@ -948,13 +1264,22 @@ class ParameterEnsemble(Ensemble):
         for i, pname in enumerate(pst.parameter_data.parnme):
             # print(pname, lb[pname], ub[pname])
             if pname in adj_par_names:
-                arr[:, i] = np.random.triangular(
-                    lb[pname], pv[pname], ub[pname], size=num_reals
-                )
+                if seed_seq is None:
+                    arr[:, i] = np.random.triangular(
+                        lb[pname], pv[pname], ub[pname], size=num_reals
+                    )
             elif fill:
                 arr[:, i] = (
                     np.zeros((num_reals)) + pst.parameter_data.loc[pname, "parval1"]
                 )
+        if seed_seq is not None:
+            idxs, names = ParameterEnsemble._adj_idxs(pst)
+            left = np.array([lb[pname] for pname in names])
+            mode = np.array([pv[pname] for pname in names])
+            right = np.array([ub[pname] for pname in names])
+            for ireal, child in enumerate(_child_seeds(seed_seq, num_reals)):
+                rng = np.random.default_rng(child)
+                arr[ireal, idxs] = rng.triangular(left, mode, right)
 
         df = pd.DataFrame(arr, index=real_names, columns=pst.par_names)
         df.dropna(inplace=True, axis=1)
@@ -963,7 +1288,7 @@ class ParameterEnsemble(Ensemble):
         return new_pe
 
     @classmethod
-    def from_uniform_draw(cls, pst, num_reals, fill=True):
+    def from_uniform_draw(cls, pst, num_reals, fill=True, seed=None):
         """generate a `ParameterEnsemble` from a (multivariate) (log) uniform
         distribution
 
@@ -972,6 +1297,10 @@ class ParameterEnsemble(Ensemble):
             num_reals (`int`, optional): number of realizations to generate.  Default is 100
             fill (`bool`): flag to fill in fixed and/or tied parameters with control file
                 values.  Default is True.
+            seed (`int`, `numpy.random.SeedSequence` or `numpy.random.Generator`): seed
+                for reproducible draws.  Each realization is drawn from its own child
+                stream of `seed`.  If None, the global `numpy.random` stream is used.
+                Default is None
 
         Returns:
             `ParameterEnsemble`: a parameter ensemble drawn from the multivariate (log) uniform
@@ -1001,6 +1330,7 @@ class ParameterEnsemble(Ensemble):
         lb.loc[li] = lb.loc[li].apply(np.log10)
         lb = lb.to_dict()
 
+        seed_seq = _seed_sequence(seed)
         real_names = np.arange(num_reals, dtype=np.int64)
         arr = np.empty((num_reals, len(ub)))
         arr[:, :] = np.NaN
@@ -1008,11 +1338,19 @@ class ParameterEnsemble(Ensemble):
         for i, pname in enumerate(pst.parameter_data.parnme):
             # print(pname,lb[pname],ub[pname])
             if pname in adj_par_names:
-                arr[:, i] = np.random.uniform(lb[pname], ub[pname], size=num_reals)
+                if seed_seq is None:
+                    arr[:, i] = np.random.uniform(lb[pname], ub[pname], size=num_reals)
             elif fill:
                 arr[:, i] = (
                     np.zeros((num_reals)) + pst.parameter_data.loc[pname, "parval1"]
                 )
+        if seed_seq is not None:
+            idxs, names = ParameterEnsemble._adj_idxs(pst)
+            low = np.array([lb[pname] for pname in names])
+            high = np.array([ub[pname] for pname in names])
+            for ireal, child in enumerate(_child_seeds(seed_seq, num_reals)):
+                rng = np.random.default_rng(child)
+                arr[ireal, idxs] = rng.uniform(low, high)
 
         df = pd.DataFrame(arr, index=real_names, columns=pst.par_names)
         df.dropna(inplace=True, axis=1)
@@ -1021,6 +1359,22 @@ class ParameterEnsemble(Ensemble):
         new_pe = cls(pst=pst, df=df)
         return new_pe
 
+    @staticmethod
+    def _adj_idxs(pst):
+        """private: the positions and names of the adjustable parameters in
+        `pst.parameter_data`
+        """
+        adj_par_names = set(pst.adj_par_names)
+        idxs = np.array(
+            [
+                i
+                for i, pname in enumerate(pst.parameter_data.parnme)
+                if pname in adj_par_names
+            ],
+            dtype=int,
+        )
+        return idxs, pst.parameter_data.parnme.values[idxs]
+
     @classmethod
     def from_mixed_draws(
         cls,
@@ -1033,6 +1387,7 @@ class ParameterEnsemble(Ensemble):
         enforce_bounds=True,
         partial=False,
         fill=True,
+        seed=None,
     ):
         """generate a `ParameterEnsemble` using a mixture of
         distributions.  Available distributions include (log) "uniform", (log) "triangular",
@@ -1058,6 +1413,10 @@ class ParameterEnsemble(Ensemble):
                 Default is `False`.
             fill (`bool`): flag to fill in fixed and/or tied parameters with control file
                 values.  Default is True.
+            seed (`int`, `numpy.random.SeedSequence` or `numpy.random.Generator`): seed
+                for reproducible draws.  The gaussian, uniform and triangular draws each
+                use their own child stream of `seed`.  If None, the global `numpy.random`
+                stream is used.  Default is None
 
         """
 
@@ -1102,6 +1461,10 @@ class ParameterEnsemble(Ensemble):
         for pname, how in how_dict.items():
             how_groups[how].append(pname)
 
+        seed_seq = _seed_sequence(seed)
+        seeds = [None] * 3
+        if seed_seq is not None:
+            seeds = _child_seeds(seed_seq, 3)
         # gaussian
         pes = []
         if len(how_groups["gaussian"]) > 0:
@@ -1125,7 +1488,7 @@ class ParameterEnsemble(Ensemble):
 
                 cov = pyemu.Cov.from_parameter_data(pst, sigma_range=sigma_range)
             pe_gauss = ParameterEnsemble.from_gaussian_draw(
-                pst, cov, num_reals=num_reals
+                pst, cov, num_reals=num_reals, seed=seeds[0]
             )
             pes.append(pe_gauss)
 
@@ -1134,7 +1497,9 @@ class ParameterEnsemble(Ensemble):
             # par_uniform.sort_values(by="parnme",inplace=True)
             par_uniform.sort_index(inplace=True)
             pst.parameter_data = par_uniform
-            pe_uniform = ParameterEnsemble.from_uniform_draw(pst, num_reals=num_reals)
+            pe_uniform = ParameterEnsemble.from_uniform_draw(
+                pst, num_reals=num_reals, seed=seeds[1]
+            )
             pes.append(pe_uniform)
 
         if len(how_groups["triangular"]) > 0:
@@ -1142,7 +1507,9 @@ class ParameterEnsemble(Ensemble):
             # par_tri.sort_values(by="parnme", inplace=True)
             par_tri.sort_index(inplace=True)
             pst.parameter_data = par_tri
-            pe_tri = ParameterEnsemble.from_triangular_draw(pst, num_reals=num_reals)
+            pe_tri = ParameterEnsemble.from_triangular_draw(
+                pst, num_reals=num_reals, seed=seeds[2]
+            )
             pes.append(pe_tri)
 
         df = pd.DataFrame(index=np.arange(num_reals), columns=par_org.parnme.values)
@@ -1448,14 +1815,22 @@ class ParameterEnsemble(Ensemble):
         draw method(s), so users shouldn't need to call this
 
         Args:
-            enforce_bounds (`str`): can be 'reset' to reset offending values or 'drop' to drop
-                offending realizations
+            how (`str`): can be 'reset' to reset offending values, 'drop' to drop
+                offending realizations or 'scale' to shrink offending realizations
+                towards `parval1` until they are within bounds
+            bound_tol (`float`): fractional distance inside the bounds to enforce.
+                Default is 0.0
+
+        Returns:
+            `pandas.DataFrame`: for 'drop' and 'scale', a summary of the offending
+            realizations (see `ParameterEnsemble._enforce_drop()` and
+            `ParameterEnsemble._enforce_scale()`).  None for 'reset'
 
         Example::
 
             pst = pyemu.Pst("my.pst")
             pe = pyemu.ParameterEnsemble.from_gaussian_draw()
-            pe.enforce(how="scale)
+            summary = pe.enforce(how="scale")
             pe.to_csv("par.csv")
 
 
@@ -1464,89 +1839,120 @@ class ParameterEnsemble(Ensemble):
         if how.lower().strip() == "reset":
             self._enforce_reset(bound_tol=bound_tol)
         elif how.lower().strip() == "drop":
-            self._enforce_drop(bound_tol=bound_tol)
+            return self._enforce_drop(bound_tol=bound_tol)
         elif how.lower().strip() == "scale":
-            self._enforce_scale(bound_tol=bound_tol)
+            return self._enforce_scale(bound_tol=bound_tol)
         else:
             raise Exception(
                 "unrecognized enforce_bounds arg:"
-                + "{0}, should be 'reset' or 'drop'".format(enforce_bounds)
+                + "{0}, should be 'reset', 'drop' or 'scale'".format(how)
             )
 
+    def _enforce_blocks(self):
+        """private: (start,end) row blocks of at most
+        `ParameterEnsemble.enforce_max_points` values
+        """
+        nrow = max(1, int(self.enforce_max_points // max(1, self._df.shape[1])))
+        return [
+            (start, min(self._df.shape[0], start + nrow))
+            for start in range(0, self._df.shape[0], nrow)
+        ]
+
     def _enforce_scale(self, bound_tol):
+        """enforce parameter bounds on the ensemble by scaling the deviation
+        of each violating realization from `parval1` so that the controlling
+        (most violating) parameter is at its bound
+
+        Returns:
+            `pandas.DataFrame`: a summary of the scaled realizations, indexed
+            by realization name, with the scale factor, the controlling parameter
+            name, its bound ("ubnd" or "lbnd") and (unscaled) value and the number
+            of parameters that were out of bounds
+
+        """
         retrans = False
         if self.istransformed:
             self.back_transform()
             retrans = True
-        ub = self.ubnd * (1.0 - bound_tol)
-        lb = self.lbnd * (1.0 + bound_tol)
-        base_vals = self.pst.parameter_data.loc[self._df.columns, "parval1"].copy()
-        ub_dist = (ub - base_vals).apply(np.abs)
-        lb_dist = (base_vals - lb).apply(np.abs)
+        names = self._df.columns
+        ub = (self.ubnd * (1.0 - bound_tol)).loc[names].values
+        lb = (self.lbnd * (1.0 + bound_tol)).loc[names].values
+        base_vals = self.pst.parameter_data.loc[names, "parval1"].values.astype(float)
+        ub_dist = np.abs(ub - base_vals)
+        lb_dist = np.abs(base_vals - lb)
 
         if ub_dist.min() <= 0.0:
             raise Exception(
                 "Ensemble._enforce_scale() error: the following parameter"
-                + "are at or over ubnd: {0}".format(
-                    ub_dist.loc[ub_dist <= 0.0].index.values
-                )
+                + "are at or over ubnd: {0}".format(names[ub_dist <= 0.0].values)
             )
         if lb_dist.min() <= 0.0:
             raise Exception(
                 "Ensemble._enforce_scale() error: the following parameter"
-                + "are at or under lbnd: {0}".format(
-                    lb_dist.loc[ub_dist <= 0.0].index.values
-                )
+                + "are at or under lbnd: {0}".format(names[lb_dist <= 0.0].values)
             )
-        for ridx in self._df.index:
-            real = self._df.loc[ridx, :]
-            real_dist = (real - base_vals).apply(np.abs)
-            out_ubnd = real - ub
-            out_ubnd = out_ubnd.loc[out_ubnd > 0.0]
-            ubnd_facs = ub_dist.loc[out_ubnd.index] / real_dist.loc[out_ubnd.index]
-
-            out_lbnd = lb - real
-            out_lbnd = out_lbnd.loc[out_lbnd > 0.0]
-            lbnd_facs = lb_dist.loc[out_lbnd.index] / real_dist.loc[out_lbnd.index]
-
-            if ubnd_facs.shape[0] == 0 and lbnd_facs.shape[0] == 0:
+        vals = self._df.values.astype(float)
+        rows, facs, imins, nouts = [], [], [], []
+        for start, end in self._enforce_blocks():
+            block = vals[start:end]
+            dev = block - base_vals
+            out_ubnd = block > ub
+            out_lbnd = block < lb
+            # the scale factor that puts each offending value at its bound
+            fac = np.full(block.shape, np.inf)
+            np.divide(ub_dist, np.abs(dev), out=fac, where=out_ubnd)
+            np.divide(lb_dist, np.abs(dev), out=fac, where=out_lbnd)
+            imin = fac.argmin(axis=1)
+            min_fac = fac[np.arange(block.shape[0]), imin]
+            scale = np.flatnonzero(np.isfinite(min_fac))
+            if scale.shape[0] == 0:
                 continue
-            lmin = 1.0
-            umin = 1.0
-            sign = np.ones((self.pst.npar_adj))
-            sign[
-                real.loc[self.pst.adj_par_names] < base_vals.loc[self.pst.adj_par_names]
-            ] = -1.0
-            if ubnd_facs.shape[0] > 0:
-                umin = ubnd_facs.min()
-                umin_idx = ubnd_facs.idxmin()
-                print(
-                    "enforce_scale ubnd controlling parameter, scale factor, "
-                    + "current value for realization {0}: {1}, {2}, {3}".format(
-                        ridx, umin_idx, umin, real.loc[umin_idx]
-                    )
-                )
-
-            if lbnd_facs.shape[0] > 0:
-                lmin = lbnd_facs.min()
-                lmin_idx = lbnd_facs.idxmin()
-                print(
-                    "enforce_scale lbnd controlling parameter, scale factor, "
-                    + "current value for realization {0}: {1}, {2}. {3}".format(
-                        ridx, lmin_idx, lmin, real.loc[lmin_idx]
-                    )
+            # clip to remove round off at the controlling bound
+            block[scale] = np.clip(
+                base_vals + (dev[scale] * min_fac[scale, None]), lb, ub
+            )
+            nout = out_ubnd[scale].sum(axis=1) + out_lbnd[scale].sum(axis=1)
+            rows.append(scale + start)
+            facs.append(min_fac[scale])
+            imins.append(imin[scale])
+            nouts.append(nout)
+        summary = pd.DataFrame(
+            columns=["scale_factor", "parnme", "bound", "value", "num_out"]
+        )
+        if len(rows) > 0:
+            rows = np.concatenate(rows)
+            imins = np.concatenate(imins)
+            values = self._df.values[rows, imins].astype(float)
+            summary = pd.DataFrame(
+                {
+                    "scale_factor": np.concatenate(facs),
+                    "parnme": names[imins].values,
+                    "bound": np.where(values > ub[imins], "ubnd", "lbnd"),
+                    "value": values,
+                    "num_out": np.concatenate(nouts),
+                },
+                index=self._df.index[rows],
+            )
+            self._df = pd.DataFrame(vals, index=self._df.index, columns=names)
+            print(
+                "enforce_scale: scaled {0} of {1} realizations".format(
+                    summary.shape[0], self._df.shape[0]
                 )
-            min_fac = min(umin, lmin)
-
-            self._df.loc[ridx, :] = base_vals + (sign * real_dist * min_fac)
+            )
 
         if retrans:
             self.transform()
+        return summary
 
     def _enforce_drop(self, bound_tol):
         """enforce parameter bounds on the ensemble by dropping
         violating realizations
 
+        Returns:
+            `pandas.DataFrame`: a summary of the dropped realizations, indexed
+            by realization name, with the number of parameters over the upper
+            bound and under the lower bound
+
         Note:
             with a large (realistic) number of parameters, the
             probability that any one parameter is out of
@@ -1554,18 +1960,29 @@ class ParameterEnsemble(Ensemble):
             be dropped.
 
         """
-        ub = self.ubnd * (1.0 - bound_tol)
-        lb = self.lbnd * (1.0 + bound_tol)
-        drop = []
-        for ridx in self._df.index:
-            # mx = (ub - self.loc[id,:]).min()
-            # mn = (lb - self.loc[id,:]).max()
-            if (ub - self._df.loc[ridx, :]).min() < 0.0 or (
-                lb - self._df.loc[ridx, :]
-            ).max() > 0.0:
-                drop.append(ridx)
-        self.loc[drop, :] = np.NaN
-        self.dropna(inplace=True)
+        names = self._df.columns
+        ub = (self.ubnd * (1.0 - bound_tol)).loc[names].values
+        lb = (self.lbnd * (1.0 + bound_tol)).loc[names].values
+        vals = self._df.values
+        num_ubnd = np.zeros(vals.shape[0], dtype=int)
+        num_lbnd = np.zeros(vals.shape[0], dtype=int)
+        for start, end in self._enforce_blocks():
+            num_ubnd[start:end] = (vals[start:end] > ub).sum(axis=1)
+            num_lbnd[start:end] = (vals[start:end] < lb).sum(axis=1)
+        drop = (num_ubnd + num_lbnd) > 0
+        summary = pd.DataFrame(
+            {"num_ubnd": num_ubnd[drop], "num_lbnd": num_lbnd[drop]},
+            index=self._df.index[drop],
+        )
+        # realizations with missing values are also dropped
+        self._df = self._df.loc[~drop, :].dropna()
+        if drop.any():
+            print(
+                "enforce_drop: dropped {0} of {1} realizations".format(
+                    summary.shape[0], drop.shape[0]
+                )
+            )
+        return summary
 
     def _enforce_reset(self, bound_tol):
         """enforce parameter bounds on the ensemble by resetting
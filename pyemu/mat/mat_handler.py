@@ -1,7 +1,7 @@
 from __future__ import print_function, division
 import os
 import copy
-import struct
+import hashlib
 import warnings
 import numpy as np
 import pandas as pd
@@ -36,23 +36,16 @@ def save_coo(x, row_names, col_names, filename, chunk=None):
     header = np.array((x.shape[1], x.shape[0], x.nnz), dtype=Matrix.binary_header_dt)
     header.tofile(f)
 
-    data = np.core.records.fromarrays([x.row, x.col, x.data], dtype=Matrix.coo_rec_dt)
-    data.tofile(f)
-
-    for name in col_names:
-        if len(name) > Matrix.new_par_length:
-            name = name[: Matrix.new_par_length - 1]
-        elif len(name) < Matrix.new_par_length:
-            for _ in range(len(name), Matrix.new_par_length):
-                name = name + " "
-        f.write(name.encode())
-    for name in row_names:
-        if len(name) > Matrix.new_obs_length:
-            name = name[: Matrix.new_obs_length - 1]
-        elif len(name) < Matrix.new_obs_length:
-            for i in range(len(name), Matrix.new_obs_length):
-                name = name + " "
-        f.write(name.encode())
+    if chunk is None:
+        chunk = max(x.nnz, 1)
+    for start in range(0, x.nnz, chunk):
+        end = min(x.nnz, start + chunk)
+        Matrix._pack_records(
+            Matrix.coo_rec_dt, [x.row[start:end], x.col[start:end], x.data[start:end]]
+        ).tofile(f)
+    Matrix._encode_name_table(
+        col_names, row_names, Matrix.new_par_length, Matrix.new_obs_length
+    ).tofile(f)
     f.close()
 
 
@@ -132,11 +125,59 @@ def get_common_elements(list1, list2):
     return result
 
 
+def _get_sparse():
+    """get the scipy.sparse module, which is only needed for sparse storage"""
+    try:
+        import scipy.sparse as sparse
+    except Exception as e:
+        raise Exception("Matrix sparse storage requires scipy: {0}".format(str(e)))
+    return sparse
+
+
+def _issparse(x):
+    """check if `x` is a scipy.sparse matrix without requiring scipy"""
+    if x is None or isinstance(x, np.ndarray):
+        return False
+    try:
+        import scipy.sparse as sparse
+    except Exception as e:
+        return False
+    return sparse.issparse(x)
+
+
+def _sparse_blocks(x):
+    """get the indices of the independent diagonal blocks (connected
+    components) of a square sparse matrix
+
+    Args:
+        x (`scipy.sparse` matrix): square sparse matrix
+
+    Returns:
+        [`numpy.ndarray`]: the (sorted) row/column indices of each block
+
+    """
+    from scipy.sparse.csgraph import connected_components
+
+    ncomp, labels = connected_components(x, directed=False)
+    order = np.argsort(labels, kind="stable")
+    return np.split(order, np.cumsum(np.bincount(labels, minlength=ncomp))[:-1])
+
+
+def _dot(first, second):
+    """dot product of two dense and/or sparse 2D arrays"""
+    if _issparse(first):
+        return first.dot(second)
+    elif _issparse(second):
+        return second.T.dot(first.T).T
+    return np.dot(first, second)
+
+
 class Matrix(object):
     """Easy linear algebra in the PEST(++) realm
 
     Args:
-        x (`numpy.ndarray`): numeric values
+        x (`numpy.ndarray` or `scipy.sparse` matrix): numeric values. Sparse
+            values are stored in CSR (or CSC) format
         row_names ([`str`]): list of row names
         col_names (['str']): list of column names
         isdigonal (`bool`): flag if the Matrix is diagonal
@@ -151,6 +192,9 @@ class Matrix(object):
         mat = pyemu.Matrix(x=data,row_names=row_names,col_names=col_names)
         mat.to_binary("mat.jco")
 
+        # mostly-zero matrices can be stored sparse
+        sparse_mat = mat.to_sparse()
+
 
     Note:
         this class makes heavy use of property decorators to encapsulate
@@ -173,6 +217,9 @@ class Matrix(object):
     new_par_length = 200
     new_obs_length = 200
 
+    # number of records processed at once when reading binary files
+    binary_chunk = 1000000
+
     def __init__(
         self, x=None, row_names=[], col_names=[], isdiagonal=False, autoalign=True
     ):
@@ -181,12 +228,23 @@ class Matrix(object):
         _ = [self.col_names.append(str(c).lower()) for c in col_names]
         _ = [self.row_names.append(str(r).lower()) for r in row_names]
         self.__x = None
+        self.__binary_file = None
+        self.__binary_sparse = False
         self.__u = None
         self.__s = None
         self.__v = None
         if x is not None:
             if x.ndim != 2:
                 raise Exception("ndim != 2")
+            if _issparse(x):
+                if isdiagonal:
+                    raise Exception(
+                        "Matrix.__init__(): sparse x not supported for diagonal"
+                    )
+                if x.format not in ["csr", "csc"]:
+                    x = x.tocsr()
+            elif isinstance(x, np.matrix):
+                x = np.asarray(x)
             # x = np.atleast_2d(x)
             if isdiagonal and len(row_names) > 0:
                 # assert 1 in x.shape,"Matrix error: diagonal matrix must have " +\
@@ -258,7 +316,7 @@ class Matrix(object):
             + "col names: "
             + str(self.col_names)
             + "\n"
-            + str(self.__x)
+            + str(self.x)
         )
         return s
 
@@ -273,9 +331,9 @@ class Matrix(object):
 
         """
         if self.isdiagonal and isinstance(item, tuple):
-            submat = np.atleast_2d((self.__x[item[0]]))
+            submat = np.atleast_2d((self.x[item[0]]))
         else:
-            submat = np.atleast_2d(self.__x[item])
+            submat = np.atleast_2d(self.x[item])
         # transpose a row vector to a column vector
         if submat.shape[0] == 1:
             submat = submat.transpose()
@@ -324,9 +382,15 @@ class Matrix(object):
                     "Matrix.__pow__() not implemented "
                     + "for fractional powers except 0.5"
                 )
+        elif self.issparse:
+            return type(self)(
+                self.x.power(power),
+                row_names=self.row_names,
+                col_names=self.col_names,
+            )
         else:
             return type(self)(
-                self.__x ** power,
+                self.x ** power,
                 row_names=self.row_names,
                 col_names=self.col_names,
                 isdiagonal=self.isdiagonal,
@@ -351,7 +415,7 @@ class Matrix(object):
 
         if np.isscalar(other):
             return Matrix(
-                x=self.x - other,
+                x=(self.as_2d if self.issparse else self.x) - other,
                 row_names=self.row_names,
                 col_names=self.col_names,
                 isdiagonal=self.isdiagonal,
@@ -415,6 +479,18 @@ class Matrix(object):
                         row_names=first.row_names,
                         col_names=first.col_names,
                     )
+                elif first.isdiagonal and second.issparse:
+                    return type(self)(
+                        x=_get_sparse().diags(first.x.flatten()) - second.x,
+                        row_names=first.row_names,
+                        col_names=first.col_names,
+                    )
+                elif second.isdiagonal and first.issparse:
+                    return type(self)(
+                        x=first.x - _get_sparse().diags(second.x.flatten()),
+                        row_names=first.row_names,
+                        col_names=first.col_names,
+                    )
                 elif first.isdiagonal:
                     elem_sub = -1.0 * second.newx
                     for j in range(first.shape[0]):
@@ -455,7 +531,7 @@ class Matrix(object):
         """
         if np.isscalar(other):
             return type(self)(
-                x=self.x + other,
+                x=(self.as_2d if self.issparse else self.x) + other,
                 row_names=self.row_names,
                 col_names=self.col_names,
                 isdiagonal=self.isdiagonal,
@@ -508,10 +584,22 @@ class Matrix(object):
                     row_names=first.row_names,
                     col_names=first.col_names,
                 )
+            elif first.isdiagonal and second.issparse:
+                return type(self)(
+                    x=_get_sparse().diags(first.x.flatten()) + second.x,
+                    row_names=first.row_names,
+                    col_names=first.col_names,
+                )
+            elif second.isdiagonal and first.issparse:
+                return type(self)(
+                    x=first.x + _get_sparse().diags(second.x.flatten()),
+                    row_names=first.row_names,
+                    col_names=first.col_names,
+                )
             elif first.isdiagonal:
                 ox = second.newx
                 for j in range(first.shape[0]):
-                    ox[j, j] += first.__x[j]
+                    ox[j, j] += first.x[j]
                 return type(self)(
                     x=ox, row_names=first.row_names, col_names=first.col_names
                 )
@@ -571,6 +659,12 @@ class Matrix(object):
                 raise NotImplementedError(
                     "Matrix.hadamard_product() not supported for" + "diagonal self"
                 )
+            elif self.issparse:
+                return type(self)(
+                    x=self.x.multiply(other),
+                    row_names=self.row_names,
+                    col_names=self.col_names,
+                )
             else:
                 return type(self)(
                     x=self.x * other, row_names=self.row_names, col_names=self.col_names
@@ -605,6 +699,19 @@ class Matrix(object):
                     row_names=first.row_names,
                     col_names=first.col_names,
                 )
+            elif first.issparse or second.issparse:
+                # the product is at most as dense as the sparse operand
+                if first.issparse:
+                    x = first.x.multiply(
+                        second.as_2d if second.isdiagonal else second.x
+                    )
+                else:
+                    x = second.x.multiply(first.as_2d if first.isdiagonal else first.x)
+                return type(self)(
+                    x=x.tocsr(),
+                    row_names=first.row_names,
+                    col_names=first.col_names,
+                )
             # elif first.isdiagonal:
             #     #ox = second.as_2d
             #     #for j in range(first.shape[0]):
@@ -669,10 +776,12 @@ class Matrix(object):
                 )
             if self.isdiagonal:
                 return type(self)(
-                    x=np.dot(np.diag(self.__x.flatten()).transpose(), other)
+                    x=np.dot(np.diag(self.x.flatten()).transpose(), other)
                 )
+            elif self.issparse:
+                return type(self)(x=np.atleast_2d(self.x.dot(other)))
             else:
-                return type(self)(x=np.atleast_2d(np.dot(self.__x, other)))
+                return type(self)(x=np.atleast_2d(np.dot(self.x, other)))
         elif isinstance(other, Matrix):
             if self.autoalign and other.autoalign and not self.mult_isaligned(other):
                 common = get_common_elements(self.col_names, other.row_names)
@@ -713,6 +822,18 @@ class Matrix(object):
                 )
                 elem_prod.isdiagonal = True
                 return elem_prod
+            elif first.isdiagonal and second.issparse:
+                return type(self)(
+                    x=_get_sparse().diags(first.x.flatten()).dot(second.x),
+                    row_names=first.row_names,
+                    col_names=second.col_names,
+                )
+            elif second.isdiagonal and first.issparse:
+                return type(self)(
+                    x=first.x.dot(_get_sparse().diags(second.x.flatten())),
+                    row_names=first.row_names,
+                    col_names=second.col_names,
+                )
             elif first.isdiagonal:
                 ox = second.newx
                 for j in range(first.shape[0]):
@@ -730,7 +851,7 @@ class Matrix(object):
                 )
             else:
                 return type(self)(
-                    np.dot(first.x, second.x),
+                    _dot(first.x, second.x),
                     row_names=first.row_names,
                     col_names=second.col_names,
                 )
@@ -779,10 +900,10 @@ class Matrix(object):
                 )
             if self.isdiagonal:
                 return type(self)(
-                    x=np.dot(other, np.diag(self.__x.flatten()).transpose())
+                    x=np.dot(other, np.diag(self.x.flatten()).transpose())
                 )
             else:
-                return type(self)(x=np.dot(other, self.__x))
+                return type(self)(x=_dot(other, self.x))
         elif isinstance(other, Matrix):
             if self.autoalign and other.autoalign and not self.mult_isaligned(other):
                 common = get_common_elements(self.row_names, other.col_names)
@@ -820,6 +941,18 @@ class Matrix(object):
                 )
                 elem_prod.isdiagonal = True
                 return elem_prod
+            elif first.isdiagonal and second.issparse:
+                return type(self)(
+                    x=_get_sparse().diags(first.x.flatten()).dot(second.x),
+                    row_names=first.row_names,
+                    col_names=second.col_names,
+                )
+            elif second.isdiagonal and first.issparse:
+                return type(self)(
+                    x=first.x.dot(_get_sparse().diags(second.x.flatten())),
+                    row_names=first.row_names,
+                    col_names=second.col_names,
+                )
             elif first.isdiagonal:
                 ox = second.newx
                 for j in range(first.shape[0]):
@@ -837,7 +970,7 @@ class Matrix(object):
                 )
             else:
                 return type(self)(
-                    np.dot(first.x, second.x),
+                    _dot(first.x, second.x),
                     row_names=first.row_names,
                     col_names=second.col_names,
                 )
@@ -856,6 +989,8 @@ class Matrix(object):
         """
         if self.isdiagonal:
             x = np.diag(self.x.flatten())
+        elif self.issparse:
+            x = self.x.toarray()
         else:
             # just a pointer to x
             x = self.x
@@ -943,7 +1078,7 @@ class Matrix(object):
             `numpy.ndarray`: a copy `Matrix.x`
 
         """
-        return self.__x.copy()
+        return self.x.copy()
 
     @property
     def x(self):
@@ -952,9 +1087,102 @@ class Matrix(object):
         Returns:
             `numpy.ndarray`: reference to `Matrix.x`
 
+        Note:
+            if `Matrix` was lazily loaded with `Matrix.from_binary(lazy=True)`,
+            the numeric values for the current row and column names are read
+            from the binary file on the first access
+
         """
+        if self.__x is None and self.__binary_file is not None:
+            self.__x, _, _ = Matrix.read_binary(
+                self.__binary_file,
+                row_names=self.row_names,
+                col_names=self.col_names,
+                sparse=self.__binary_sparse,
+            )
+            self.__binary_file = None
         return self.__x
 
+    @property
+    def islazy(self):
+        """flag for a `Matrix` whose numeric values are still on disk
+
+        Returns:
+            `bool`: True if `Matrix.x` has not yet been read from the
+            binary file passed to `Matrix.from_binary(lazy=True)`
+
+        """
+        return self.__x is None and self.__binary_file is not None
+
+    @property
+    def issparse(self):
+        """flag for a `Matrix` stored as a `scipy.sparse` matrix
+
+        Returns:
+            `bool`: True if `Matrix.x` is a `scipy.sparse` matrix
+
+        """
+        if self.islazy:
+            return self.__binary_sparse
+        return _issparse(self.__x)
+
+    def to_sparse(self, fmt="csr", droptol=None):
+        """get a sparse-storage `Matrix` representation of `Matrix`
+
+        Args:
+            fmt (`str`): sparse format, either "csr" or "csc".  Default is "csr"
+            droptol (`float`): absolute value tolerance to make values
+                smaller than `droptol` zero.  Default is None (no dropping)
+
+        Returns:
+            `Matrix`: a new `Matrix` stored as a `scipy.sparse` matrix
+
+        Example::
+
+            jco = pyemu.Jco.from_binary("pp.jco")
+            sjco = jco.to_sparse(droptol=1.0e-10)
+            xtx = sjco.T * sjco
+
+        """
+        sparse = _get_sparse()
+        if fmt not in ["csr", "csc"]:
+            raise Exception(
+                "Matrix.to_sparse(): fmt must be 'csr' or 'csc', not " + str(fmt)
+            )
+        if self.isdiagonal:
+            x = sparse.diags(self.x.flatten())
+        elif self.issparse:
+            x = self.x.copy()
+        else:
+            x = sparse.csr_matrix(self.x)
+        x = x.asformat(fmt)
+        if droptol is not None:
+            x.data[np.abs(x.data) < droptol] = 0.0
+        x.eliminate_zeros()
+        return type(self)(
+            x=x,
+            row_names=self.row_names,
+            col_names=self.col_names,
+            autoalign=self.autoalign,
+        )
+
+    def to_dense(self):
+        """get a dense-storage `Matrix` representation of a sparse `Matrix`
+
+        Returns:
+            `Matrix`: a new `Matrix` stored as a `numpy.ndarray`.  If not
+            `Matrix.issparse`, simply a copy of `Matrix`
+
+        """
+        if not self.issparse:
+            return self.copy()
+        return type(self)(
+            x=self.x.toarray(),
+            row_names=self.row_names,
+            col_names=self.col_names,
+            autoalign=self.autoalign,
+        )
+
     @property
     def as_2d(self):
         """get a 2D numeric representation of `Matrix.x`.  If not `isdiagonal`, simply
@@ -964,7 +1192,12 @@ class Matrix(object):
         Returns:
             `numpy.ndarray` : numpy.ndarray
 
+        Note:
+            if `Matrix.issparse`, a dense copy of `Matrix.x` is returned
+
         """
+        if self.issparse:
+            return self.x.toarray()
         if not self.isdiagonal:
             return self.x
         return np.diag(self.x.flatten())
@@ -995,6 +1228,8 @@ class Matrix(object):
             `int`: length of 2 tuple
 
         """
+        if self.islazy:
+            return (len(self.row_names), len(self.col_names))
         if self.__x is not None:
             if self.isdiagonal:
                 return (max(self.__x.shape), max(self.__x.shape))
@@ -1043,14 +1278,14 @@ class Matrix(object):
         """
         if not self.isdiagonal:
             return type(self)(
-                x=self.__x.copy().transpose(),
+                x=self.x.copy().transpose(),
                 row_names=self.col_names,
                 col_names=self.row_names,
                 autoalign=self.autoalign,
             )
         else:
             return type(self)(
-                x=self.__x.copy(),
+                x=self.x.copy(),
                 row_names=self.row_names,
                 col_names=self.col_names,
                 isdiagonal=True,
@@ -1065,7 +1300,9 @@ class Matrix(object):
             `Matrix`: inverse of `Matrix`
 
         Note:
-            uses `numpy.linalg.inv` for the inversion
+            uses `numpy.linalg.inv` for the inversion.  If `Matrix.issparse`,
+            each independent diagonal block is inverted separately and the
+            inverse is also sparse
 
         Example::
 
@@ -1076,7 +1313,7 @@ class Matrix(object):
         """
 
         if self.isdiagonal:
-            inv = 1.0 / self.__x
+            inv = 1.0 / self.x
             if np.any(~np.isfinite(inv)):
                 idx = np.isfinite(inv)
                 np.savetxt("testboo.dat", idx)
@@ -1095,9 +1332,40 @@ class Matrix(object):
                 col_names=self.col_names,
                 autoalign=self.autoalign,
             )
+        elif self.issparse:
+            # invert each independent diagonal block
+            x = self.x
+            if x.shape[0] != x.shape[1]:
+                raise Exception("Matrix.inv(): sparse matrix not square")
+            blocks = _sparse_blocks(x)
+            single = np.array([b[0] for b in blocks if b.shape[0] == 1], dtype=int)
+            diag = x.diagonal()[single]
+            if np.any(diag == 0.0):
+                raise Exception(
+                    "Matrix.inv has produced invalid floating points "
+                    + " for the following elements:"
+                    + ",".join([self.row_names[i] for i in single[diag == 0.0]])
+                )
+            rows, cols, vals = [single], [single], [1.0 / diag]
+            for idx in blocks:
+                if idx.shape[0] == 1:
+                    continue
+                rows.append(np.repeat(idx, idx.shape[0]))
+                cols.append(np.tile(idx, idx.shape[0]))
+                vals.append(np.linalg.inv(x[idx, :][:, idx].toarray()).ravel())
+            inv = _get_sparse().csr_matrix(
+                (np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+                shape=x.shape,
+            )
+            return type(self)(
+                x=inv,
+                row_names=self.row_names,
+                col_names=self.col_names,
+                autoalign=self.autoalign,
+            )
         else:
             return type(self)(
-                x=np.linalg.inv(self.__x),
+                x=np.linalg.inv(self.as_2d),
                 row_names=self.row_names,
                 col_names=self.col_names,
                 autoalign=self.autoalign,
@@ -1243,7 +1511,7 @@ class Matrix(object):
         """
         if self.isdiagonal:
             return type(self)(
-                x=np.sqrt(self.__x),
+                x=np.sqrt(self.x),
                 isdiagonal=True,
                 row_names=self.row_names,
                 col_names=self.col_names,
@@ -1251,7 +1519,7 @@ class Matrix(object):
             )
         elif self.shape[1] == 1:  # a vector
             return type(self)(
-                x=np.sqrt(self.__x),
+                x=np.sqrt(self.x),
                 isdiagonal=False,
                 row_names=self.row_names,
                 col_names=self.col_names,
@@ -1259,7 +1527,7 @@ class Matrix(object):
             )
         else:
             return type(self)(
-                x=np.sqrt(self.__x),
+                x=np.sqrt(self.x),
                 row_names=self.row_names,
                 col_names=self.col_names,
                 autoalign=self.autoalign,
@@ -1425,6 +1693,31 @@ class Matrix(object):
         if not isinstance(names, list):
             names = [names]
         row_idxs, col_idxs = self.indices(names)
+        if self.islazy:
+            # only the names need reordering, values are read by name
+            if isinstance(self, Cov):
+                if row_idxs.shape[0] != self.shape[0]:
+                    raise Exception("shape mismatch")
+                self.row_names = [self.row_names[i] for i in row_idxs]
+                self.col_names = copy.deepcopy(self.row_names)
+            elif axis == 0:
+                if row_idxs.shape[0] != self.shape[0]:
+                    raise Exception(
+                        "Matrix.align(): not all names found in self.row_names"
+                    )
+                self.row_names = [self.row_names[i] for i in row_idxs]
+            elif axis == 1:
+                if col_idxs.shape[0] != self.shape[1]:
+                    raise Exception(
+                        "Matrix.align(): not all names found in self.col_names"
+                    )
+                self.col_names = [self.col_names[i] for i in col_idxs]
+            else:
+                raise Exception(
+                    "Matrix.align(): axis argument to align()"
+                    + " must be either 0 or 1"
+                )
+            return
         if self.isdiagonal or isinstance(self, Cov):
             assert row_idxs.shape[0] == self.shape[0]
             if row_idxs.shape != col_idxs.shape:
@@ -1433,10 +1726,10 @@ class Matrix(object):
                 raise Exception("shape mismatch")
 
             if self.isdiagonal:
-                self.__x = self.__x[row_idxs]
+                self.__x = self.x[row_idxs]
             else:
-                self.__x = self.__x[row_idxs, :]
-                self.__x = self.__x[:, col_idxs]
+                self.__x = self.x[row_idxs, :]
+                self.__x = self.x[:, col_idxs]
             row_names = []
             _ = [row_names.append(self.row_names[i]) for i in row_idxs]
             self.row_names, self.col_names = row_names, row_names
@@ -1452,7 +1745,7 @@ class Matrix(object):
                     raise Exception(
                         "Matrix.align(): not all names found in self.row_names"
                     )
-                self.__x = self.__x[row_idxs, :]
+                self.__x = self.x[row_idxs, :]
                 row_names = []
                 _ = [row_names.append(self.row_names[i]) for i in row_idxs]
                 self.row_names = row_names
@@ -1461,7 +1754,7 @@ class Matrix(object):
                     raise Exception(
                         "Matrix.align(): not all names found in self.col_names"
                     )
-                self.__x = self.__x[:, col_idxs]
+                self.__x = self.x[:, col_idxs]
                 col_names = []
                 _ = [col_names.append(self.col_names[i]) for i in row_idxs]
                 self.col_names = col_names
@@ -1495,6 +1788,33 @@ class Matrix(object):
         if col_names is not None and not isinstance(col_names, list):
             col_names = [col_names]
 
+        if self.islazy:
+            # only the requested block is read from the binary file
+            if isinstance(self, Cov) and (row_names is None or col_names is None):
+                names = row_names if row_names is not None else col_names
+                extract, _, _ = Matrix.read_binary(
+                    self.__binary_file,
+                    row_names=names,
+                    col_names=names,
+                    sparse=self.__binary_sparse,
+                )
+                if drop:
+                    self.drop(names, 0)
+                return Cov(x=extract, names=names)
+            extract, new_row_names, new_col_names = Matrix.read_binary(
+                self.__binary_file,
+                row_names=row_names if row_names is not None else self.row_names,
+                col_names=col_names if col_names is not None else self.col_names,
+                sparse=self.__binary_sparse,
+            )
+            if drop and row_names is not None:
+                self.drop(row_names, axis=0)
+            if drop and col_names is not None:
+                self.drop(col_names, axis=1)
+            return type(self)(
+                x=extract, row_names=new_row_names, col_names=new_col_names
+            )
+
         if isinstance(self, Cov) and (row_names is None or col_names is None):
             if row_names is not None:
                 idxs = self.indices(row_names, axis=0)
@@ -1504,27 +1824,36 @@ class Matrix(object):
                 names = col_names
 
             if self.isdiagonal:
-                extract = self.__x[idxs].copy()
+                extract = self.x[idxs].copy()
             else:
-                extract = self.__x[idxs, :].copy()
+                extract = self.x[idxs, :].copy()
                 extract = extract[:, idxs]
             if drop:
                 self.drop(names, 0)
             return Cov(x=extract, names=names, isdiagonal=self.isdiagonal)
         if self.isdiagonal:
-            extract = np.diag(self.__x[:, 0])
+            extract = np.diag(self.x[:, 0])
+        elif self.issparse:
+            # fancy indexing of sparse matrices already copies
+            extract = self.x
         else:
-            extract = self.__x.copy()
+            extract = self.x.copy()
         if row_names is not None:
             row_idxs = self.indices(row_names, axis=0)
-            extract = np.atleast_2d(extract[row_idxs, :].copy())
+            if self.issparse:
+                extract = extract[row_idxs, :]
+            else:
+                extract = np.atleast_2d(extract[row_idxs, :].copy())
             if drop:
                 self.drop(row_names, axis=0)
         else:
             row_names = self.row_names
         if col_names is not None:
             col_idxs = self.indices(col_names, axis=1)
-            extract = np.atleast_2d(extract[:, col_idxs].copy())
+            if self.issparse:
+                extract = extract[:, col_idxs]
+            else:
+                extract = np.atleast_2d(extract[:, col_idxs].copy())
             if drop:
                 self.drop(col_names, axis=1)
         else:
@@ -1568,13 +1897,23 @@ class Matrix(object):
 
         idxs = self.indices(names, axis=axis)
 
-        if self.isdiagonal:
-            self.__x = np.delete(self.__x, idxs, 0)
+        if self.islazy:
+            # nothing has been read yet, so just forget the names
+            if axis == 0:
+                drop_names = set([self.row_names[i] for i in idxs])
+            else:
+                drop_names = set([self.col_names[i] for i in idxs])
+            if axis == 0 or isinstance(self, Cov):
+                self.row_names = [n for n in self.row_names if n not in drop_names]
+            if axis == 1 or isinstance(self, Cov):
+                self.col_names = [n for n in self.col_names if n not in drop_names]
+        elif self.isdiagonal:
+            self.__x = Matrix._delete(self.x, idxs, 0)
             keep_names = [name for name in self.row_names if name not in names]
-            if len(keep_names) != self.__x.shape[0]:
+            if len(keep_names) != self.x.shape[0]:
                 raise Exception(
                     "shape-name mismatch:"
-                    + "{0}:{0}".format(len(keep_names), self.__x.shape)
+                    + "{0}:{0}".format(len(keep_names), self.x.shape)
                 )
             self.row_names = keep_names
             self.col_names = copy.deepcopy(keep_names)
@@ -1583,14 +1922,14 @@ class Matrix(object):
             #     del self.row_names[idx]
             #     del self.col_names[idx]
         elif isinstance(self, Cov):
-            self.__x = np.delete(self.__x, idxs, 0)
-            self.__x = np.delete(self.__x, idxs, 1)
+            self.__x = Matrix._delete(self.x, idxs, 0)
+            self.__x = Matrix._delete(self.x, idxs, 1)
             keep_names = [name for name in self.row_names if name not in names]
 
-            if len(keep_names) != self.__x.shape[0]:
+            if len(keep_names) != self.x.shape[0]:
                 raise Exception(
                     "shape-name mismatch:"
-                    + "{0}:{0}".format(len(keep_names), self.__x.shape)
+                    + "{0}:{0}".format(len(keep_names), self.x.shape)
                 )
             self.row_names = keep_names
             self.col_names = copy.deepcopy(keep_names)
@@ -1603,12 +1942,12 @@ class Matrix(object):
                 raise Exception("Matrix.drop(): can't drop all rows")
             elif idxs.shape == 0:
                 raise Exception("Matrix.drop(): nothing to drop on axis 0")
-            self.__x = np.delete(self.__x, idxs, 0)
+            self.__x = Matrix._delete(self.x, idxs, 0)
             keep_names = [name for name in self.row_names if name not in names]
-            if len(keep_names) != self.__x.shape[0]:
+            if len(keep_names) != self.x.shape[0]:
                 raise Exception(
                     "shape-name mismatch:"
-                    + "{0}:{1}".format(len(keep_names), self.__x.shape)
+                    + "{0}:{1}".format(len(keep_names), self.x.shape)
                 )
             self.row_names = keep_names
             # idxs = np.sort(idxs)
@@ -1619,12 +1958,12 @@ class Matrix(object):
                 raise Exception("Matrix.drop(): can't drop all cols")
             if idxs.shape == 0:
                 raise Exception("Matrix.drop(): nothing to drop on axis 1")
-            self.__x = np.delete(self.__x, idxs, 1)
+            self.__x = Matrix._delete(self.x, idxs, 1)
             keep_names = [name for name in self.col_names if name not in names]
-            if len(keep_names) != self.__x.shape[1]:
+            if len(keep_names) != self.x.shape[1]:
                 raise Exception(
                     "shape-name mismatch:"
-                    + "{0}:{1}".format(len(keep_names), self.__x.shape)
+                    + "{0}:{1}".format(len(keep_names), self.x.shape)
                 )
             self.col_names = keep_names
             # idxs = np.sort(idxs)
@@ -1633,6 +1972,16 @@ class Matrix(object):
         else:
             raise Exception("Matrix.drop(): axis argument must be 0 or 1")
 
+    @staticmethod
+    def _delete(x, idxs, axis):
+        """`numpy.delete()` that also supports sparse matrices"""
+        if not _issparse(x):
+            return np.delete(x, idxs, axis)
+        keep = np.setdiff1d(np.arange(x.shape[axis]), idxs)
+        if axis == 0:
+            return x[keep, :]
+        return x[:, keep]
+
     def extract(self, row_names=None, col_names=None):
         """wrapper method that `Matrix.gets()` then `Matrix.drops()` elements.
         one of row_names or col_names must be not None.
@@ -1669,13 +2018,80 @@ class Matrix(object):
             raise Exception("already diagonal")
         if not isinstance(col_name, str):
             raise Exception("col_name must be type str")
+        if self.issparse:
+            diag = self.x.diagonal()
+        else:
+            diag = np.diag(self.x)
         return type(self)(
-            x=np.atleast_2d(np.diag(self.x)).transpose(),
+            x=np.atleast_2d(diag).transpose(),
             row_names=self.row_names,
             col_names=[col_name],
             isdiagonal=False,
         )
 
+    def _iter_nonzero_blocks(self, droptol=None, chunk=None, check_nan=False):
+        """generator of the nonzero entries of `Matrix` in blocks
+
+        Args:
+            droptol (`float`): absolute value tolerance to make values
+                smaller `droptol` than zero.  Applied in place.  Default is None
+            chunk (`int`): the approximate number of elements in each block.
+                Default is `None`, which yields all nonzero entries at once.
+            check_nan (`bool`): flag to raise an exception if nans are found.
+                Default is False
+
+        Yields:
+            tuple containing
+
+            - **numpy.ndarray**: row indices of the nonzero entries in the block
+            - **numpy.ndarray**: column indices of the nonzero entries in the block
+            - **numpy.ndarray**: the nonzero values in the block
+
+        Note:
+            dense matrices are walked in blocks of whole columns when `chunk` is
+            passed, so `numpy.nonzero()` is never called on the full array and
+            peak memory is bounded by the block size
+
+        """
+        if self.isdiagonal:
+            # raise NotImplementedError()
+            self.__x = self.as_2d
+            self.isdiagonal = False
+        if self.issparse:
+            if check_nan and np.any(np.isnan(self.x.data)):
+                raise Exception("Matrix.to_binary(): nans found")
+            if droptol is not None:
+                self.x.data[np.abs(self.x.data) < droptol] = 0.0
+            self.x.sum_duplicates()
+            self.x.eliminate_zeros()
+            coo = self.x.tocoo()
+            if chunk is None:
+                chunk = max(coo.nnz, 1)
+            for start in range(0, coo.nnz, chunk):
+                end = start + chunk
+                yield coo.row[start:end], coo.col[start:end], coo.data[start:end]
+        elif chunk is None:
+            if check_nan and np.any(np.isnan(self.x)):
+                raise Exception("Matrix.to_binary(): nans found")
+            if droptol is not None:
+                self.x[np.abs(self.x) < droptol] = 0.0
+            # get the indices of non-zero entries
+            row_idxs, col_idxs = np.nonzero(self.x)
+            yield row_idxs, col_idxs, self.x[row_idxs, col_idxs]
+        else:
+            nrow, ncol = self.shape
+            block_ncol = max(1, int(chunk) // max(nrow, 1))
+            for start in range(0, ncol, block_ncol):
+                # a view, so droptol still operates in place
+                block = self.x[:, start : start + block_ncol]
+                if check_nan and np.any(np.isnan(block)):
+                    raise Exception("Matrix.to_binary(): nans found")
+                if droptol is not None:
+                    block[np.abs(block) < droptol] = 0.0
+                # column-major order within the block
+                col_idxs, row_idxs = np.nonzero(block.T)
+                yield row_idxs, col_idxs + start, block[row_idxs, col_idxs]
+
     def to_coo(self, filename, droptol=None, chunk=None):
         """write an extended PEST-format binary file.  The data format is
         [int,int,float] for i,j,value.  It is autodetected during
@@ -1685,76 +2101,31 @@ class Matrix(object):
             filename (`str`): filename to save binary file
             droptol (`float`): absolute value tolerance to make values
                 smaller `droptol` than zero.  Default is None (no dropping)
-            chunk (`int`): number of elements to write in a single pass.
+            chunk (`int`): number of elements to process in a single pass.
                 Default is `None`, which writes the entire numeric part of the
                 `Matrix` at once. This is faster but requires more memory.
+                If passed, dense matrices are streamed in blocks of columns
+                and peak memory is bounded by `chunk`
 
         """
-        if self.isdiagonal:
-            # raise NotImplementedError()
-            self.__x = self.as_2d
-            self.isdiagonal = False
-        if droptol is not None:
-            self.x[np.abs(self.x) < droptol] = 0.0
         f = open(filename, "wb")
-        # print("counting nnz")
-        nnz = np.count_nonzero(self.x)  # number of non-zero entries
-        # write the header
+        # write a placeholder header, nnz is patched once all blocks are written
         header = np.array(
-            (self.shape[1], self.shape[0], nnz), dtype=self.binary_header_dt
+            (self.shape[1], self.shape[0], 0), dtype=self.binary_header_dt
         )
         header.tofile(f)
-        # get the indices of non-zero entries
-        # print("getting nnz idxs")
-        row_idxs, col_idxs = np.nonzero(self.x)
-
-        if chunk is None:
-            flat = self.x[row_idxs, col_idxs].flatten()
-            data = np.core.records.fromarrays(
-                [row_idxs, col_idxs, flat], dtype=self.coo_rec_dt
-            )
-            data.tofile(f)
-        else:
-
-            start, end = 0, min(chunk, row_idxs.shape[0])
-            while True:
-                # print(row_idxs[start],row_idxs[end])
-                # print("chunk",start,end)
-                flat = self.x[row_idxs[start:end], col_idxs[start:end]].flatten()
-                data = np.core.records.fromarrays(
-                    [row_idxs[start:end], col_idxs[start:end], flat],
-                    dtype=self.coo_rec_dt,
-                )
-                data.tofile(f)
-                if end == row_idxs.shape[0]:
-                    break
-                start = end
-                end = min(row_idxs.shape[0], start + chunk)
-
-        for name in self.col_names:
-            if len(name) > self.new_par_length:
-                warnings.warn(
-                    "par name '{0}' greater than {1} chars".format(
-                        name, self.new_par_length
-                    )
-                )
-                name = name[: self.new_par_length - 1]
-            elif len(name) < self.new_par_length:
-                for _ in range(len(name), self.new_par_length):
-                    name = name + " "
-            f.write(name.encode())
-        for name in self.row_names:
-            if len(name) > self.new_obs_length:
-                warnings.warn(
-                    "obs name '{0}' greater than {1} chars".format(
-                        name, self.new_obs_length
-                    )
-                )
-                name = name[: self.new_obs_length - 1]
-            elif len(name) < self.new_obs_length:
-                for _ in range(len(name), self.new_obs_length):
-                    name = name + " "
-            f.write(name.encode())
+        nnz = 0
+        for row_idxs, col_idxs, flat in self._iter_nonzero_blocks(
+            droptol=droptol, chunk=chunk
+        ):
+            Matrix._pack_records(self.coo_rec_dt, [row_idxs, col_idxs, flat]).tofile(f)
+            nnz += row_idxs.shape[0]
+        Matrix._encode_name_table(
+            self.col_names, self.row_names, self.new_par_length, self.new_obs_length
+        ).tofile(f)
+        header["icount"] = nnz
+        f.seek(0)
+        header.tofile(f)
         f.close()
 
     def to_binary(self, filename, droptol=None, chunk=None):
@@ -1765,90 +2136,113 @@ class Matrix(object):
             filename (`str`): filename to save binary file
             droptol (`float`): absolute value tolerance to make values
                 smaller `droptol` than zero.  Default is None (no dropping)
-            chunk (`int`): number of elements to write in a single pass.
+            chunk (`int`): number of elements to process in a single pass.
                 Default is `None`, which writes the entire numeric part of the
                 `Matrix` at once. This is faster but requires more memory.
+                If passed, dense matrices are streamed in blocks of columns
+                and peak memory is bounded by `chunk`
 
         """
-        # print(self.x)
-        # print(type(self.x))
-
-        if np.any(np.isnan(self.x)):
-            raise Exception("Matrix.to_binary(): nans found")
-        if self.isdiagonal:
-            # raise NotImplementedError()
-            self.__x = self.as_2d
-            self.isdiagonal = False
-        if droptol is not None:
-            self.x[np.abs(self.x) < droptol] = 0.0
+        nrow = self.shape[0]
         f = open(filename, "wb")
-        nnz = np.count_nonzero(self.x)  # number of non-zero entries
-        # write the header
-        header = np.array(
-            (-self.shape[1], -self.shape[0], nnz), dtype=self.binary_header_dt
-        )
+        # write a placeholder header, nnz is patched once all blocks are written
+        header = np.array((-self.shape[1], -nrow, 0), dtype=self.binary_header_dt)
         header.tofile(f)
-        # get the indices of non-zero entries
-        row_idxs, col_idxs = np.nonzero(self.x)
-        icount = row_idxs + 1 + col_idxs * self.shape[0]
-        # flatten the array
-        # flat = self.x[row_idxs, col_idxs].flatten()
-        # zip up the index position and value pairs
-        # data = np.array(list(zip(icount, flat)), dtype=self.binary_rec_dt)
-
-        if chunk is None:
-            flat = self.x[row_idxs, col_idxs].flatten()
-            data = np.core.records.fromarrays([icount, flat], dtype=self.binary_rec_dt)
-            # write
-            data.tofile(f)
-        else:
-            start, end = 0, min(chunk, row_idxs.shape[0])
-            while True:
-                # print(row_idxs[start],row_idxs[end])
-                flat = self.x[row_idxs[start:end], col_idxs[start:end]].flatten()
-                data = np.core.records.fromarrays(
-                    [icount[start:end], flat], dtype=self.binary_rec_dt
-                )
-                data.tofile(f)
-                if end == row_idxs.shape[0]:
-                    break
-                start = end
-                end = min(row_idxs.shape[0], start + chunk)
+        nnz = 0
+        try:
+            for row_idxs, col_idxs, flat in self._iter_nonzero_blocks(
+                droptol=droptol, chunk=chunk, check_nan=True
+            ):
+                icount = row_idxs + 1 + col_idxs.astype(np.int64) * nrow
+                Matrix._pack_records(self.binary_rec_dt, [icount, flat]).tofile(f)
+                nnz += row_idxs.shape[0]
+        except Exception:
+            f.close()
+            os.remove(filename)
+            raise
+        Matrix._encode_name_table(
+            self.col_names, self.row_names, self.par_length, self.obs_length
+        ).tofile(f)
+        header["icount"] = nnz
+        f.seek(0)
+        header.tofile(f)
+        f.close()
 
-        for name in self.col_names:
-            if len(name) > self.par_length:
-                warnings.warn(
-                    "par name '{0}' greater than {1} chars".format(
-                        name, self.par_length
-                    )
-                )
-                name = name[: self.par_length - 1]
-            elif len(name) < self.par_length:
-                for i in range(len(name), self.par_length):
-                    name = name + " "
-            f.write(name.encode())
-        for name in self.row_names:
-            if len(name) > self.obs_length:
+    @staticmethod
+    def _pack_records(rec_dt, arrays):
+        """pack arrays into a structured record array in a single allocation
+
+        Args:
+            rec_dt (`numpy.dtype`): the record dtype
+            arrays ([`numpy.ndarray`]): one array for each field of `rec_dt`
+
+        Returns:
+            `numpy.ndarray`: structured array ready for `tofile()`
+
+        """
+        data = np.empty(len(arrays[0]), dtype=rec_dt)
+        for name, arr in zip(rec_dt.names, arrays):
+            data[name] = arr
+        return data
+
+    @staticmethod
+    def _encode_names(names, length, kind="name"):
+        """encode names into a fixed-width, space-padded byte block
+
+        Args:
+            names ([`str`]): names to encode
+            length (`int`): the fixed width of each name
+            kind (`str`): type of name for the truncation warning
+
+        Returns:
+            `numpy.ndarray`: uint8 array of `len(names) * length` bytes
+
+        Note:
+            names longer than `length` are truncated to `length - 1` chars
+
+        """
+        names = np.array(names, dtype=str).reshape(-1)
+        too_long = np.char.str_len(names) > length
+        if np.any(too_long):
+            for name in names[too_long]:
                 warnings.warn(
-                    "obs name '{0}' greater than {1} chars".format(
-                        name, self.obs_length
-                    )
+                    "{0} '{1}' greater than {2} chars".format(kind, name, length),
+                    PyemuWarning,
                 )
-                name = name[: self.obs_length - 1]
-            elif len(name) < self.obs_length:
-                for i in range(len(name), self.obs_length):
-                    name = name + " "
-            f.write(name.encode())
+            names[too_long] = [name[: length - 1] for name in names[too_long]]
+        fmt = "S{0}".format(length)
+        try:
+            raw = names.astype(fmt)
+        except UnicodeEncodeError:
+            raw = np.char.encode(names).astype(fmt)
+        # numpy pads with nulls, PEST expects spaces
+        raw = np.frombuffer(raw.tobytes(), dtype=np.uint8).copy()
+        raw[raw == 0] = ord(" ")
+        return raw
 
-        f.close()
+    @staticmethod
+    def _encode_name_table(col_names, row_names, par_length, obs_length):
+        """encode the column then row name tables of a binary file in one block"""
+        return np.concatenate(
+            [
+                Matrix._encode_names(col_names, par_length, "par name"),
+                Matrix._encode_names(row_names, obs_length, "obs name"),
+            ]
+        )
 
     @classmethod
-    def from_binary(cls, filename):
+    def from_binary(cls, filename, lazy=False, sparse=False):
         """class method load from PEST-compatible binary file into a
         Matrix instance
 
         Args:
             filename (`str`): filename to read
+            lazy (`bool`): flag to only read the header and names.  The numeric
+                values stay on disk until `Matrix.x` is accessed and `Matrix.get()`
+                and `Matrix.extract()` only read the requested rows and columns
+                from the file.  Default is False
+            sparse (`bool`): flag to store the values as a `scipy.sparse` CSR
+                matrix without ever forming the dense array.  Default is False
 
         Returns:
             `Matrix`: `Matrix` loaded from binary file
@@ -1858,18 +2252,99 @@ class Matrix(object):
             mat = pyemu.Matrix.from_binary("my.jco")
             cov = pyemi.Cov.from_binary("large_cov.jcb")
 
-        """
-        x, row_names, col_names = Matrix.read_binary(filename)
-        if np.any(np.isnan(x)):
+            # only read the columns for two parameters from a huge jco
+            jco = pyemu.Jco.from_binary("huge.jco", lazy=True)
+            sub_jco = jco.get(col_names=["par1", "par2"])
+
+        """
+        if lazy:
+            layout = Matrix._read_binary_layout(filename)
+            # the sequential fortran format can't be read lazily
+            if layout is not None:
+                mat = cls(x=None, row_names=layout[4], col_names=layout[5])
+                # the values are read later, maybe from another directory
+                mat.__binary_file = os.path.abspath(filename)
+                mat.__binary_sparse = bool(sparse)
+                return mat
+        x, row_names, col_names = Matrix.read_binary(filename, sparse=sparse)
+        if np.any(np.isnan(x.data if sparse else x)):
             warnings.warn("Matrix.from_binary(): nans in matrix", PyemuWarning)
         return cls(x=x, row_names=row_names, col_names=col_names)
 
     @staticmethod
-    def read_binary(filename):
+    def _decode_names(raw):
+        """decode a fixed-width byte array of names in one pass"""
+        return np.char.lower(np.char.strip(np.char.decode(raw))).tolist()
+
+    @staticmethod
+    def _read_binary_layout(filename):
+        """read the header and name tables of a PEST-format binary file
+        without reading the numeric records
+
+        Args:
+            filename (`str`): filename to read
+
+        Returns:
+            `None` if the file was written with the sequential fortran
+            specification, otherwise a tuple containing
+
+            - **numpy.dtype**: the record dtype
+            - **int**: number of rows
+            - **int**: number of columns
+            - **int**: number of records
+            - **['str']**: list of row names
+            - **[`str`]**: list of col_names
+
+        """
+        with open(filename, "rb") as f:
+            itemp1, itemp2, icount = np.fromfile(f, Matrix.binary_header_dt, 1)[0]
+            if itemp1 > 0 and itemp2 < 0 and icount < 0:
+                return None
+            ncol, nrow, icount = abs(int(itemp1)), abs(int(itemp2)), int(icount)
+            if itemp1 >= 0:
+                rec_dt = Matrix.coo_rec_dt
+                par_length, obs_length = Matrix.new_par_length, Matrix.new_obs_length
+            else:
+                rec_dt = Matrix.binary_rec_dt
+                par_length, obs_length = Matrix.par_length, Matrix.obs_length
+            # skip the records and read the name tables as fixed-width strings
+            f.seek(Matrix.binary_header_dt.itemsize + icount * rec_dt.itemsize)
+            col_names = Matrix._decode_names(
+                np.fromfile(f, "S{0}".format(par_length), ncol)
+            )
+            row_names = Matrix._decode_names(
+                np.fromfile(f, "S{0}".format(obs_length), nrow)
+            )
+        if len(row_names) != nrow:
+            raise Exception(
+                "Matrix.read_binary() len(row_names) ("
+                + str(len(row_names))
+                + ") != x.shape[0] ("
+                + str(nrow)
+                + ")"
+            )
+        if len(col_names) != ncol:
+            raise Exception(
+                "Matrix.read_binary() len(col_names) ("
+                + str(len(col_names))
+                + ") != self.shape[1] ("
+                + str(ncol)
+                + ")"
+            )
+        return rec_dt, nrow, ncol, icount, row_names, col_names
+
+    @staticmethod
+    def read_binary(filename, row_names=None, col_names=None, sparse=False):
         """static method to read PEST-format binary files
 
         Args:
             filename (`str`): filename to read
+            row_names (['str'], optional): the rows to read.  If `None`,
+                all rows are read.  Default is `None`
+            col_names (['str'], optional): the columns to read.  If `None`,
+                all columns are read.  Default is `None`
+            sparse (`bool`): flag to return the values as a `scipy.sparse` CSR
+                matrix.  Default is False
 
         Returns:
             tuple containing
@@ -1878,110 +2353,116 @@ class Matrix(object):
             - **['str']**: list of row names
             - **[`str`]**: list of col_names
 
+        Note:
+            the numeric records are memory-mapped and processed in
+            blocks of `Matrix.binary_chunk` records, so peak memory scales
+            with the size of the requested rows and columns rather than
+            with the size of the file
+
         """
-        f = open(filename, "rb")
-        # the header datatype
-        itemp1, itemp2, icount = np.fromfile(f, Matrix.binary_header_dt, 1)[0]
-        if itemp1 > 0 and itemp2 < 0 and icount < 0:
+        layout = Matrix._read_binary_layout(filename)
+        if layout is None:
             print(
                 " WARNING: it appears this file was \n"
                 + " written with 'sequential` "
                 + " binary fortran specification\n...calling "
                 + " Matrix.from_fortranfile()"
             )
-            f.close()
-            return Matrix.from_fortranfile(filename)
-        ncol, nrow = abs(itemp1), abs(itemp2)
-        if itemp1 >= 0:
-            # raise TypeError('Matrix.from_binary(): Jco produced by ' +
-            #                 'deprecated version of PEST,' +
-            #                 'Use JcoTRANS to convert to new format')
-            # print("new binary format detected...")
-
-            data = np.fromfile(f, Matrix.coo_rec_dt, icount)
-            if data["i"].min() < 0:
-                raise Exception("Matrix.from_binary(): 'i' index values less than 0")
-            if data["j"].min() < 0:
-                raise Exception("Matrix.from_binary(): 'j' index values less than 0")
-            x = np.zeros((nrow, ncol))
-            x[data["i"], data["j"]] = data["dtemp"]
-            data = x
-            # read obs and parameter names
-            col_names = []
-            row_names = []
-            for j in range(ncol):
-                name = (
-                    struct.unpack(
-                        str(Matrix.new_par_length) + "s", f.read(Matrix.new_par_length)
-                    )[0]
-                    .strip()
-                    .lower()
-                    .decode()
+            x, file_row_names, file_col_names = Matrix.from_fortranfile(filename)
+            row_idxs, col_idxs = None, None
+            if row_names is not None:
+                row_idxs = Matrix.find_rowcol_indices(
+                    row_names, file_row_names, [], axis=0
                 )
-                col_names.append(name)
-            for i in range(nrow):
-                name = (
-                    struct.unpack(
-                        str(Matrix.new_obs_length) + "s", f.read(Matrix.new_obs_length)
-                    )[0]
-                    .strip()
-                    .lower()
-                    .decode()
+                x = x[row_idxs, :]
+            if col_names is not None:
+                col_idxs = Matrix.find_rowcol_indices(
+                    col_names, [], file_col_names, axis=1
                 )
-                row_names.append(name)
-            f.close()
+                x = x[:, col_idxs]
+            if sparse:
+                x = _get_sparse().csr_matrix(x)
         else:
-
-            # read all data records
-            # using this a memory hog, but really fast
-            data = np.fromfile(f, Matrix.binary_rec_dt, icount)
-            icols = ((data["j"] - 1) // nrow) + 1
-            irows = data["j"] - ((icols - 1) * nrow)
-            x = np.zeros((nrow, ncol))
-            x[irows - 1, icols - 1] = data["dtemp"]
-            data = x
-            # read obs and parameter names
-            col_names = []
-            row_names = []
-            for j in range(ncol):
-                name = (
-                    struct.unpack(
-                        str(Matrix.par_length) + "s", f.read(Matrix.par_length)
-                    )[0]
-                    .strip()
-                    .lower()
-                    .decode()
+            rec_dt, nrow, ncol, icount, file_row_names, file_col_names = layout
+            # maps from file row/col index to block row/col index, -1 if not requested
+            row_idxs, col_idxs = None, None
+            row_map, col_map = None, None
+            if row_names is not None:
+                row_idxs = Matrix.find_rowcol_indices(
+                    row_names, file_row_names, [], axis=0
                 )
-                col_names.append(name)
-            for i in range(nrow):
-
-                name = (
-                    struct.unpack(
-                        str(Matrix.obs_length) + "s", f.read(Matrix.obs_length)
-                    )[0]
-                    .strip()
-                    .lower()
-                    .decode()
+                row_map = np.zeros(nrow, dtype=np.int64) - 1
+                row_map[row_idxs] = np.arange(row_idxs.shape[0])
+            if col_names is not None:
+                col_idxs = Matrix.find_rowcol_indices(
+                    col_names, [], file_col_names, axis=1
                 )
-                row_names.append(name)
-            f.close()
-        if len(row_names) != data.shape[0]:
-            raise Exception(
-                "Matrix.read_binary() len(row_names) ("
-                + str(len(row_names))
-                + ") != x.shape[0] ("
-                + str(data.shape[0])
-                + ")"
-            )
-        if len(col_names) != data.shape[1]:
-            raise Exception(
-                "Matrix.read_binary() len(col_names) ("
-                + str(len(col_names))
-                + ") != self.shape[1] ("
-                + str(data.shape[1])
-                + ")"
+                col_map = np.zeros(ncol, dtype=np.int64) - 1
+                col_map[col_idxs] = np.arange(col_idxs.shape[0])
+            for idxs in [row_idxs, col_idxs]:
+                if idxs is not None and np.unique(idxs).shape[0] != idxs.shape[0]:
+                    raise Exception("Matrix.read_binary(): duplicate names requested")
+            shape = (
+                nrow if row_idxs is None else row_idxs.shape[0],
+                ncol if col_idxs is None else col_idxs.shape[0],
             )
-        return data, row_names, col_names
+            if sparse:
+                # collect triplets, the dense array is never formed
+                triplets = []
+            else:
+                x = np.zeros(shape)
+            if icount > 0:
+                data = np.memmap(
+                    filename,
+                    dtype=rec_dt,
+                    mode="r",
+                    offset=Matrix.binary_header_dt.itemsize,
+                    shape=(icount,),
+                )
+                for start in range(0, icount, Matrix.binary_chunk):
+                    block = data[start : start + Matrix.binary_chunk]
+                    if rec_dt == Matrix.coo_rec_dt:
+                        irows = block["i"].astype(np.int64)
+                        icols = block["j"].astype(np.int64)
+                        if irows.min() < 0:
+                            raise Exception(
+                                "Matrix.from_binary(): 'i' index values less than 0"
+                            )
+                        if icols.min() < 0:
+                            raise Exception(
+                                "Matrix.from_binary(): 'j' index values less than 0"
+                            )
+                    else:
+                        # icount is 1-based and column-major
+                        icount_block = block["j"].astype(np.int64) - 1
+                        icols = icount_block // nrow
+                        irows = icount_block - (icols * nrow)
+                    vals = block["dtemp"]
+                    if row_map is not None or col_map is not None:
+                        keep = np.ones(irows.shape[0], dtype=bool)
+                        if row_map is not None:
+                            irows = row_map[irows]
+                            keep &= irows >= 0
+                        if col_map is not None:
+                            icols = col_map[icols]
+                            keep &= icols >= 0
+                        irows, icols, vals = irows[keep], icols[keep], vals[keep]
+                    if sparse:
+                        triplets.append((irows, icols, np.array(vals)))
+                    else:
+                        x[irows, icols] = vals
+                del data
+            if sparse:
+                if len(triplets) > 0:
+                    irows, icols, vals = [np.concatenate(t) for t in zip(*triplets)]
+                else:
+                    irows, icols, vals = [], [], []
+                x = _get_sparse().csr_matrix((vals, (irows, icols)), shape=shape)
+        if row_idxs is not None:
+            file_row_names = [file_row_names[i] for i in row_idxs]
+        if col_idxs is not None:
+            file_col_names = [file_col_names[i] for i in col_idxs]
+        return x, file_row_names, file_col_names
 
     @staticmethod
     def from_fortranfile(filename):
@@ -2066,9 +2547,9 @@ class Matrix(object):
         f_out.close()
         f_out = open(filename, "ab")
         if self.isdiagonal:
-            x = np.diag(self.__x[:, 0])
+            x = np.diag(self.x[:, 0])
         else:
-            x = self.__x
+            x = self.as_2d
         np.savetxt(f_out, x, fmt="%15.7E", delimiter="")
         f_out.close()
         f_out = open(filename, "a")
@@ -2280,9 +2761,9 @@ class Matrix(object):
 
         """
         if self.isdiagonal:
-            x = np.diag(self.__x[:, 0])
+            x = np.diag(self.x[:, 0])
         else:
-            x = self.__x
+            x = self.as_2d
         return pd.DataFrame(data=x, index=self.row_names, columns=self.col_names)
 
     def extend(self, other):
@@ -2449,6 +2930,8 @@ class Cov(Matrix):
         #    assert row_names == col_names
         self.__identity = None
         self.__zero = None
+        self.__factors = {}
+        self.__factors_key = None
         # if len(row_names) > 0 and len(col_names) > 0:
         #    assert row_names == col_names
         if len(names) != 0 and len(row_names) == 0:
@@ -2502,6 +2985,32 @@ class Cov(Matrix):
             )
         return self.__zero
 
+    def _factor_cache(self):
+        """private: a dict to memoize factorizations of `Cov` (or of blocks of
+        `Cov`) in, so that repeated ensemble draws skip the decomposition.
+        The dict is emptied if the values or names of `Cov` have changed
+        since the last call
+        """
+        key = self._content_key()
+        if key != self.__factors_key:
+            self.__factors = {}
+            self.__factors_key = key
+        return self.__factors
+
+    def _content_key(self):
+        """private: a hash of the names and values of `Cov`"""
+        h = hashlib.sha1()
+        x = self.x
+        arrays = [x]
+        if self.issparse:
+            arrays = [x.data, x.indices, x.indptr]
+            h.update(x.format.encode())
+        h.update(repr((self.isdiagonal, self.shape)).encode())
+        h.update("\n".join(self.row_names).encode())
+        for arr in arrays:
+            h.update(np.ascontiguousarray(arr))
+        return h.hexdigest()
+
     def condition_on(self, conditioning_elements):
         """get a new Covariance object that is conditional on knowing some
         elements.  uses Schur's complement for conditional Covariance
@@ -2570,7 +3079,7 @@ class Cov(Matrix):
         other_idxs = other.indices(other.names, 0)
 
         if self.isdiagonal and other.isdiagonal:
-            self._Matrix__x[self_idxs] = other.x[other_idxs]
+            self.x[self_idxs] = other.x[other_idxs]
             return
         if self.isdiagonal:
             self._Matrix__x = self.as_2d
@@ -2580,7 +3089,7 @@ class Cov(Matrix):
         other_x = other.as_2d
         # print("replacing")
         for i, ii in zip(self_idxs, other_idxs):
-            self._Matrix__x[i, self_idxs] = other_x[ii, other_idxs].copy()
+            self.x[i, self_idxs] = other_x[ii, other_idxs].copy()
         # print("resetting")
         # self.reset_x(self_x)
         # self.isdiagonal = False
@@ -2926,6 +3435,123 @@ class Cov(Matrix):
         f.close()
         return nentries
 
+    @classmethod
+    def from_blocks(cls, blocks, names=None, filename=None):
+        """build a block-diagonal `Cov` from independent blocks
+
+        Args:
+            blocks ([`Cov`]): the diagonal blocks.  Each block can be diagonal,
+                dense or sparse.  Can be a generator so that only one block
+                is in memory at a time
+            names ([`str`]): the names (in order) of the block-diagonal `Cov`.
+                Every name must be in exactly one block.  If None, the names of
+                the blocks are used in order.  Required if `filename` is passed.
+                Default is None
+            filename (`str`): a PEST-compatible binary file to write each block
+                to as it is processed.  If passed, the full matrix is never held
+                in memory.  Default is None
+
+        Returns:
+            `Cov`: a `Cov` with sparse storage.  If `filename` is passed, a lazily
+            loaded `Cov` of `filename`
+
+        Example::
+
+            blocks = [pyemu.Cov.from_parameter_data(pst).get(pst.adj_par_names[:10]),
+                      gs.covariance_matrix(pp_df.x,pp_df.y,pp_df.parnme)]
+            cov = pyemu.Cov.from_blocks(blocks)
+            pe = pyemu.ParameterEnsemble.from_gaussian_draw(pst,cov,by_groups=False)
+
+        """
+        if names is None:
+            if filename is not None:
+                raise Exception("Cov.from_blocks(): names required with filename")
+            blocks = list(blocks)
+            names = [name for block in blocks for name in block.row_names]
+        names = [str(name).lower() for name in names]
+        name_idx = {name: i for i, name in enumerate(names)}
+        if len(name_idx) != len(names):
+            raise Exception("Cov.from_blocks(): duplicate names")
+        nrow = len(names)
+        covered = np.zeros(nrow, dtype=bool)
+
+        if filename is None:
+            rows, cols, vals = [np.zeros(0, dtype=int)], [np.zeros(0, dtype=int)], []
+            for r, c, v in Cov._block_triplets(blocks, names, name_idx, covered):
+                rows.append(r)
+                cols.append(c)
+                vals.append(v)
+            x = _get_sparse().csr_matrix(
+                (
+                    np.concatenate(vals + [np.zeros(0)]),
+                    (np.concatenate(rows), np.concatenate(cols)),
+                ),
+                shape=(nrow, nrow),
+            )
+        else:
+            f = open(filename, "wb")
+            # write a placeholder header, nnz is patched once all blocks are written
+            header = np.array((-nrow, -nrow, 0), dtype=Matrix.binary_header_dt)
+            header.tofile(f)
+            nnz = 0
+            try:
+                for r, c, v in Cov._block_triplets(blocks, names, name_idx, covered):
+                    if np.any(np.isnan(v)):
+                        raise Exception("Cov.from_blocks(): nans found")
+                    icount = r + 1 + c.astype(np.int64) * nrow
+                    Matrix._pack_records(Matrix.binary_rec_dt, [icount, v]).tofile(f)
+                    nnz += r.shape[0]
+                if not np.all(covered):
+                    raise Exception(
+                        "Cov.from_blocks(): names not in any block: "
+                        + ",".join([names[i] for i in np.flatnonzero(~covered)])
+                    )
+            except Exception:
+                f.close()
+                os.remove(filename)
+                raise
+            Matrix._encode_name_table(
+                names, names, Matrix.par_length, Matrix.obs_length
+            ).tofile(f)
+            header["icount"] = nnz
+            f.seek(0)
+            header.tofile(f)
+            f.close()
+            return cls.from_binary(filename, lazy=True, sparse=True)
+        if not np.all(covered):
+            raise Exception(
+                "Cov.from_blocks(): names not in any block: "
+                + ",".join([names[i] for i in np.flatnonzero(~covered)])
+            )
+        return cls(x=x, names=names)
+
+    @staticmethod
+    def _block_triplets(blocks, names, name_idx, covered):
+        """private: generator of the (row index, col index, value) triplets
+        of each block for `Cov.from_blocks()`.  `covered` is updated in place
+        """
+        for block in blocks:
+            missing = [name for name in block.row_names if name not in name_idx]
+            if len(missing) > 0:
+                raise Exception(
+                    "Cov.from_blocks(): block names not in names: " + ",".join(missing)
+                )
+            idx = np.array([name_idx[name] for name in block.row_names], dtype=int)
+            if np.any(covered[idx]):
+                raise Exception(
+                    "Cov.from_blocks(): names in more than one block: "
+                    + ",".join([names[i] for i in idx[covered[idx]]])
+                )
+            covered[idx] = True
+            if block.isdiagonal:
+                yield idx, idx, block.x.flatten()
+            elif block.issparse:
+                coo = block.x.tocoo()
+                yield idx[coo.row], idx[coo.col], coo.data
+            else:
+                r, c = np.nonzero(block.x)
+                yield idx[r], idx[c], block.x[r, c]
+
     @classmethod
     def identity_like(cls, other):
         """Get an identity matrix Cov instance like other `Cov`
@@ -2805,7 +2805,7 @@ class Pst(object):
         """
         pst_utils.write_input_files(self, pst_path=pst_path)
 
-    def process_output_files(self, pst_path="."):
+    def process_output_files(self, pst_path=".", num_workers=1, return_timing=False):
         """processing the model output files using the instruction files
         and existing model output files.
 
@@ -2813,16 +2813,26 @@ class Pst(object):
             pst_path (`str`): relative path from where python is running to
                 where the control file, instruction files and model output files
                 are located.  Default is "." (current python directory)
+            num_workers (`int`): number of threads used to process the
+                instruction/output file pairs.  Default is 1 (serial)
+            return_timing (`bool`): flag to also return a per-file timing
+                dataframe.  Default is False
 
         Returns:
-            `pandas.Series`: model output values
+            `pandas.DataFrame`: model output values, indexed on `Pst.obs_names`.
+            If `return_timing` is True, a per-instruction-file timing dataframe
+            is also returned
 
         Note:
             requires a complete set of model input files at relative path
             from where python is running to `pst_path`
 
+            see `pyemu.pst_utils.process_output_files()`
+
         """
-        return pst_utils.process_output_files(self, pst_path)
+        return pst_utils.process_output_files(
+            self, pst_path, num_workers=num_workers, return_timing=return_timing
+        )
 
     def get_res_stats(self, nonzero=True):
         """get some common residual stats by observation group.
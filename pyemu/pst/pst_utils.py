@@ -3,7 +3,12 @@ from __future__ import print_function, division
 import os
 import warnings
 import multiprocessing as mp
+import mmap
 import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import pandas as pd
 
@@ -436,7 +441,12 @@ def write_input_files(pst, pst_path="."):
         This function uses template files with the current parameter \
         values (stored in `pst.parameter_data.parval1`).
 
-        This function uses multiprocessing - one process per template file
+        Each template file is parsed once into a `TemplateFile` and cached,
+        so repeated calls only render and write the input files.
+
+        This function uses the executor from `pyemu.os_utils.get_executor()`
+        (by default a persistent process pool) to process chunks of template
+        files - see `pyemu.os_utils.set_executor()`
 
         This is a simple implementation of what PEST does.  It does not
         handle all the special cases, just a basic function...user beware
@@ -444,41 +454,98 @@ def write_input_files(pst, pst_path="."):
     """
     par = pst.parameter_data
     par.loc[:, "parval1_trans"] = (par.parval1 * par.scale) + par.offset
-    pairs = np.array(list(zip(pst.template_files, pst.input_files)))
+    pairs = list(zip(pst.template_files, pst.input_files))
     num_tpl = len(pairs)
     chunk_len = 50
-    num_chunk_floor = num_tpl // chunk_len
-    main_chunks = (
-        pairs[: num_chunk_floor * chunk_len].reshape([-1, chunk_len, 2]).tolist()
-    )  # the list of files broken down into chunks
-    remainder = pairs[num_chunk_floor * chunk_len :].tolist()  # remaining files
-    chunks = main_chunks + [remainder]
-#    procs = []
-#   for chunk in chunks:
-#        # write_to_template(pst.parameter_data.parval1_trans,os.path.join(pst_path,tpl_file),
-#        #                  os.path.join(pst_path,in_file))
-#        p = mp.Process(
-#            target=_write_chunk_to_template,
-#            args=[chunk, pst.parameter_data.parval1_trans, pst_path],
-#        )
-#        p.start()
-#        procs.append(p)
-#    for p in procs:
-#        p.join()
-    pool = mp.Pool()
-    x = [
-        pool.apply_async(_write_chunk_to_template, args=(chunk, pst.parameter_data.parval1_trans, pst_path))
-        for i, chunk in enumerate(chunks)
-    ]
-    [xx.get() for xx in x]
-    pool.close()
-    pool.join()
+    # the list of files broken down into chunks
+    chunks = [pairs[i : i + chunk_len] for i in range(0, num_tpl, chunk_len)]
+    # the workers read the values from shared memory and keep their parsed
+    # templates between calls
+    parvals = pyemu.os_utils._share(pst.parameter_data.parval1_trans)
+    try:
+        pyemu.os_utils._run_tasks(
+            _write_chunk_to_template, [(chunk, parvals, pst_path) for chunk in chunks]
+        )
+    finally:
+        pyemu.os_utils._unshare(parvals)
+
 
 def _write_chunk_to_template(chunk, parvals, pst_path):
+    parvals = pyemu.os_utils._get_shared(parvals)
     for tpl_file, in_file in chunk:
         tpl_file = os.path.join(pst_path, tpl_file)
         in_file = os.path.join(pst_path, in_file)
-        write_to_template(parvals, tpl_file, in_file)
+        _get_template_file(tpl_file).write_input_file(parvals, in_file)
+
+
+class _FileCache(object):
+    """a bounded, least-recently-used cache of objects parsed from files,
+    keyed on absolute path.  A cached object is only reused while the file's
+    modification time and size are unchanged
+
+    Args:
+        max_entries (`int`): the max number of cached objects
+
+    """
+
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        # the forward-run helpers read files from threads
+        self._lock = threading.Lock()
+
+    def get(self, filename, load, reuse=None):
+        """get the object parsed from `filename`
+
+        Args:
+            filename (`str`): the file
+            load (`callable`): function that parses `filename` into the object
+            reuse (`callable`): optional function of a cached object that
+                returns False if it can't be reused
+
+        Returns:
+            the (possibly cached) object parsed from `filename`
+
+        """
+        key = os.path.abspath(filename)
+        st = os.stat(key)
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            cached = self._entries.get(key, None)
+            if cached is not None and cached[0] == stamp:
+                if reuse is None or reuse(cached[1]):
+                    self._entries.move_to_end(key)
+                    return cached[1]
+        obj = load(filename)
+        with self._lock:
+            self._entries[key] = (stamp, obj)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max(0, self.max_entries):
+                self._entries.popitem(last=False)
+        return obj
+
+    def clear(self):
+        """remove all cached objects"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, filename):
+        return os.path.abspath(filename) in self._entries
+
+
+# parsed template files, keyed on absolute path
+_template_file_cache = _FileCache(max_entries=1024)
+
+
+def _get_template_file(tpl_file):
+    """get a `TemplateFile` for `tpl_file`, reusing the cached instance
+    if the file has not changed on disk since it was parsed
+
+    """
+    return _template_file_cache.get(tpl_file, TemplateFile)
 
 
 def write_to_template(parvals, tpl_file, in_file):
@@ -491,57 +558,17 @@ def write_to_template(parvals, tpl_file, in_file):
         tpl_file (`str`): path and name of a template file
         in_file (`str`): path and name of model input file to write
 
+    Note:
+        The template file is parsed once and cached (see `TemplateFile`);
+        later calls with the same template only render the new values.
+
     Examples::
 
         pyemu.pst_utils.write_to_template(par.parameter_data.parval1,
                                           "my.tpl","my.input")
 
     """
-    f_in = open(in_file, "w")
-    f_tpl = open(tpl_file, "r")
-    header = f_tpl.readline().strip().split()
-    if header[0].lower() not in ["ptf", "jtf"]:
-        raise Exception(
-            "template file error: must start with [ptf,jtf], not:" + str(header[0])
-        )
-    if len(header) != 2:
-        raise Exception(
-            "template file error: header line must have two entries: " + str(header)
-        )
-
-    marker = header[1]
-    if len(marker) != 1:
-        raise Exception(
-            "template file error: marker must be a single character, not:" + str(marker)
-        )
-    for line in f_tpl:
-        if marker not in line:
-            f_in.write(line)
-        else:
-            line = line.rstrip()
-            par_names = line.lower().split(marker)[1::2]
-            par_names = [name.strip() for name in par_names]
-            start, end = _get_marker_indices(marker, line)
-            if len(par_names) != len(start):
-                raise Exception("par_names != start")
-            new_line = line[: start[0]]
-            between = [line[e:s] for s, e in zip(start[1:], end[:-1])]
-            for i, name in enumerate(par_names):
-                s, e = start[i], end[i]
-                w = e - s
-                if w > 15:
-                    d = 6
-                else:
-                    d = 3
-                fmt = "{0:" + str(w) + "." + str(d) + "E}"
-                val_str = fmt.format(parvals[name])
-                new_line += val_str
-                if i != len(par_names) - 1:
-                    new_line += between[i]
-            new_line += line[end[-1] :]
-            f_in.write(new_line + "\n")
-    f_tpl.close()
-    f_in.close()
+    _get_template_file(tpl_file).write_input_file(parvals, in_file)
 
 
 def _get_marker_indices(marker, line):
@@ -1078,6 +1105,153 @@ def csv_to_ins_file(
     return odf
 
 
+class TemplateFile(object):
+    """class for handling template files.  The template is parsed once into
+    a reusable plan of static text and parameter slots, so that writing a
+    model input file for a new set of parameter values is a single
+    formatting pass and a single write.
+
+    Args:
+        tpl_filename (`str`): path and name of an existing template file
+
+    Example::
+
+        t = TemplateFile("my.tpl")
+        t.write_input_file(pst.parameter_data.parval1, "my.input")
+
+    """
+
+    def __init__(self, tpl_filename):
+        self._tpl_filename = tpl_filename
+        self._marker = None
+        # unique parameter names, in order of first appearance
+        self._par_names = []
+        # index into _par_names for each slot in the file
+        self._slot_par_idx = None
+        # one str.format() template for the whole file
+        self._fmt = None
+
+        self.read_tpl_file()
+
+    @property
+    def par_names(self):
+        """the unique parameter names found in the template file
+
+        Returns:
+            [`str`]: parameter names, in order of first appearance
+
+        """
+        return list(self._par_names)
+
+    @property
+    def marker(self):
+        return self._marker
+
+    def read_tpl_file(self):
+        """read the template file and compile it into a rendering plan
+
+        Note:
+
+            This is called by the constructor
+
+        """
+        with open(self._tpl_filename, "r") as f:
+            header = f.readline().strip().split()
+            if len(header) == 0 or header[0].lower() not in ["ptf", "jtf"]:
+                raise Exception(
+                    "template file error: must start with [ptf,jtf], not:"
+                    + str(header[0] if len(header) > 0 else header)
+                )
+            if len(header) != 2:
+                raise Exception(
+                    "template file error: header line must have two entries: "
+                    + str(header)
+                )
+            marker = header[1]
+            if len(marker) != 1:
+                raise Exception(
+                    "template file error: marker must be a single character, not:"
+                    + str(marker)
+                )
+            self._marker = marker
+            lines = f.readlines()
+
+        name_idx = {}
+        slot_par_idx = []
+        parts = []
+        for line in lines:
+            if marker not in line:
+                parts.append(line.replace("{", "{{").replace("}", "}}"))
+                continue
+            line = line.rstrip()
+            if line.count(marker) % 2 != 0:
+                raise Exception(
+                    "template file error: odd number of markers on line: " + line
+                )
+            start, end = _get_marker_indices(marker, line)
+            last = 0
+            for s, e in zip(start, end):
+                name = line[s + 1 : e - 1].lower().strip()
+                if name not in name_idx:
+                    name_idx[name] = len(self._par_names)
+                    self._par_names.append(name)
+                w = e - s
+                d = 6 if w > 15 else 3
+                parts.append(line[last:s].replace("{", "{{").replace("}", "}}"))
+                parts.append("{" + "{0}:{1}.{2}E".format(len(slot_par_idx), w, d) + "}")
+                slot_par_idx.append(name_idx[name])
+                last = e
+            parts.append(line[last:].replace("{", "{{").replace("}", "}}") + "\n")
+        self._slot_par_idx = np.array(slot_par_idx, dtype=int)
+        self._fmt = "".join(parts)
+
+    def _get_values(self, parvals):
+        """get the values of the template parameters from a `dict` or
+        `pandas.Series` as a float array, in `par_names` order
+
+        """
+        if isinstance(parvals, pd.Series):
+            if not parvals.index.is_unique:
+                raise Exception("TemplateFile: parvals index has duplicate names")
+            # the index hash table is built once and reused for every file
+            idx = parvals.index.get_indexer(self._par_names)
+            if np.any(idx < 0):
+                missing = [n for n, i in zip(self._par_names, idx) if i < 0]
+                raise KeyError(
+                    "TemplateFile: parameters not found in parvals: "
+                    + ",".join(sorted(missing))
+                )
+            return parvals.values[idx].astype(float)
+        return np.array([parvals[name] for name in self._par_names], dtype=float)
+
+    def render(self, parvals):
+        """fill the template with parameter values
+
+        Args:
+            parvals (`dict`): a container of parameter names and values.  Can
+                also be a `pandas.Series`
+
+        Returns:
+            `str`: the contents of the model input file
+
+        """
+        vals = self._get_values(parvals)[self._slot_par_idx]
+        return self._fmt.format(*vals.tolist())
+
+    def write_input_file(self, parvals, in_file):
+        """write a model input file for a set of parameter values
+
+        Args:
+            parvals (`dict`): a container of parameter names and values.  Can
+                also be a `pandas.Series`
+            in_file (`str`): path and name of model input file to write
+
+        """
+        contents = self.render(parvals)
+        with open(in_file, "w") as f:
+            f.write(contents)
+
+
 class InstructionFile(object):
     """class for handling instruction files.
 
@@ -1109,6 +1283,9 @@ class InstructionFile(object):
 
         self._instruction_lines = []
         self._instruction_lcount = []
+        # compiled execution plan - see _compile_plan()
+        self._plan = []
+        self._bulk = None
 
         self.read_ins_file()
 
@@ -1202,6 +1379,117 @@ class InstructionFile(object):
 
             self._instruction_lines.append(line)
             self._instruction_lcount.append(self._ins_linecount)
+        if self._ins_filehandle is not None:
+            self._ins_filehandle.close()
+            self._ins_filehandle = None
+        self._compile_plan()
+
+    def _compile_plan(self):
+        """compile the instruction lines into an execution plan.
+
+        Note:
+
+            Each instruction is translated once into an operation tuple.
+            Line advances are resolved to absolute output file line numbers
+            up to the first instruction whose position depends on the output
+            file contents (e.g. a primary marker search).  Lines in that
+            leading block that only hold fixed-column observations are
+            collected into `self._bulk` so they can be read with numpy in
+            one pass instead of being interpreted.
+
+            This is called by `InstructionFile.read_ins_file()`
+
+        """
+        plan = []
+        bulk_lines, bulk_start, bulk_end, bulk_names, bulk_lcount = [], [], [], [], []
+        # 0-based index of the current output file line, None once unknown
+        abs_line = -1
+        for ins_line, ins_lcount in zip(
+            self._instruction_lines, self._instruction_lcount
+        ):
+            ops = []
+            for ii, ins in enumerate(ins_line):
+                if ii == 0 and ins.startswith(self._marker):
+                    mstr = ins.replace(self._marker, "")
+                    pattern = re.compile(
+                        re.escape(mstr.encode("latin-1", errors="replace")),
+                        re.IGNORECASE,
+                    )
+                    ops.append(("p", mstr, pattern))
+                elif ins.startswith("l"):
+                    try:
+                        ops.append(("l", int(ins[1:])))
+                    except Exception as e:
+                        ops.append(("?", ins, "l"))
+                elif ins == "w":
+                    ops.append(("w",))
+                elif ins.startswith("!"):
+                    m = None
+                    if ii < len(ins_line) - 1 and ins_line[ii + 1].startswith(
+                        self._marker
+                    ):
+                        m = ins_line[ii + 1].replace(self._marker, "")
+                    ops.append(("!", ins.replace("!", ""), m))
+                elif ins.startswith(self._marker):
+                    ops.append(("m", ins.replace(self._marker, "")))
+                elif ins.startswith("[") or ins.startswith("("):
+                    ops.append(self._compile_column_ins(ins))
+                else:
+                    ops.append(("?", ins, None))
+
+            bulk = False
+            if abs_line is not None:
+                seen_obs = False
+                for op in ops:
+                    if op[0] in ["p", "?"] or (op[0] == "m" and not seen_obs):
+                        abs_line = None
+                        break
+                    elif op[0] in ["!", "[", "("]:
+                        seen_obs = True
+                    elif op[0] == "l":
+                        abs_line += op[1]
+                if (
+                    abs_line is not None
+                    and len(ops) > 1
+                    and ops[0][0] == "l"
+                    and ops[0][1] > 0
+                    and all([op[0] == "[" for op in ops[1:]])
+                ):
+                    bulk = True
+                    for op in ops[1:]:
+                        if op[1] == "dum":
+                            continue
+                        bulk_lines.append(abs_line)
+                        bulk_start.append(op[2])
+                        bulk_end.append(op[3])
+                        bulk_names.append(op[1])
+                        bulk_lcount.append(ins_lcount)
+            plan.append((ops, ins_lcount, abs_line if bulk else None))
+        self._plan = plan
+        self._bulk = None
+        if len(bulk_names) > 0:
+            self._bulk = {
+                "line": np.array(bulk_lines, dtype=np.int64),
+                "start": np.array(bulk_start, dtype=np.int64),
+                "end": np.array(bulk_end, dtype=np.int64),
+                "names": bulk_names,
+                "lcount": bulk_lcount,
+            }
+
+    def _compile_column_ins(self, ins):
+        """compile a fixed ('[obs]s:e') or semi-fixed ('(obs)s:e') observation
+        instruction into a ('[' or '(', name, start, end) tuple, where start
+        and end are the 0-based slice bounds of the columns
+        """
+        eomarker = "]" if ins[0] == "[" else ")"
+        try:
+            oname, cols = ins[1:].split(eomarker)
+            s, e = [int(c) for c in cols.split(":")]
+        except Exception as e:
+            return ("?", ins, None)
+        if s < 1 or e < s:
+            return ("?", ins, None)
+        return (ins[0], oname, s - 1, e)
 
     def throw_ins_warning(self, message, lcount=None):
         """throw a verbose PyemuWarning
@@ -1263,137 +1551,277 @@ class InstructionFile(object):
             extracted from `output_file`
 
 
+        """
+        names, vals = self.read_output_values(output_file)
+        df = pd.DataFrame({"obsval": vals}, index=names)
+        df.sort_index(inplace=True)
+        return df
+
+    def read_output_values(self, output_file):
+        """process a model output file using the compiled instructions,
+        without building a dataframe
+
+        Args:
+            output_file (`str`): path and name of existing output file
+
+        Returns:
+            tuple containing
+
+            - **[`str`]**: observation names, in instruction file order
+            - **numpy.ndarray**: simulated values for each name
+
+        Note:
+            The output file is memory-mapped, so only the lines actually
+            visited by the instructions are decoded.  The same
+            `InstructionFile` can be used to process any number of output
+            files.
+
         """
         self._out_filename = output_file
-        val_dict = {}
-        for ins_line, ins_lcount in zip(
-            self._instruction_lines, self._instruction_lcount
-        ):
-            # try:
-            val_dict.update(self._execute_ins_line(ins_line, ins_lcount))
-            # except Exception as e:
-            #    raise Exception(str(e))
-        s = pd.Series(val_dict)
-        s.sort_index(inplace=True)
-
-        return pd.DataFrame({"obsval": s}, index=s.index)
-
-    def _execute_ins_line(self, ins_line, ins_lcount):
-        """private method to process output file lines with an instruction line"""
-        cursor_pos = 0
-        val_dict = {}
-        # for ii,ins in enumerate(ins_line):
-        ii = 0
-        all_markers = True
-        line_seps = set([",", " ", "\t"])
-        while True:
-            if ii >= len(ins_line):
-                break
-            ins = ins_line[ii]
+        self._out_linecount = 0
+        if not os.path.exists(output_file):
+            raise Exception("output file '{0}' not found".format(output_file))
+        with open(output_file, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return self._execute_plan(b"")
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                return self._execute_plan(mm)
+            finally:
+                try:
+                    mm.close()
+                except BufferError:
+                    # an exception traceback is still holding a view -
+                    # the map is released with it
+                    pass
+
+    def _execute_plan(self, data):
+        """private method to run the compiled plan against the (memory-mapped)
+        contents of an output file
+        """
+        buf = np.frombuffer(data, dtype=np.uint8)
+        starts = np.concatenate(([0], np.flatnonzero(buf == 10) + 1))
+        if starts[-1] != buf.shape[0]:
+            starts = np.append(starts, buf.shape[0])
+        nlines = starts.shape[0] - 1
+
+        names, vals = [], []
+        if self._bulk is not None:
+            bnames, bvals = self._read_bulk(buf, starts)
+            names.extend(bnames)
+            vals.extend(bvals)
+        del buf
+
+        def getline(i):
+            self._out_linecount = i + 1
+            line = data[starts[i] : starts[i + 1]].decode("latin-1").lower()
+            if line.endswith("\r\n"):
+                line = line[:-2] + "\n"
+            return line
 
-            # primary marker
-            if ii == 0 and ins.startswith(self._marker):
-                mstr = ins.replace(self._marker, "")
-                while True:
-                    line = self._readline_output()
-                    if line is None:
+        line_seps = set([",", " ", "\t"])
+        cur, line, sline = -1, None, None
+        for ops, ins_lcount, bulk_line in self._plan:
+            if bulk_line is not None:
+                # values already read by _read_bulk()
+                cur = bulk_line
+                continue
+            cursor_pos = 0
+            ii = 0
+            all_markers = True
+            while ii < len(ops):
+                op = ops[ii]
+                code = op[0]
+
+                # primary marker
+                if code == "p":
+                    match = None
+                    if cur + 1 < nlines:
+                        match = op[2].search(data, int(starts[cur + 1]))
+                    if match is None:
                         self.throw_out_error(
                             "EOF when trying to find primary marker '{0}' from instruction file line {1}".format(
-                                mstr, ins_lcount
+                                op[1], ins_lcount
                             )
                         )
-                    if mstr in line:
-                        break
-                cursor_pos = line.index(mstr) + len(mstr)
-
-            # line advance
-            elif ins.startswith("l"):
-                try:
-                    nlines = int(ins[1:])
-                except Exception as e:
-                    self.throw_ins_error(
-                        "casting line advance to int for instruction '{0}'".format(ins),
-                        ins_lcount,
-                    )
-                for i in range(nlines):
-                    line = self._readline_output()
-                    if line is None:
+                    cur = int(np.searchsorted(starts, match.start(), side="right")) - 1
+                    line = getline(cur)
+                    sline = line.replace(",", " ")
+                    cursor_pos = line.index(op[1]) + len(op[1])
+
+                # line advance
+                elif code == "l":
+                    if cur + op[1] >= nlines:
+                        self._out_linecount = nlines + 1
                         self.throw_out_error(
                             "EOF when trying to read {0} lines for line advance instruction '{1}', from instruction file line number {2}".format(
-                                nlines, ins, ins_lcount
+                                op[1], "l{0}".format(op[1]), ins_lcount
                             )
                         )
-            elif ins == "w":
-                raw = line[cursor_pos:].replace(",", " ").split()
-                if line[cursor_pos] in line_seps:
-                    raw.insert(0, "")
-                if len(raw) == 1:
-                    self.throw_out_error(
-                        "no whitespaces found on output line {0} past {1}".format(
-                            line, cursor_pos
+                    if op[1] > 0:
+                        cur += op[1]
+                        line = getline(cur)
+                        sline = line.replace(",", " ")
+
+                elif code == "w":
+                    raw = sline[cursor_pos:].split()
+                    if line[cursor_pos] in line_seps:
+                        raw.insert(0, "")
+                    if len(raw) == 1:
+                        self.throw_out_error(
+                            "no whitespaces found on output line {0} past {1}".format(
+                                line, cursor_pos
+                            )
                         )
-                    )
-                # step over current value
-                cursor_pos = cursor_pos + line[cursor_pos:].replace(",", " ").index(" ")
-                # now find position of next entry
-                cursor_pos = cursor_pos + line[cursor_pos:].replace(",", " ").index(
-                    raw[1]
-                )
-
-            elif ins.startswith("!"):
-                oname = ins.replace("!", "")
-                # look a head for a sec marker
-                if ii < len(ins_line) - 1 and ins_line[ii + 1].startswith(self._marker):
-                    m = ins_line[ii + 1].replace(self._marker, "")
-                    if m not in line[cursor_pos:]:
+                    # step over current value
+                    cursor_pos = sline.index(" ", cursor_pos)
+                    # now find position of next entry
+                    cursor_pos = sline.index(raw[1], cursor_pos)
+
+                elif code == "!":
+                    oname, m = op[1], op[2]
+                    # look a head for a sec marker
+                    if m is not None:
+                        if m not in line[cursor_pos:]:
+                            self.throw_out_error(
+                                "secondary marker '{0}' not found from cursor_pos {1}".format(
+                                    m, cursor_pos
+                                )
+                            )
+                        val_str = line[cursor_pos:].split(m)[0]
+                    else:
+                        raw = sline[cursor_pos:].split(None, 1)
+                        if len(raw) == 0:
+                            self.throw_out_error(
+                                "no value found for instruction '!{0}!' past {1}".format(
+                                    oname, cursor_pos
+                                )
+                            )
+                        val_str = raw[0]
+                    try:
+                        val = float(val_str)
+                    except Exception as e:
                         self.throw_out_error(
-                            "secondary marker '{0}' not found from cursor_pos {2}".format(
-                                m, cursor_pos
+                            "casting string '{0}' to float for instruction '!{1}!'".format(
+                                val_str, oname
                             )
                         )
-                    val_str = line[cursor_pos:].split(m)[0]
+                    if oname != "dum":
+                        names.append(oname)
+                        vals.append(val)
+                    cursor_pos = line.index(val_str.strip(), cursor_pos) + len(val_str)
+                    all_markers = False
+
+                elif code == "[" or code == "(":
+                    oname, s, e = op[1], op[2], op[3]
+                    if code == "(":
+                        s, e = self._semi_fixed_bounds(line, s, e)
+                    val_str = line[s:e]
+                    try:
+                        val = float(val_str)
+                    except Exception as e:
+                        self.throw_out_error(
+                            "casting string '{0}' to float for instruction '{1}{2}'".format(
+                                val_str, code, oname
+                            )
+                        )
+                    if oname != "dum":
+                        names.append(oname)
+                        vals.append(val)
+                    cursor_pos = e
+                    all_markers = False
+
+                elif code == "m":
+                    m = op[1]
+                    if m not in line[cursor_pos:]:
+                        if all_markers:
+                            ii = 0
+                            continue
+                        else:
+                            self.throw_out_error(
+                                "secondary marker '{0}' not found from cursor_pos {1}".format(
+                                    m, cursor_pos
+                                )
+                            )
+                    cursor_pos = line.index(m, cursor_pos) + len(m)
+
+                elif op[2] == "l":
+                    self.throw_ins_error(
+                        "casting line advance to int for instruction '{0}'".format(
+                            op[1]
+                        ),
+                        ins_lcount,
+                    )
                 else:
-                    val_str = line[cursor_pos:].replace(",", " ").split()[0]
-                try:
-                    val = float(val_str)
-                except Exception as e:
                     self.throw_out_error(
-                        "casting string '{0}' to float for instruction '{1}'".format(
-                            val_str, ins
+                        "unrecognized instruction '{0}' on ins file line {1}".format(
+                            op[1], ins_lcount
                         )
                     )
+                ii += 1
+        return names, np.array(vals, dtype=float)
 
-                if oname != "dum":
-                    val_dict[oname] = val
-                ipos = line[cursor_pos:].index(val_str.strip())
-                # val_len = len(val_str)
-                cursor_pos = (
-                    cursor_pos + line[cursor_pos:].index(val_str.strip()) + len(val_str)
+    def _read_bulk(self, buf, starts):
+        """private method to read all the fixed-column observations that sit
+        at known line numbers with one gather and one string-to-float cast per
+        column width
+        """
+        bulk = self._bulk
+        nlines = starts.shape[0] - 1
+        if bulk["line"].max() >= nlines:
+            i = int(np.argmax(bulk["line"] >= nlines))
+            self._out_linecount = nlines + 1
+            self.throw_out_error(
+                "EOF when trying to read line {0} for fixed observation '{1}', from instruction file line number {2}".format(
+                    bulk["line"][i] + 1, bulk["names"][i], bulk["lcount"][i]
                 )
-                all_markers = False
-
-            elif ins.startswith(self._marker):
-                m = ins.replace(self._marker, "")
-                if m not in line[cursor_pos:]:
-                    if all_markers:
-                        ii = 0
-                        continue
-                    else:
+            )
+        # end of each line's content, excluding the line terminator
+        line_start = starts[bulk["line"]]
+        line_end = starts[bulk["line"] + 1]
+        for term in [10, 13]:
+            strip = (line_end > line_start) & (buf[np.maximum(line_end - 1, 0)] == term)
+            line_end = line_end - strip.astype(np.int64)
+        vals = np.zeros(len(bulk["names"]), dtype=float)
+        width = bulk["end"] - bulk["start"]
+        for w in np.unique(width):
+            idx = np.flatnonzero(width == w)
+            offsets = line_start[idx, None] + bulk["start"][idx, None] + np.arange(w)
+            inside = offsets < line_end[idx, None]
+            chars = np.full(offsets.shape, 32, dtype=np.uint8)
+            chars[inside] = buf[offsets[inside]]
+            strs = chars.view("S{0}".format(w)).ravel()
+            try:
+                vals[idx] = strs.astype(float)
+            except Exception as e:
+                for i, val_str in zip(idx, strs):
+                    try:
+                        float(val_str)
+                    except Exception as e:
+                        self._out_linecount = bulk["line"][i] + 1
                         self.throw_out_error(
-                            "secondary marker '{0}' not found from cursor_pos {2}".format(
-                                m, cursor_pos
+                            "casting string '{0}' to float for instruction '[{1}]'".format(
+                                val_str.decode("latin-1"), bulk["names"][i]
                             )
                         )
-                cursor_pos = cursor_pos + line[cursor_pos:].index(m) + len(m)
-
-            else:
-                self.throw_out_error(
-                    "unrecognized instruction '{0}' on ins file line {1}".format(
-                        ins, ins_lcount
-                    )
-                )
-            ii += 1
-        return val_dict
+        return bulk["names"], vals.tolist()
+
+    @staticmethod
+    def _semi_fixed_bounds(line, s, e):
+        """find the slice bounds of the number that overlaps columns s:e"""
+        seps = " ,\t\n"
+        i = s
+        while i < e and i < len(line) and line[i] in seps:
+            i += 1
+        if i >= e or i >= len(line):
+            return s, s
+        start = i
+        while start > 0 and line[start - 1] not in seps:
+            start -= 1
+        end = i
+        while end < len(line) and line[end] not in seps:
+            end += 1
+        return start, end
 
     def _readline_ins(self):
         """consolidate private method to read the next instruction file line.  Casts to lower and splits
@@ -1438,23 +1866,43 @@ class InstructionFile(object):
             tokens = line.strip().split()
         return tokens
 
-    def _readline_output(self):
-        """consolidate private method to read the next output file line.  Casts to lower"""
-        if self._out_filehandle is None:
-            if not os.path.exists(self._out_filename):
-                raise Exception(
-                    "output file '{0}' not found".format(self._out_filename)
-                )
-            self._out_filehandle = open(self._out_filename, "r")
-        line = self._out_filehandle.readline()
-        self._out_linecount += 1
-        if line == "":
-            return None
-        self._last_line = line
-        return line.lower()
+
+# parsed instruction files, keyed on absolute path
+_instruction_file_cache = _FileCache(max_entries=1024)
 
 
-def process_output_files(pst, pst_path="."):
+def _get_instruction_file(ins_file, pst=None, obs_name_set=None):
+    """get an `InstructionFile` for `ins_file`, reusing the cached instance
+    if the file has not changed on disk since it was parsed.  If `pst` is
+    passed, a cached instance is only reused if its observations are all in
+    `obs_name_set` (the set of `pst.obs_names`)
+
+    """
+    if not os.path.exists(ins_file):
+        raise Exception("instruction file '{0}' not found".format(ins_file))
+    return _instruction_file_cache.get(
+        ins_file,
+        lambda f: InstructionFile(f, pst=pst),
+        reuse=lambda ins: pst is None or ins.obs_name_set.issubset(obs_name_set),
+    )
+
+
+def _process_output_file(ins_file, out_file, pst, obs_name_set):
+    """process one (instruction file, output file) pair for
+    process_output_files().  Errors reading the output file are returned
+    rather than raised so they can be reported as warnings
+    """
+    t = time.perf_counter()
+    ins = _get_instruction_file(ins_file, pst, obs_name_set)
+    try:
+        names, vals = ins.read_output_values(out_file)
+        err = None
+    except Exception as e:
+        names, vals, err = [], np.zeros(0), e
+    return names, vals, err, time.perf_counter() - t
+
+
+def process_output_files(pst, pst_path=".", num_workers=1, return_timing=False):
     """helper function to process output files using the
       InstructionFile class
 
@@ -1463,37 +1911,82 @@ def process_output_files(pst, pst_path="."):
 
          pst_path (`str`): path to instruction and output files to append to the front
              of the names in the Pst instance
+         num_workers (`int`): number of threads used to process the
+             instruction/output file pairs.  Default is 1 (serial)
+         return_timing (`bool`): flag to also return a per-file timing
+             dataframe.  Default is False
 
      Returns:
          `pd.DataFrame`: dataframe of observation names and simulated values
-         extracted from the model output files listed in `pst`
+         extracted from the model output files listed in `pst`, indexed on
+         `pst.obs_names`.  Observations that were not read are NaN.  If
+         `return_timing` is True, a second dataframe with the number of
+         observations read and the processing time (seconds) for each
+         instruction file is also returned.
+
+    Note:
+        Parsed instruction files are cached between calls and only re-read
+        if they change on disk.
 
      Example::
 
          pst = pyemu.Pst("my.pst")
          df = pyemu.pst_utils.process_output_files(pst)
 
+         # use 4 threads and see where the time goes
+         df, timing = pyemu.pst_utils.process_output_files(pst, num_workers=4,
+                                                           return_timing=True)
+
 
     """
     if not isinstance(pst, pyemu.Pst):
         raise Exception(
             "process_output_files error: 'pst' arg must be pyemu.Pst instance"
         )
-    series = []
+    obs_names = pst.obs_names
+    obs_name_set = set(obs_names)
+    pairs = []
     for ins, out in zip(pst.instruction_files, pst.output_files):
         ins = os.path.join(pst_path, ins)
         out = os.path.join(pst_path, out)
         if not os.path.exists(out):
             warnings.warn("out file '{0}' not found".format(out), PyemuWarning)
-        f = os.path.join(pst_path, ins)
-        i = InstructionFile(ins, pst=pst)
-        try:
-            s = i.read_output_file(out)
-            series.append(s)
-        except Exception as e:
-            warnings.warn("error processing output file '{0}': {1}".format(out, str(e)))
-    if len(series) == 0:
-        return None
-    series = pd.concat(series)
-    # print(series)
-    return series
+        pairs.append((ins, out))
+
+    if num_workers is None or num_workers < 2 or len(pairs) < 2:
+        results = [
+            _process_output_file(ins, out, pst, obs_name_set) for ins, out in pairs
+        ]
+    else:
+        with ThreadPoolExecutor(max_workers=min(num_workers, len(pairs))) as pool:
+            futures = [
+                pool.submit(_process_output_file, ins, out, pst, obs_name_set)
+                for ins, out in pairs
+            ]
+            results = [f.result() for f in futures]
+
+    # one preallocated vector, aligned with the control file
+    obs_idx = pd.Index(obs_names)
+    obsval = np.full(len(obs_names), np.NaN)
+    nread, timing = 0, []
+    for (ins, out), (names, vals, err, seconds) in zip(pairs, results):
+        if err is not None:
+            warnings.warn(
+                "error processing output file '{0}': {1}".format(out, str(err)),
+                PyemuWarning,
+            )
+        elif len(names) > 0:
+            obsval[obs_idx.get_indexer(names)] = vals
+            nread += 1
+        timing.append([ins, out, len(names), seconds])
+    if nread == 0:
+        df = None
+    else:
+        df = pd.DataFrame({"obsval": obsval}, index=obs_names)
+    if return_timing:
+        timing = pd.DataFrame(
+            timing, columns=["ins_file", "out_file", "nobs", "seconds"]
+        )
+        timing.index = timing.pop("ins_file")
+        return df, timing
+    return df
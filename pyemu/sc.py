@@ -277,7 +277,7 @@ class Schur(LinearAnalysis):
         if prior_mat.isdiagonal:
             prior = prior_mat.x.flatten()
         else:
-            prior = np.diag(prior_mat.x)
+            prior = prior_mat.get_diagonal_vector().x.flatten()
         post = np.diag(self.posterior_parameter.x)
 
         ureduce = 100.0 * (1.0 - (post / prior))
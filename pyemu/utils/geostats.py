@@ -3,13 +3,14 @@
 from __future__ import print_function
 import os
 import copy
+import hashlib
 from datetime import datetime
-import multiprocessing as mp
 import warnings
 import numpy as np
 import pandas as pd
 from pyemu.mat.mat_handler import Cov
 from pyemu.utils.pp_utils import pp_file_to_dataframe
+from pyemu.pst.pst_utils import _FileCache
 from ..pyemu_warnings import PyemuWarning
 
 EPSILON = 1.0e-7
@@ -107,7 +108,9 @@ class GeoStruct(object):
         for v in self.variograms:
             v.to_struct_file(f)
 
-    def covariance_matrix(self, x, y, names=None, cov=None):
+    def covariance_matrix(
+        self, x, y, names=None, cov=None, dtype=float, sparse=False, cutoff=0.0
+    ):
         """build a `pyemu.Cov` instance from `GeoStruct`
 
         Args:
@@ -118,6 +121,14 @@ class GeoStruct(object):
             cov (`pyemu.Cov`): an existing Cov instance.  The contribution
                 of this GeoStruct is added to cov.  If cov is None,
                 names must not be None. Default is None
+            dtype (`numpy.dtype`): the dtype of the covariance values. Using
+                `numpy.float32` halves the memory needed.  Default is `float`
+            sparse (`bool`): flag to return a `Cov` with sparse storage
+                that only holds the entries greater than `cutoff`.  This is
+                useful for compact-support variograms (e.g. `SphVario`). Requires
+                scipy.  Default is False
+            cutoff (`float`): the covariance value at or below which entries
+                are dropped from a sparse result.  Default is 0.0
 
         Returns:
             `pyemu.Cov`: the covariance matrix implied by this
@@ -129,6 +140,9 @@ class GeoStruct(object):
             either "names" or "cov" must be passed.  If "cov" is passed, cov.shape
             must equal len(x) and len(y).
 
+            the matrix is built in square tiles of vectorized pairwise
+            lag distances, only the upper triangle tiles are calculated
+
         Example::
 
             pp_df = pyemu.pp_utils.pp_file_to_dataframe("hkpp.dat")
@@ -144,26 +158,21 @@ class GeoStruct(object):
             y = np.array(y)
         assert x.shape[0] == y.shape[0]
 
-        if names is not None:
-            assert x.shape[0] == len(names)
-            c = np.zeros((len(names), len(names)))
-            np.fill_diagonal(c, self.nugget)
-            cov = Cov(x=c, names=names)
-        elif cov is not None:
-            assert cov.shape[0] == x.shape[0]
-            names = cov.row_names
-            c = np.zeros((len(names), 1))
-            c += self.nugget
-            cont = Cov(x=c, names=names, isdiagonal=True)
-            cov += cont
-
-        else:
+        if names is None and cov is None:
             raise Exception(
                 "GeoStruct.covariance_matrix() requires either " + "names or cov arg"
             )
-        for v in self.variograms:
-            v.covariance_matrix(x, y, cov=cov)
-        return cov
+        return _build_covariance_matrix(
+            self.variograms,
+            x,
+            y,
+            names=names,
+            cov=cov,
+            nugget=self.nugget,
+            dtype=dtype,
+            sparse=sparse,
+            cutoff=cutoff,
+        )
 
     def covariance(self, pt0, pt1):
         """get the covariance between two points implied by the `GeoStruct`.
@@ -277,6 +286,10 @@ class GeoStruct(object):
         return s
 
 
+# SpecSim2d sqrt spectra, keyed by effective variograms, nugget and grid size
+_specsim_spectrum_cache = {}
+
+
 class SpecSim2d(object):
     """2-D unconditional spectral simulation for regular grids
 
@@ -288,22 +301,52 @@ class SpecSim2d(object):
             (or leading/trailing edges).  Only the distance between points
             is important
         geostruct (`pyemu.geostats.Geostruct`): geostatistical structure instance
+        fft_backend (`str`): the FFT implementation to use.  Can be "scipy"
+            (`scipy.fft`, multi-threaded), "numpy" (`numpy.fft`, single-threaded)
+            or "auto" (scipy if available, otherwise numpy).  Default is "auto"
+        num_threads (`int`): number of threads to use with the scipy FFT backend.
+            If None, all available cores are used.  Ignored for the numpy backend.
+            Default is None
 
     Example::
 
         v = pyemu.utils.geostats.ExpVario(a=1000,contribution=1.0)
         gs = pyemu.utils.geostats.GeoStruct(variograms=v,nugget=0.5)
         delx,dely = np.arange(100), np.arrange(100)
-        ss = pyemu.utils.geostats.SpecSim2d(delx,dely,gs)
+        ss = pyemu.utils.geostats.SpecSim2d(delx,dely,gs,num_threads=8)
         arrays = ss.draw(num_reals=100)
 
     """
 
-    def __init__(self, delx, dely, geostruct):
+    # max number of simulation grid points (realizations X padded grid size)
+    # to process with each batched FFT call in draw_arrays()
+    max_chunk_points = 2 ** 23
+    # max number of spectra to keep in the module-level spectrum cache
+    spectrum_cache_size = 16
+
+    def __init__(self, delx, dely, geostruct, fft_backend="auto", num_threads=None):
 
         self.geostruct = geostruct
         self.delx = delx
         self.dely = dely
+        fft_backend = fft_backend.lower()
+        if fft_backend not in ["auto", "scipy", "numpy"]:
+            raise Exception(
+                "SpecSim2d() error: unrecognized fft_backend '{0}'".format(fft_backend)
+            )
+        if fft_backend != "numpy":
+            try:
+                import scipy.fft
+            except ImportError:
+                if fft_backend == "scipy":
+                    raise Exception(
+                        "SpecSim2d() error: 'scipy' fft_backend requires scipy.fft"
+                    )
+                fft_backend = "numpy"
+            else:
+                fft_backend = "scipy"
+        self.fft_backend = fft_backend
+        self.num_threads = num_threads
         self.num_pts = np.NaN
         self.sqrt_fftc = np.NaN
         self.effective_variograms = None
@@ -335,6 +378,44 @@ class SpecSim2d(object):
             return False
         return True
 
+    @staticmethod
+    def next_fast_len(n):
+        """find the smallest FFT-friendly size (only prime factors of
+        2, 3 and 5) that is not less than `n`
+
+        Args:
+            n (`int`): the minimum size
+
+        Returns:
+            `int`: the FFT-friendly size
+
+        """
+        n = int(n)
+        if n <= 1:
+            return 1
+        best = 2 ** int(np.ceil(np.log2(n)))
+        p5 = 1
+        while p5 < best:
+            p35 = p5
+            while p35 < best:
+                # smallest power of two that gets p35 to at least n
+                p = p35
+                while p < n:
+                    p *= 2
+                best = min(best, p)
+                p35 *= 3
+            p5 *= 5
+        return best
+
+    def _fft(self, func, a, **kwargs):
+        """private: call `func` ("fftn", "ifftn" or "irfftn") of the FFT backend"""
+        if self.fft_backend == "scipy":
+            import scipy.fft
+
+            workers = -1 if self.num_threads is None else self.num_threads
+            return getattr(scipy.fft, func)(a, workers=workers, **kwargs)
+        return getattr(np.fft, func)(a, **kwargs)
+
     def initialize(self):
         """prepare for spectral simulation.
 
@@ -372,9 +453,9 @@ class SpecSim2d(object):
             mx_a = max(mx_a, v.a)
         mx_dim = max(self.delx.shape[0], self.dely.shape[0])
         freq_pad = int(np.ceil(mx_a * 3))
-        freq_pad = int(np.ceil(freq_pad / 8.0) * 8.0)
-        # use the max dimension so that simulation grid is square
-        full_delx = np.ones((mx_dim + (2 * freq_pad)))
+        # use the max dimension so that simulation grid is square and
+        # round up to a size the FFT handles efficiently
+        full_delx = np.ones(SpecSim2d.next_fast_len(mx_dim + (2 * freq_pad)))
         full_dely = np.ones_like(full_delx)
         print(
             "SpecSim.initialize() summary: full_delx X full_dely: {0} X {1}".format(
@@ -382,16 +463,26 @@ class SpecSim2d(object):
             )
         )
 
+        # the spectrum only depends on the (effective) variograms, the nugget
+        # and the size of the simulation grid
+        key = (
+            full_delx.shape[0],
+            float(self.geostruct.nugget),
+            tuple(
+                (type(v).__name__, v.contribution, v.a, v.anisotropy, v.bearing)
+                for v in self.effective_variograms
+            ),
+        )
+        cached = _specsim_spectrum_cache.get(key)
+        if cached is not None:
+            self.num_pts, self.sqrt_fftc = cached
+            return
+
         xdist = np.cumsum(full_delx)
         ydist = np.cumsum(full_dely)
         xdist -= xdist.min()
         ydist -= ydist.min()
-        xgrid = np.zeros((ydist.shape[0], xdist.shape[0]))
-        ygrid = np.zeros_like(xgrid)
-        for j, d in enumerate(xdist):
-            xgrid[:, j] = d
-        for i, d in enumerate(ydist):
-            ygrid[i, :] = d
+        xgrid, ygrid = np.meshgrid(xdist, ydist)
         grid = np.array((xgrid, ygrid))
         domainsize = np.array((full_dely.shape[0], full_delx.shape[0]))
         for i in range(2):
@@ -405,16 +496,41 @@ class SpecSim2d(object):
             h = ((grid ** 2).sum(axis=0)) ** 0.5
             c[np.where(h == 0)] += self.geostruct.nugget
         # fft components
-        fftc = np.abs(np.fft.fftn(c))
+        fftc = np.abs(self._fft("fftn", c))
         self.num_pts = np.prod(xgrid.shape)
         self.sqrt_fftc = np.sqrt(fftc / self.num_pts)
+        if len(_specsim_spectrum_cache) >= SpecSim2d.spectrum_cache_size:
+            _specsim_spectrum_cache.pop(next(iter(_specsim_spectrum_cache)))
+        _specsim_spectrum_cache[key] = (self.num_pts, self.sqrt_fftc)
 
-    def draw_arrays(self, num_reals=1, mean_value=1.0):
+    def draw_arrays(
+        self,
+        num_reals=1,
+        mean_value=1.0,
+        out=None,
+        chunk_size=None,
+        batched=True,
+        seed=None,
+    ):
         """draw realizations
 
         Args:
             num_reals (`int`): number of realizations to generate
-            mean_value (`float`): the mean value of the realizations
+            mean_value (`float` or `numpy.ndarray`): the mean value of the realizations.
+                Can be a 2-D array of shape (self.dely.shape[0],self.delx.shape[0])
+            out (`numpy.ndarray`): an optional (preallocated or memory-mapped)
+                array of shape (num_reals,self.dely.shape[0],self.delx.shape[0])
+                to write the realizations into.  Default is None
+            chunk_size (`int`): number of realizations to generate with each
+                batched FFT call.  If None, `SpecSim2d.max_chunk_points` is
+                used to set the chunk size.  Default is None
+            batched (`bool`): flag to generate the realizations with batched,
+                real-valued FFTs.  If False, the original (slower) one-complex-FFT
+                per realization approach is used. Default is True
+            seed (`int`, `numpy.random.SeedSequence` or `numpy.random.Generator`): seed
+                for reproducible draws.  Each realization is drawn from its own child
+                stream of `seed`, so the realizations are the same for any `chunk_size`.
+                If None, the global `numpy.random` stream is used.  Default is None
 
         Returns:
             `numpy.ndarray`: a 3-D array of realizations.  Shape
@@ -424,27 +540,93 @@ class SpecSim2d(object):
             in arithmatic space
 
         """
-        reals = []
-
-        for ireal in range(num_reals):
-            real = np.random.standard_normal(size=self.sqrt_fftc.shape)
-            imag = np.random.standard_normal(size=self.sqrt_fftc.shape)
-            epsilon = real + 1j * imag
-            rand = epsilon * self.sqrt_fftc
-            real = np.real(np.fft.ifftn(rand)) * self.num_pts
-            real = real[: self.dely.shape[0], : self.delx.shape[0]]
-            reals.append(real)
-        reals = np.array(reals)
+        shape = (num_reals, self.dely.shape[0], self.delx.shape[0])
+        if out is None:
+            out = np.empty(shape, dtype=float)
+        elif out.shape != shape:
+            raise Exception(
+                "SpecSim2d.draw_arrays(): 'out' shape {0} != {1}".format(
+                    out.shape, shape
+                )
+            )
+        if chunk_size is None:
+            chunk_size = int(SpecSim2d.max_chunk_points // self.num_pts)
+        chunk_size = max(1, int(chunk_size))
         if self.geostruct.transform == "log":
-            reals += np.log10(mean_value)
-            reals = 10 ** reals
+            mean_value = np.log10(mean_value)
+        seed_seq = None
+        if seed is not None:
+            from pyemu.en import _seed_sequence, _child_seeds
+
+            seed_seq = _seed_sequence(seed)
+
+        if batched:
+            n0, n1 = self.sqrt_fftc.shape
+            # the non-redundant half of the spectrum used by the real-valued FFT
+            spec = self.sqrt_fftc[:, : n1 // 2 + 1] * self.num_pts
+        for start in range(0, num_reals, chunk_size):
+            end = min(num_reals, start + chunk_size)
+            if batched:
+                noise = SpecSim2d._hermitian_noise(
+                    end - start, n0, n1, seed_seq=seed_seq, start=start
+                )
+                noise *= spec
+                reals = self._fft("irfftn", noise, s=(n0, n1), axes=(1, 2))
+            else:
+                reals = []
+                for ireal in range(start, end):
+                    rng = np.random
+                    if seed_seq is not None:
+                        child = _child_seeds(seed_seq, ireal + 1, ireal)[0]
+                        rng = np.random.default_rng(child)
+                    real = rng.standard_normal(size=self.sqrt_fftc.shape)
+                    imag = rng.standard_normal(size=self.sqrt_fftc.shape)
+                    epsilon = real + 1j * imag
+                    rand = epsilon * self.sqrt_fftc
+                    reals.append(np.real(self._fft("ifftn", rand)) * self.num_pts)
+                reals = np.array(reals)
+            block = out[start:end]
+            block[:] = reals[:, : shape[1], : shape[2]]
+            block += mean_value
+            if self.geostruct.transform == "log":
+                # 10**block, but faster
+                block *= np.log(10.0)
+                np.exp(block, out=block)
+        return out
 
+    @staticmethod
+    def _hermitian_noise(num_reals, n0, n1, seed_seq=None, start=0):
+        """private: draw complex white noise for the non-redundant half
+        (the last axis) of the spectrum of real-valued (n0,n1) fields.
+        Elements have unit expected squared modulus and the elements that
+        are their own conjugate in the full spectrum are real-valued.  If
+        `seed_seq` is passed, realization `start` + i is drawn from child
+        stream `start` + i of `seed_seq`.
+        """
+        # draw (real,imag) pairs and view them as complex
+        shape = (num_reals, n0, n1 // 2 + 1, 2)
+        if seed_seq is None:
+            noise = np.random.standard_normal(shape)
         else:
-            reals += mean_value
-        return reals
+            from pyemu.en import _child_seeds
+
+            noise = np.empty(shape)
+            children = _child_seeds(seed_seq, start + num_reals, start)
+            for i, child in enumerate(children):
+                np.random.default_rng(child).standard_normal(shape[1:], out=noise[i])
+        noise = noise.view(complex)[..., 0]
+        noise *= np.sqrt(0.5)
+        # the first (and for even n1, last) columns of the half spectrum
+        # must also be conjugate-symmetric along the first axis
+        neg = (-np.arange(n0)) % n0
+        cols = [0] if n1 % 2 else [0, n1 // 2]
+        for j in cols:
+            col = noise[:, :, j]
+            noise[:, :, j] = (col + np.conj(col[:, neg])) * np.sqrt(0.5)
+        return noise
 
     def grid_par_ensemble_helper(
-        self, pst, gr_df, num_reals, sigma_range=6, logger=None
+        self, pst, gr_df, num_reals, sigma_range=6, logger=None, seed=None
     ):
         """wrapper around `SpecSim2d.draw()` designed to support `pyemu.PstFromFlopy`
             grid-based parameters
@@ -457,6 +639,10 @@ class SpecSim2d(object):
             sigma_range (`float` (optional)): number of standard deviations
                 implied by parameter bounds in control file. Default is 6
             logger (`pyemu.Logger` (optional)): a logger instance for logging
+            seed (`int`, `numpy.random.SeedSequence` or `numpy.random.Generator`): seed
+                for reproducible draws.  Each `pargp` is drawn from its own child
+                stream of `seed`.  If None, the global `numpy.random` stream is used.
+                Default is None
 
         Returns:
             `pyemu.ParameterEnsemble`: an untransformed parameter ensemble of
@@ -464,8 +650,8 @@ class SpecSim2d(object):
 
         Note:
             the method processes each unique `pargp` value in `gr_df` and resets the sill of `self.geostruct` by
-            the maximum bounds-implied variance of each `pargp`.  This method makes repeated calls to
-            `self.initialize()` to deal with the geostruct changes.
+            the maximum bounds-implied variance of each `pargp`.  Since the sill is the only thing that
+            changes between groups, the unit-sill spectrum is computed once and rescaled for each `pargp`.
 
         """
 
@@ -498,14 +684,21 @@ class SpecSim2d(object):
             new_nug = org_nug / tot
             self.geostruct.variograms[0].contribution = new_var
             self.geostruct.nugget = new_nug
+            self.initialize()
+        unit_sqrt_fftc = self.sqrt_fftc
 
         gr_grps = gr_df.pargp.unique()
+        seeds = [None] * len(gr_grps)
+        if seed is not None:
+            from pyemu.en import _seed_sequence, _child_seeds
+
+            seeds = _child_seeds(_seed_sequence(seed), len(gr_grps))
         pst.add_transform_columns()
         par = pst.parameter_data
 
         # real and name containers
         real_arrs, names = [], []
-        for gr_grp in gr_grps:
+        for gr_grp, gr_seed in zip(gr_grps, seeds):
 
             gp_df = gr_df.loc[gr_df.pargp == gr_grp, :]
 
@@ -532,8 +725,11 @@ class SpecSim2d(object):
                         num_reals, gr_grp, var, self.geostruct.sill, gp_df.shape[0]
                     )
                 )
-            self.initialize()
-            reals = self.draw_arrays(num_reals=num_reals, mean_value=mean_arr)
+            # the spectrum scales linearly with the sill
+            self.sqrt_fftc = unit_sqrt_fftc * np.sqrt(var)
+            reals = self.draw_arrays(
+                num_reals=num_reals, mean_value=mean_arr, seed=gr_seed
+            )
             # put the pieces into the par en
             reals = reals[:, gp_df.i, gp_df.j].reshape(num_reals, gp_df.shape[0])
             real_arrs.append(reals)
@@ -546,9 +742,7 @@ class SpecSim2d(object):
                 )
 
         # get into a dataframe
-        reals = real_arrs[0]
-        for r in real_arrs[1:]:
-            reals = np.append(reals, r, axis=1)
+        reals = np.concatenate(real_arrs, axis=1)
         pe = pd.DataFrame(data=reals, columns=names)
         # reset to org conditions
         self.geostruct.nugget = org_nug
@@ -768,6 +962,7 @@ class OrdinaryKrige(object):
         self.check_point_data_dist()
         self.interp_data = None
         self.spatial_reference = None
+        self.num_nodes = None
         # X, Y = np.meshgrid(point_data.x,point_data.y)
         # self.point_data_dist = pd.DataFrame(data=np.sqrt((X - X.T) ** 2 + (Y - Y.T) ** 2),
         #                                    index=point_data.name,columns=point_data.name)
@@ -777,6 +972,17 @@ class OrdinaryKrige(object):
         # for name in self.point_cov_df.index:
         #    self.point_cov_df.loc[name,name] -= self.geostruct.nugget
 
+    # number of interpolation points processed together by the KD-tree
+    # factor engine.  The blocks are also the unit of work for the
+    # multiprocessing engine
+    block_size = 2000
+    # directory of the on-disk kriging factors cache.  If None, factors
+    # are not cached
+    factors_cache_dir = None
+    # max total size (bytes) of the factors cache.  The least recently used
+    # entries are removed to stay under this size
+    factors_cache_max_bytes = 2 ** 30
+
     def check_point_data_dist(self, rectify=False):
         """check for point_data entries that are closer than
         EPSILON distance - this will cause a singular kriging matrix.
@@ -869,8 +1075,9 @@ class OrdinaryKrige(object):
                 resulting from `point_data` entries closer than EPSILON distance.  If True,
                 warnings are issued for each failed inversion.  If False, an exception
                 is raised for failed matrix inversion.
-            num_threads (`int`): number of multiprocessing workers to use to try to speed up
-                kriging in python.  Default is 1.
+            num_threads (`int`): if greater than 1, the kriging is run in parallel on
+                the executor from `pyemu.os_utils.get_executor()`; the mode and number
+                of workers are set with `pyemu.os_utils.set_executor()`.  Default is 1.
 
         Returns:
             `pandas.DataFrame`: a dataframe with information summarizing the ordinary kriging
@@ -899,6 +1106,7 @@ class OrdinaryKrige(object):
         """
 
         self.spatial_reference = spatial_reference
+        self.num_nodes = None
         self.interp_data = None
         # assert isinstance(spatial_reference,SpatialReference)
         try:
@@ -908,19 +1116,145 @@ class OrdinaryKrige(object):
             raise Exception(
                 "spatial_reference does not have proper attributes:{0}".format(str(e))
             )
-
+        if zone_array is not None:
+            assert zone_array.shape == x.shape
+            zone_array = zone_array.ravel()
+        df, arr = self._calc_factors_zoned(
+            x.ravel(),
+            y.ravel(),
+            zone_array,
+            minpts_interp=minpts_interp,
+            maxpts_interp=maxpts_interp,
+            search_radius=search_radius,
+            verbose=verbose,
+            forgive=forgive,
+            num_threads=num_threads,
+        )
         if var_filename is not None:
-            arr = (
-                np.zeros((self.spatial_reference.nrow, self.spatial_reference.ncol))
-                - 1.0e30
+            np.savetxt(var_filename, arr.reshape(x.shape), fmt="%15.6E")
+        return df
+
+    def calc_factors_nodes(
+        self,
+        x,
+        y,
+        zone_array=None,
+        minpts_interp=1,
+        maxpts_interp=20,
+        search_radius=1.0e10,
+        verbose=False,
+        var_filename=None,
+        forgive=False,
+        num_threads=1,
+    ):
+        """calculate kriging factors (weights) for the nodes of any grid,
+        such as the cells of a MODFLOW-6 DISV or DISU model
+
+        Args:
+            x ([`float`]): x-coordinate of each node (e.g. cell centers)
+            y ([`float`]): y-coordinate of each node
+            zone_array ([`int`]): an integer zone for each node.  If not None,
+                then `point_data` must also contain a "zone" column.  `point_data`
+                entries with a zone value not found in zone_array will be skipped.
+                If None, then all `point_data` will (potentially) be used for
+                interpolating each node. Default is None
+            minpts_interp (`int`): minimum number of `point_data` entires to use for interpolation at
+                a given node.  Nodes with less than `minpts_interp`
+                `point_data` found will be skipped (assigned np.NaN).  Defaut is 1
+            maxpts_interp (`int`) maximum number of `point_data` entries to use for interpolation at
+                a given node. Default is 20.
+            search_radius (`float`) the size of the region around a given node to search for
+                `point_data` entries. Default is 1.0e+10
+            verbose : (`bool`): a flag to  echo process to stdout during the interpolatino process.
+                Default is False
+            var_filename (`str`): a filename to save the kriging variance for each
+                interpolated node (one node per line).  Default is None.
+            forgive (`bool`):  flag to continue if inversion of the kriging matrix failes at one or more
+                nodes.  Default is False
+            num_threads (`int`): if greater than 1, the kriging is run in parallel on
+                the executor from `pyemu.os_utils.get_executor()`; the mode and number
+                of workers are set with `pyemu.os_utils.set_executor()`.  Default is 1.
+
+        Returns:
+            `pandas.DataFrame`: a dataframe with information summarizing the ordinary kriging
+            process for each node
+
+        Note:
+            this method calls OrdinaryKrige.calc_factors().  Use
+            `OrdinaryKrige.to_node_factors_file()` to save the factors for use with
+            `pyemu.geostats.fac2real()`
+
+        Example::
+
+            import flopy
+            import pyemu
+            v = pyemu.utils.geostats.ExpVario(a=1000,contribution=1.0)
+            gs = pyemu.utils.geostats.GeoStruct(variograms=v,nugget=0.5)
+            pp_df = pyemu.pp_utils.pp_file_to_dataframe("hkpp.dat")
+            ok = pyemu.utils.geostats.OrdinaryKrige(gs,pp_df)
+            sim = flopy.mf6.MFSimulation.load()
+            mg = sim.get_model().modelgrid
+            df = ok.calc_factors_nodes(mg.xcellcenters,mg.ycellcenters)
+            ok.to_node_factors_file("factors.bin")
+
+        """
+        x = np.asarray(x, dtype=float).ravel()
+        y = np.asarray(y, dtype=float).ravel()
+        if x.shape != y.shape:
+            raise Exception(
+                "x and y have different lengths: {0} vs {1}".format(
+                    x.shape[0], y.shape[0]
+                )
             )
+        if zone_array is not None:
+            zone_array = np.asarray(zone_array).ravel()
+            if zone_array.shape != x.shape:
+                raise Exception(
+                    "zone_array length {0} != number of nodes {1}".format(
+                        zone_array.shape[0], x.shape[0]
+                    )
+                )
+        self.spatial_reference = None
+        self.num_nodes = x.shape[0]
+        self.interp_data = None
+        df, arr = self._calc_factors_zoned(
+            x,
+            y,
+            zone_array,
+            minpts_interp=minpts_interp,
+            maxpts_interp=maxpts_interp,
+            search_radius=search_radius,
+            verbose=verbose,
+            forgive=forgive,
+            num_threads=num_threads,
+        )
+        if var_filename is not None:
+            np.savetxt(var_filename, arr, fmt="%15.6E")
+        return df
+
+    def _calc_factors_zoned(
+        self,
+        x,
+        y,
+        zone_array,
+        minpts_interp,
+        maxpts_interp,
+        search_radius,
+        verbose,
+        forgive,
+        num_threads,
+    ):
+        """private: calculate factors for flattened x, y (and zone) arrays.
+        Returns the factors dataframe and the kriging variance array
+        """
+        arr = np.zeros(x.shape) - 1.0e30
 
         # the simple case of no zone array: ignore point_data zones
         if zone_array is None:
 
             df = self.calc_factors(
-                x.ravel(),
-                y.ravel(),
+                x,
+                y,
                 minpts_interp=minpts_interp,
                 maxpts_interp=maxpts_interp,
                 search_radius=search_radius,
@@ -928,13 +1262,9 @@ class OrdinaryKrige(object):
                 forgive=forgive,
                 num_threads=num_threads,
             )
-
-            if var_filename is not None:
-                arr = df.err_var.values.reshape(x.shape)
-                np.savetxt(var_filename, arr, fmt="%15.6E")
+            arr = df.err_var.values
 
         if zone_array is not None:
-            assert zone_array.shape == x.shape
             if "zone" not in self.point_data.columns:
                 warnings.warn(
                     "'zone' columns not in point_data, assigning generic zone",
@@ -957,8 +1287,8 @@ class OrdinaryKrige(object):
                 yzone[zone_array != pt_data_zone] = np.NaN
 
                 df = self.calc_factors(
-                    xzone.ravel(),
-                    yzone.ravel(),
+                    xzone,
+                    yzone,
                     minpts_interp=minpts_interp,
                     maxpts_interp=maxpts_interp,
                     search_radius=search_radius,
@@ -969,16 +1299,13 @@ class OrdinaryKrige(object):
                 )
 
                 dfs.append(df)
-                if var_filename is not None:
-                    a = df.err_var.values.reshape(x.shape)
-                    na_idx = np.isfinite(a)
-                    arr[na_idx] = a[na_idx]
+                a = df.err_var.values
+                na_idx = np.isfinite(a)
+                arr[na_idx] = a[na_idx]
             if self.interp_data is None or self.interp_data.dropna().shape[0] == 0:
                 raise Exception("no interpolation took place...something is wrong")
             df = pd.concat(dfs)
-        if var_filename is not None:
-            np.savetxt(var_filename, arr, fmt="%15.6E")
-        return df
+        return df, arr
 
     def _dist_calcs(self, ix, iy, ptx_array, pty_array, ptnames, sqradius):
         """private: find nearby points"""
@@ -1048,8 +1375,9 @@ class OrdinaryKrige(object):
                 resulting from `point_data` entries closer than EPSILON distance.  If True,
                 warnings are issued for each failed inversion.  If False, an exception
                 is raised for failed matrix inversion.
-            num_threads (`int`): number of multiprocessing workers to use to try to speed up
-                kriging in python.  Default is 1.
+            num_threads (`int`): if greater than 1, the kriging is run in parallel on
+                the executor from `pyemu.os_utils.get_executor()`; the mode and number
+                of workers are set with `pyemu.os_utils.set_executor()`.  Default is 1.
 
         Returns:
             `pandas.DataFrame`: a dataframe with information summarizing the ordinary kriging
@@ -1058,20 +1386,54 @@ class OrdinaryKrige(object):
         Note:
             this method calls either `OrdinaryKrige.calc_factors_org()` or
             `OrdinaryKrige.calc_factors_mp()` depending on the value of `num_threads`
+
+            If scipy is available, the serial path uses a KD-tree
+            (`scipy.spatial.cKDTree`) to find the nearest points and solves the
+            kriging systems in stacked batches, reusing one kriging matrix for
+            interpolation points that share the same neighbours.  Ties in
+            distance are broken by `point_data` order.
+
+            If `OrdinaryKrige.factors_cache_dir` is set, the factors are stored
+            in (and reused from) an on-disk cache keyed by a hash of the
+            interpolation points, the `point_data` locations and names, the
+            `geostruct` and the search settings.
         """
-        if num_threads == 1:
-            return self._calc_factors_org(
-                x,
-                y,
-                minpts_interp,
-                maxpts_interp,
-                search_radius,
-                verbose,
-                pt_zone,
-                forgive,
+        cache_file = None
+        if OrdinaryKrige.factors_cache_dir is not None:
+            cache_file = self._factors_cache_file(
+                x, y, minpts_interp, maxpts_interp, search_radius, pt_zone, forgive
             )
+            df = self._read_factors_cache(cache_file, x, y, pt_zone)
+            if df is not None:
+                print("using cached kriging factors from {0}".format(cache_file))
+                return df
+        if num_threads == 1:
+            try:
+                import scipy.spatial
+            except ImportError:
+                df = self._calc_factors_org(
+                    x,
+                    y,
+                    minpts_interp,
+                    maxpts_interp,
+                    search_radius,
+                    verbose,
+                    pt_zone,
+                    forgive,
+                )
+            else:
+                df = self._calc_factors_kdtree(
+                    x,
+                    y,
+                    minpts_interp,
+                    maxpts_interp,
+                    search_radius,
+                    verbose,
+                    pt_zone,
+                    forgive,
+                )
         else:
-            return self._calc_factors_mp(
+            df = self._calc_factors_mp(
                 x,
                 y,
                 minpts_interp,
@@ -1082,6 +1444,93 @@ class OrdinaryKrige(object):
                 forgive,
                 num_threads,
             )
+        if cache_file is not None:
+            self._write_factors_cache(cache_file, df, pt_zone)
+        return df
+
+    def _factors_cache_file(
+        self, x, y, minpts_interp, maxpts_interp, search_radius, pt_zone, forgive
+    ):
+        """private: the factors cache file name for a calc_factors() call,
+        from a hash of everything the factors depend on
+        """
+        ptx, pty, ptnames, _ = self._zone_point_arrays(pt_zone)
+        h = hashlib.sha256()
+        settings = [
+            _FACTORS_CACHE_VERSION,
+            minpts_interp,
+            maxpts_interp,
+            float(search_radius),
+            bool(forgive),
+            float(self.geostruct.nugget),
+        ]
+        for v in self.geostruct.variograms:
+            settings.extend(
+                [type(v).__name__, v.contribution, v.a, v.anisotropy, v.bearing]
+            )
+        h.update(repr(settings).encode())
+        h.update("\n".join([str(n) for n in ptnames]).encode())
+        for arr in [x, y, ptx, pty]:
+            h.update(np.ascontiguousarray(arr, dtype=float).tobytes())
+        return os.path.join(
+            OrdinaryKrige.factors_cache_dir, "krige_{0}.npz".format(h.hexdigest())
+        )
+
+    def _read_factors_cache(self, cache_file, x, y, pt_zone=None):
+        """private: load factors from the cache.  Returns None if `cache_file`
+        doesn't exist (or can't be read)
+        """
+        if not os.path.exists(cache_file):
+            return None
+        try:
+            with np.load(cache_file, allow_pickle=False) as f:
+                result = (f["nidx"], f["ndist"], f["nfacs"], f["nvar"])
+                ptnames = f["ptnames"].astype(object)
+        except Exception as e:
+            warnings.warn(
+                "error reading factors cache file {0}: {1}".format(cache_file, str(e)),
+                PyemuWarning,
+            )
+            return None
+        # mark as recently used for eviction
+        os.utime(cache_file)
+        df = pd.DataFrame(data={"x": x, "y": y})
+        return self._block_results_to_df(df, [result], ptnames, pt_zone)
+
+    def _write_factors_cache(self, cache_file, df, pt_zone=None):
+        """private: save the factors in `df` to the cache in the compact
+        (neighbour index, distance, factor, kriging variance) layout and
+        evict old entries if the cache is too large
+        """
+        ptnames = self._zone_point_arrays(pt_zone)[2]
+        counts = np.array([len(names) for names in df.inames], dtype=int)
+        nmax = max(1, counts.max()) if counts.shape[0] > 0 else 1
+        rows = np.repeat(np.arange(counts.shape[0]), counts)
+        cols = np.arange(rows.shape[0]) - np.repeat(np.cumsum(counts) - counts, counts)
+        nidx = np.zeros((counts.shape[0], nmax), dtype=np.int32) - 1
+        ndist = np.zeros((counts.shape[0], nmax))
+        nfacs = np.zeros((counts.shape[0], nmax))
+        if rows.shape[0] > 0:
+            flat_names = np.concatenate([np.asarray(n) for n in df.inames])
+            nidx[rows, cols] = pd.Index(ptnames).get_indexer(flat_names)
+            ndist[rows, cols] = np.concatenate([np.asarray(d) for d in df.idist])
+            nfacs[rows, cols] = np.concatenate([np.asarray(f) for f in df.ifacts])
+        cache_dir = os.path.dirname(cache_file)
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+        # write to a temp file first so a partial file is never read
+        tmp_file = "{0}.{1}.tmp".format(cache_file, os.getpid())
+        with open(tmp_file, "wb") as f:
+            np.savez(
+                f,
+                nidx=nidx,
+                ndist=ndist,
+                nfacs=nfacs,
+                nvar=df.err_var.values.astype(float),
+                ptnames=np.array([str(n) for n in ptnames]),
+            )
+        os.replace(tmp_file, cache_file)
+        _evict_factors_cache(cache_dir, OrdinaryKrige.factors_cache_max_bytes)
 
     def _calc_factors_org(
         self,
@@ -1239,7 +1688,7 @@ class OrdinaryKrige(object):
         print("took {0} seconds".format(td))
         return df
 
-    def _calc_factors_mp(
+    def _calc_factors_kdtree(
         self,
         x,
         y,
@@ -1249,60 +1698,87 @@ class OrdinaryKrige(object):
         verbose=False,
         pt_zone=None,
         forgive=False,
-        num_threads=1,
     ):
-
+        """private: calculate factors using a KD-tree neighbour search and
+        batched solves of the kriging systems.  The interpolation points are
+        processed in blocks of `OrdinaryKrige.block_size`
+        """
         assert len(x) == len(y)
         start_loop = datetime.now()
         df = pd.DataFrame(data={"x": x, "y": y})
         print("starting interp point loop for {0} points".format(df.shape[0]))
-        with mp.Manager() as manager:
-
-            point_pairs = manager.list()
-            idist = manager.list()
-            inames = manager.list()
-            ifacts = manager.list()
-            err_var = manager.list()
-            # start = mp.Value('d',0)
-            for i, (xx, yy) in enumerate(zip(x, y)):
-                point_pairs.append((i, xx, yy))
-                idist.append([])
-                inames.append([])
-                ifacts.append([])
-                err_var.append(np.NaN)
-            lock = mp.Lock()
-            procs = []
-            for i in range(num_threads):
-                print("starting", i)
-                p = mp.Process(
-                    target=OrdinaryKrige._worker,
-                    args=(
-                        i,
-                        self.point_data,
-                        point_pairs,
-                        inames,
-                        idist,
-                        ifacts,
-                        err_var,
-                        self.point_cov_df,
-                        self.geostruct,
-                        EPSILON,
-                        search_radius,
-                        pt_zone,
-                        minpts_interp,
-                        maxpts_interp,
-                        lock,
-                    ),
+        ptx, pty, ptnames, point_cov = self._zone_point_arrays(pt_zone)
+        x = df.x.values.astype(float)
+        y = df.y.values.astype(float)
+        nblock = max(1, self.block_size)
+        results = []
+        for istart in range(0, x.shape[0], nblock):
+            if verbose:
+                print(
+                    "processing interp points {0} to {1} of {2}".format(
+                        istart, min(x.shape[0], istart + nblock), x.shape[0]
+                    )
+                )
+            results.append(
+                OrdinaryKrige._krige_block(
+                    x[istart : istart + nblock],
+                    y[istart : istart + nblock],
+                    ptx,
+                    pty,
+                    point_cov,
+                    self.geostruct,
+                    minpts_interp,
+                    maxpts_interp,
+                    search_radius,
+                    forgive,
                 )
-                p.start()
-                procs.append(p)
-            for p in procs:
-                p.join()
-
-            df["idist"] = idist
-            df["inames"] = inames
-            df["ifacts"] = ifacts
-            df["err_var"] = err_var
+            )
+        df = self._block_results_to_df(df, results, ptnames, pt_zone)
+        td = (datetime.now() - start_loop).total_seconds()
+        print("took {0} seconds".format(td))
+        return df
+
+    def _zone_point_arrays(self, pt_zone=None):
+        """private: the x, y, names and point-to-point covariance array of
+        the point data to use for interpolation (optionally for one zone)
+        """
+        pt_data = self.point_data
+        if pt_zone is None:
+            zidx = np.arange(pt_data.shape[0])
+        else:
+            zidx = np.flatnonzero(pt_data.zone.values == pt_zone)
+        ptx = pt_data.x.values[zidx].astype(float)
+        pty = pt_data.y.values[zidx].astype(float)
+        ptnames = pt_data.name.values[zidx]
+        # point_cov_df rows/cols follow point_data order
+        cov_idx = self.point_cov_df.index.get_indexer(ptnames)
+        if np.any(cov_idx < 0):
+            raise Exception(
+                "point names not found in point covariance: {0}".format(
+                    ",".join([str(n) for n in ptnames[cov_idx < 0]])
+                )
+            )
+        point_cov = self.point_cov_df.values[np.ix_(cov_idx, cov_idx)]
+        return ptx, pty, ptnames, point_cov
+
+    def _block_results_to_df(self, df, results, ptnames, pt_zone=None):
+        """private: unpack the compact (neighbour index, distance, factor,
+        kriging variance) arrays from `_krige_block()` into the
+        `interp_data` dataframe layout
+        """
+        inames, idist, ifacts, err_var = [], [], [], []
+        for nidx, ndist, nfacs, nvar in results:
+            counts = (nidx >= 0).sum(axis=1)
+            for i in range(nidx.shape[0]):
+                c = counts[i]
+                inames.append(ptnames[nidx[i, :c]])
+                idist.append(ndist[i, :c])
+                ifacts.append(nfacs[i, :c])
+            err_var.extend(nvar.tolist())
+        df["idist"] = idist
+        df["inames"] = inames
+        df["ifacts"] = ifacts
+        df["err_var"] = err_var
         if pt_zone is None:
             self.interp_data = df
         else:
@@ -1310,141 +1786,262 @@ class OrdinaryKrige(object):
                 self.interp_data = df
             else:
                 self.interp_data = self.interp_data.append(df)
-        td = (datetime.now() - start_loop).total_seconds()
-        print("took {0} seconds".format(td))
         return df
 
     @staticmethod
-    def _worker(
-        ithread,
-        point_data,
-        point_pairs,
-        inames,
-        idist,
-        ifacts,
-        err_var,
-        point_cov_df,
+    def _krige_block(
+        x,
+        y,
+        ptx,
+        pty,
+        point_cov,
         geostruct,
-        epsilon,
-        search_radius,
-        pt_zone,
         minpts_interp,
         maxpts_interp,
-        lock,
+        search_radius,
+        forgive,
     ):
-        # find the point data to use for each interp point
-        sqradius = search_radius ** 2
-
-        sill = geostruct.sill
-        if pt_zone is None:
-            ptx_array = point_data.x.values
-            pty_array = point_data.y.values
-            ptnames = point_data.name.values
-        else:
-            pt_data = point_data
-            ptx_array = pt_data.loc[pt_data.zone == pt_zone, "x"].values
-            pty_array = pt_data.loc[pt_data.zone == pt_zone, "y"].values
-            ptnames = pt_data.loc[pt_data.zone == pt_zone, "name"].values
-        while True:
-            if len(point_pairs) == 0:
-                return
-            else:
-                try:
-                    idx, ix, iy = point_pairs.pop(0)
-                except IndexError:
-                    return
-
-            # if idx % 1000 == 0 and idx != 0:
-            #    print (ithread, idx,"done",datetime.now())
-            if np.isnan(ix) or np.isnan(iy):  # if nans, skip
-                # inames.append([])
-                # idist.append([])
-                # ifacts.append([])
-                # err_var.append(np.NaN)
-                # err_var.insert(idx,np.NaN)
-                continue
-
-            #  calc dist from this interp point to all point data...slow
-            dist = pd.Series((ptx_array - ix) ** 2 + (pty_array - iy) ** 2, ptnames)
-            dist.sort_values(inplace=True)
-            dist = dist.loc[dist <= sqradius]
+        """private: calculate ordinary kriging factors for a block of
+        interpolation points.
 
-            # if too few points were found, skip
-            if len(dist) < minpts_interp:
-                # inames.append([])
-                # idist.append([])
-                # ifacts.append([])
-                # err_var.append(sill)
-                err_var[idx] = sill
-                continue
-
-            # only the maxpts_interp points
-            dist = dist.iloc[:maxpts_interp].apply(np.sqrt)
-            pt_names = dist.index.values
-            # if one of the points is super close, just use it and skip
-            if dist.min() <= epsilon:
-                # ifacts.append([1.0])
-                ifacts[idx] = [1.0]
-                # idist.append([epsilon])
-                idist[idx] = [epsilon]
-                # inames.append([dist.idxmin()])
-                inames[idx] = [dist.idxmin()]
-                # err_var.append(geostruct.nugget)
-                err_var[idx] = geostruct.nugget
-                continue
+        Returns:
+            tuple containing
 
-            # vextract the point-to-point covariance matrix
-            point_cov = point_cov_df.loc[pt_names, pt_names]
+            - **numpy.ndarray**: (npts, k) neighbour indices into ptx/pty,
+              sorted by distance and padded with -1
+            - **numpy.ndarray**: (npts, k) neighbour distances
+            - **numpy.ndarray**: (npts, k) kriging factors
+            - **numpy.ndarray**: (npts,) kriging variance
 
-            # calc the interp point to points covariance
-            interp_cov = geostruct.covariance_points(
-                ix, iy, point_data.loc[pt_names, "x"], point_data.loc[pt_names, "y"]
+        """
+        from scipy.spatial import cKDTree
+
+        npts, npp = x.shape[0], ptx.shape[0]
+        k = max(1, min(npp, maxpts_interp))
+        nidx = np.full((npts, k), -1, dtype=np.int64)
+        ndist = np.zeros((npts, k))
+        nfacs = np.zeros((npts, k))
+        nvar = np.full(npts, np.NaN)
+        valid = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+        if valid.shape[0] == 0:
+            return nidx, ndist, nfacs, nvar
+        if npp == 0:
+            nvar[valid] = geostruct.sill
+            return nidx, ndist, nfacs, nvar
+        xv, yv = x[valid], y[valid]
+
+        # a few extra candidates so that ties at the maxpts_interp boundary
+        # are broken the same way (by point order) regardless of the tree
+        nq = min(npp, k + 8)
+        sqradius = search_radius ** 2
+        tree = cKDTree(np.column_stack((ptx, pty)))
+        _, qidx = tree.query(
+            np.column_stack((xv, yv)),
+            k=nq,
+            distance_upper_bound=search_radius * (1.0 + 1.0e-8) + EPSILON,
+        )
+        qidx = qidx.reshape(-1, nq)
+        found = qidx < npp
+        qidx = np.where(found, qidx, 0)
+        # recompute the squared distances the same way as the brute force
+        # search so that the radius test and the distances are identical
+        qd2 = (ptx[qidx] - xv[:, None]) ** 2 + (pty[qidx] - yv[:, None]) ** 2
+        qd2[~found] = np.inf
+        qd2[qd2 > sqradius] = np.inf
+        order = np.lexsort((qidx, qd2), axis=1)[:, :k]
+        rows = np.arange(qidx.shape[0])[:, None]
+        qidx, qd2 = qidx[rows, order], qd2[rows, order]
+        counts = np.isfinite(qd2).sum(axis=1)
+        qdist = np.sqrt(qd2)
+
+        # too few points found
+        few = counts < minpts_interp
+        nvar[valid[few]] = geostruct.sill
+        # one of the points is super close - just use it
+        close = ~few & (counts > 0) & (qdist[:, 0] <= EPSILON)
+        ci = valid[close]
+        nidx[ci, 0] = qidx[close, 0]
+        ndist[ci, 0] = EPSILON
+        nfacs[ci, 0] = 1.0
+        nvar[ci] = geostruct.nugget
+
+        solve = ~few & ~close & (counts > 0)
+        for c in np.unique(counts[solve]):
+            sel = np.flatnonzero(solve & (counts == c))
+            sidx = qidx[sel, :c]
+            # interp point to points covariance
+            xo, yo = ptx[sidx], pty[sidx]
+            interp_cov = np.zeros(sidx.shape) + geostruct.nugget
+            for v in geostruct.variograms:
+                interp_cov += v.covariance_points(xv[sel, None], yv[sel, None], xo, yo)
+            facs = OrdinaryKrige._solve_shared_systems(
+                sidx, interp_cov, point_cov, forgive, xv[sel], yv[sel]
             )
+            ok = np.isfinite(facs[:, -1])
+            vi = valid[sel[ok]]
+            nidx[vi, :c] = sidx[ok]
+            ndist[vi, :c] = qdist[sel[ok], :c]
+            nfacs[vi, :c] = facs[ok, :-1]
+            nvar[vi] = (
+                geostruct.sill
+                + facs[ok, -1]
+                - (facs[ok, :-1] * interp_cov[ok]).sum(axis=1)
+            )
+        return nidx, ndist, nfacs, nvar
 
-            # form the linear algebra parts and solve
-            d = len(pt_names) + 1  # +1 for lagrange mult
-            A = np.ones((d, d))
-            A[:-1, :-1] = point_cov.values
-            A[-1, -1] = 0.0  # unbiaised constraint
-            rhs = np.ones((d, 1))
-            rhs[:-1, 0] = interp_cov
-
+    @staticmethod
+    def _solve_shared_systems(sidx, interp_cov, point_cov, forgive, x, y):
+        """private: solve the kriging systems for interpolation points with
+        c neighbours each.  Points that share the same neighbour set share
+        one kriging matrix, which is solved once for all of their right
+        hand sides.  Systems are stacked and solved in batches of sets with
+        similar numbers of points.  Rows that can't be solved are NaN (if
+        `forgive`)
+        """
+        n, c = sidx.shape
+        sets, inv = np.unique(sidx, axis=0, return_inverse=True)
+        inv = inv.ravel()
+        nset = sets.shape[0]
+        # the kriging matrix for each unique neighbour set
+        A = np.ones((nset, c + 1, c + 1))
+        A[:, :-1, :-1] = point_cov[sets[:, :, None], sets[:, None, :]]
+        A[:, -1, -1] = 0.0  # unbiaised constraint
+        rhs = np.ones((n, c + 1))
+        rhs[:, :-1] = interp_cov
+
+        # position of each row within its set
+        size = np.bincount(inv, minlength=nset)
+        order = np.argsort(inv, kind="stable")
+        first = np.concatenate(([0], np.cumsum(size)[:-1]))
+        pos = np.empty(n, dtype=np.int64)
+        pos[order] = np.arange(n) - first[inv[order]]
+
+        facs = np.full((n, c + 1), np.NaN)
+        tier = np.ceil(np.log2(size)).astype(int)
+        for t in np.unique(tier):
+            tsets = np.flatnonzero(tier == t)
+            local = np.full(nset, -1, dtype=np.int64)
+            local[tsets] = np.arange(tsets.shape[0])
+            trows = np.flatnonzero(local[inv] >= 0)
+            B = np.zeros((tsets.shape[0], c + 1, size[tsets].max()))
+            B[local[inv[trows]], :, pos[trows]] = rhs[trows]
             try:
-                facs = np.linalg.solve(A, rhs)
-            except Exception as e:
-                print("error solving for factors: {0}".format(str(e)))
-                print("point:", ix, iy)
-                print("dist:", dist)
-                print("A:", A)
-                print("rhs:", rhs)
+                X = np.linalg.solve(A[tsets], B)
+            except np.linalg.LinAlgError:
+                # find the singular system(s)
+                X = np.full(B.shape, np.NaN)
+                for i, s in enumerate(tsets):
+                    try:
+                        X[i] = np.linalg.solve(A[s], B[i])
+                    except Exception as e:
+                        r = trows[inv[trows] == s][0]
+                        print("error solving for factors: {0}".format(str(e)))
+                        print("point:", x[r], y[r])
+                        print("A:", A[s])
+                        if not forgive:
+                            raise Exception(
+                                "error solving for factors:{0}".format(str(e))
+                            )
+            facs[trows] = X[local[inv[trows]], :, pos[trows]]
+        return facs
 
-                # inames.append([])
-                # idist.append([])
-                # ifacts.append([])
-                # err_var.append(np.NaN)
-                # err_var.insert(np.NaN)
-                continue
-
-            assert len(facs) - 1 == len(dist)
+    def _calc_factors_mp(
+        self,
+        x,
+        y,
+        minpts_interp=1,
+        maxpts_interp=20,
+        search_radius=1.0e10,
+        verbose=False,
+        pt_zone=None,
+        forgive=False,
+        num_threads=1,
+    ):
+        """private: calculate factors in parallel.  The interpolation points
+        are split into the same contiguous blocks used by
+        `OrdinaryKrige._calc_factors_kdtree()` and each block is processed
+        with `OrdinaryKrige._krige_block()` on the executor from
+        `pyemu.os_utils.get_executor()`, so the results are identical to the
+        serial results.  The point locations and covariance are packed into
+        one array that is shared read-only with the workers (through shared
+        memory in "processes" mode) and the workers only return the compact
+        neighbour index, distance and factor arrays for each block
+        """
+        from pyemu.utils import os_utils
 
-            # err_var.append(float(sill + facs[-1] - sum([f*c for f,c in zip(facs[:-1],interp_cov)])))
-            err_var[idx] = float(
-                sill + facs[-1] - sum([f * c for f, c in zip(facs[:-1], interp_cov)])
+        try:
+            import scipy.spatial
+        except ImportError:
+            warnings.warn(
+                "scipy is required for multiprocessing factor calculation, "
+                + "using serial calculation",
+                PyemuWarning,
             )
-            # inames.append(pt_names)
-            inames[idx] = pt_names
-
-            # idist.append(dist.values)
-            idist[idx] = dist.values
-
-            # ifacts.append(facs[:-1,0])
-            ifacts[idx] = facs[:-1, 0]
-            # if verbose == 2:
-            #     td = (datetime.now()-start).total_seconds()
-            #     print("...took {0}".format(td))
+            return self._calc_factors_org(
+                x,
+                y,
+                minpts_interp,
+                maxpts_interp,
+                search_radius,
+                verbose,
+                pt_zone,
+                forgive,
+            )
+        assert len(x) == len(y)
+        start_loop = datetime.now()
+        df = pd.DataFrame(data={"x": x, "y": y})
+        print("starting interp point loop for {0} points".format(df.shape[0]))
+        ptx, pty, ptnames, point_cov = self._zone_point_arrays(pt_zone)
+        arrays = [
+            df.x.values.astype(float),
+            df.y.values.astype(float),
+            ptx,
+            pty,
+            point_cov,
+        ]
+        # one packed array so the workers only need to load one shared block
+        layout = []
+        offset = 0
+        for a in arrays:
+            layout.append((offset, a.shape))
+            offset += a.size
+        packed = np.concatenate([np.ravel(a).astype(float) for a in arrays])
+        nblock = max(1, self.block_size)
+        blocks = [
+            (istart, min(istart + nblock, df.shape[0]))
+            for istart in range(0, df.shape[0], nblock)
+        ]
+        kwargs = {
+            "geostruct": self.geostruct,
+            "minpts_interp": minpts_interp,
+            "maxpts_interp": maxpts_interp,
+            "search_radius": search_radius,
+            "forgive": forgive,
+        }
+        shared = os_utils._share(packed)
+        try:
+            tasks = [(shared, layout, istart, iend, kwargs) for istart, iend in blocks]
+            results = os_utils._run_tasks(_krige_worker, tasks)
+        finally:
+            os_utils._unshare(shared)
+        if verbose:
+            for istart, iend in blocks:
+                print(
+                    "processed interp points {0} to {1} of {2}".format(
+                        istart, iend, df.shape[0]
+                    )
+                )
+        df = self._block_results_to_df(df, results, ptnames, pt_zone)
+        td = (datetime.now() - start_loop).total_seconds()
+        print("took {0} seconds".format(td))
+        return df
 
     def to_grid_factors_file(
-        self, filename, points_file="points.junk", zone_file="zone.junk"
+        self,
+        filename,
+        points_file="points.junk",
+        zone_file="zone.junk",
+        binary=False,
     ):
         """write a grid-based PEST-style factors file.  This file can be used with
         the fac2real() method to write an interpolated structured array
@@ -1455,10 +2052,16 @@ class OrdinaryKrige(object):
                 This is not used by the fac2real() method.  Default is "points.junk"
             zone_file (`str`): zone filename to add to the header of the factors file.
                 This is notused by the fac2real() method.  Default is "zone.junk"
+            binary (`bool`): flag to write a compact binary (CSR-style) factors file
+                instead of the PEST-style text file.  The binary file can only be
+                used with `pyemu.geostats.fac2real()`.  Default is False
 
         Note:
             this method should be called after OrdinaryKirge.calc_factors_grid()
 
+            `pyemu.geostats.convert_factors_file()` converts between the text
+            and binary factors file formats
+
         """
         if self.interp_data is None:
             raise Exception(
@@ -1468,32 +2071,130 @@ class OrdinaryKrige(object):
             raise Exception(
                 "ok.spatial_reference is None, must call calc_factors_grid() first"
             )
-        with open(filename, "w") as f:
-            f.write(points_file + "\n")
-            f.write(zone_file + "\n")
-            f.write(
-                "{0} {1}\n".format(
-                    self.spatial_reference.ncol, self.spatial_reference.nrow
-                )
+        factors = self._interp_data_to_factors(
+            points_file,
+            zone_file,
+            (self.spatial_reference.nrow, self.spatial_reference.ncol),
+        )
+        _write_factors_file(filename, factors, binary=binary)
+
+    def to_node_factors_file(
+        self, filename, points_file="points.junk", zone_file="zone.junk"
+    ):
+        """write a node-based binary factors file.  This file can be used with
+        `pyemu.geostats.fac2real()` to write an interpolated 1-D (node) array
+
+        Args:
+            filename (`str`): factor filename
+            points_file (`str`): points filename to add to the header of the factors file.
+                This is not used by the fac2real() method.  Default is "points.junk"
+            zone_file (`str`): zone filename to add to the header of the factors file.
+                This is notused by the fac2real() method.  Default is "zone.junk"
+
+        Note:
+            this method should be called after OrdinaryKirge.calc_factors_nodes().
+
+            Node-based factors files are always binary - the PEST-style text
+            factors file format only supports structured grids
+
+        """
+        if self.interp_data is None:
+            raise Exception(
+                "ok.interp_data is None, must call calc_factors_nodes() first"
             )
-            f.write("{0}\n".format(self.point_data.shape[0]))
-            [f.write("{0}\n".format(name)) for name in self.point_data.name]
-            t = 0
-            if self.geostruct.transform == "log":
-                t = 1
-            pt_names = list(self.point_data.name)
-            for idx, names, facts in zip(
-                self.interp_data.index, self.interp_data.inames, self.interp_data.ifacts
-            ):
-                if len(facts) == 0:
-                    continue
-                n_idxs = [pt_names.index(name) for name in names]
-                f.write("{0} {1} {2} {3:8.5e} ".format(idx + 1, t, len(names), 0.0))
-                [
-                    f.write("{0} {1:12.8g} ".format(i + 1, w))
-                    for i, w in zip(n_idxs, facts)
-                ]
-                f.write("\n")
+        if self.num_nodes is None:
+            raise Exception(
+                "ok.num_nodes is None, must call calc_factors_nodes() first"
+            )
+        factors = self._interp_data_to_factors(
+            points_file, zone_file, (self.num_nodes,)
+        )
+        _write_factors_file(filename, factors, binary=True)
+
+    def _interp_data_to_factors(self, points_file, zone_file, shape):
+        """private: the CSR-style factors dict (see `read_factors_file()`)
+        of `interp_data`
+        """
+        t = 0
+        if self.geostruct.transform == "log":
+            t = 1
+        pt_names = list(self.point_data.name)
+        pt_idx = {name: i for i, name in enumerate(pt_names)}
+        nfacs = self.interp_data.ifacts.apply(len).values
+        keep = nfacs > 0
+        inames = self.interp_data.inames.values[keep]
+        return {
+            "points_file": points_file,
+            "zone_file": zone_file,
+            "shape": shape,
+            "nrow": shape[0],
+            "ncol": shape[1] if len(shape) > 1 else 1,
+            "pp_names": pt_names,
+            "cells": np.asarray(self.interp_data.index.values[keep], dtype=np.int64),
+            "itrans": np.zeros(keep.sum(), dtype=np.int8) + t,
+            "indptr": np.concatenate(([0], np.cumsum(nfacs[keep]))).astype(np.int64),
+            "indices": np.array(
+                [pt_idx[name] for names in inames for name in names], dtype=np.int64
+            ),
+            "weights": np.concatenate(
+                [np.asarray(f, dtype=float) for f in self.interp_data.ifacts.values]
+                + [np.zeros(0)]
+            ),
+        }
+
+
+# bump if the layout of (or the factors in) the cache files change
+_FACTORS_CACHE_VERSION = 1
+
+
+def _evict_factors_cache(cache_dir, max_bytes):
+    """private: remove the least recently used kriging factors cache files
+    until the total size of the cache is no more than `max_bytes`
+    """
+    entries = []
+    for fname in os.listdir(cache_dir):
+        if not (fname.startswith("krige_") and fname.endswith(".npz")):
+            continue
+        try:
+            st = os.stat(os.path.join(cache_dir, fname))
+        except OSError:
+            continue
+        entries.append((st.st_mtime_ns, st.st_size, fname))
+    total = sum([e[1] for e in entries])
+    # keep the most recent entry, even if it is bigger than max_bytes
+    for _, size, fname in sorted(entries)[:-1]:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(os.path.join(cache_dir, fname))
+        except OSError:
+            continue
+        total -= size
+
+
+def _krige_worker(shared, layout, istart, iend, kwargs):
+    """private: calculate the kriging factors for one contiguous block of
+    interpolation points on an executor worker
+    """
+    from pyemu.utils import os_utils
+
+    packed = os_utils._get_shared(shared)
+    x, y, ptx, pty, point_cov = [
+        packed[offset : offset + int(np.prod(shape))].reshape(shape)
+        for offset, shape in layout
+    ]
+    return OrdinaryKrige._krige_block(
+        x[istart:iend],
+        y[istart:iend],
+        ptx,
+        pty,
+        point_cov,
+        kwargs["geostruct"],
+        kwargs["minpts_interp"],
+        kwargs["maxpts_interp"],
+        kwargs["search_radius"],
+        kwargs["forgive"],
+    )
 
 
 class Vario2d(object):
@@ -1619,7 +2320,9 @@ class Vario2d(object):
         ax.plot(x, y, **kwargs)
         return ax
 
-    def covariance_matrix(self, x, y, names=None, cov=None):
+    def covariance_matrix(
+        self, x, y, names=None, cov=None, dtype=float, sparse=False, cutoff=0.0
+    ):
         """build a pyemu.Cov instance implied by Vario2d
 
         Args:
@@ -1628,6 +2331,11 @@ class Vario2d(object):
             names ([`str`]): names of locations. If None, cov must not be None
             cov (`pyemu.Cov`): an existing Cov instance.  Vario2d contribution is added to cov
             in place
+            dtype (`numpy.dtype`): the dtype of the covariance values.  Default is `float`
+            sparse (`bool`): flag to return a `Cov` with sparse storage that only
+                holds the entries greater than `cutoff`.  Default is False
+            cutoff (`float`): the covariance value at or below which entries
+                are dropped from a sparse result.  Default is 0.0
 
         Returns:
             `pyemu.Cov`: the covariance matrix for `x`, `y` implied by `Vario2d`
@@ -1642,37 +2350,20 @@ class Vario2d(object):
             y = np.array(y)
         assert x.shape[0] == y.shape[0]
 
-        if names is not None:
-            assert x.shape[0] == len(names)
-            c = np.zeros((len(names), len(names)))
-            np.fill_diagonal(c, self.contribution)
-            cov = Cov(x=c, names=names)
-        elif cov is not None:
-            assert cov.shape[0] == x.shape[0]
-            names = cov.row_names
-            c = np.zeros((len(names), 1)) + self.contribution
-            cont = Cov(x=c, names=names, isdiagonal=True)
-            cov += cont
-
-        else:
+        if names is None and cov is None:
             raise Exception(
                 "Vario2d.covariance_matrix() requires either" + "names or cov arg"
             )
-        rc = self.rotation_coefs
-        for i1, (n1, x1, y1) in enumerate(zip(names, x, y)):
-            dx = x1 - x[i1 + 1 :]
-            dy = y1 - y[i1 + 1 :]
-            dxx, dyy = self._apply_rotation(dx, dy)
-            h = np.sqrt(dxx * dxx + dyy * dyy)
-
-            h[h < 0.0] = 0.0
-            h = self._h_function(h)
-            if np.any(np.isnan(h)):
-                raise Exception("nans in h for i1 {0}".format(i1))
-            cov.x[i1, i1 + 1 :] += h
-        for i in range(len(names)):
-            cov.x[i + 1 :, i] = cov.x[i, i + 1 :]
-        return cov
+        return _build_covariance_matrix(
+            [self],
+            x,
+            y,
+            names=names,
+            cov=cov,
+            dtype=dtype,
+            sparse=sparse,
+            cutoff=cutoff,
+        )
 
     def _specsim_grid_contrib(self, grid):
         rot_grid = grid
@@ -1852,6 +2543,141 @@ class SphVario(Vario2d):
         #     return 0.0
 
 
+def _build_covariance_matrix(
+    variograms,
+    x,
+    y,
+    names=None,
+    cov=None,
+    nugget=0.0,
+    dtype=float,
+    sparse=False,
+    cutoff=0.0,
+):
+    """private: build (or add to) a `Cov` from variograms and a nugget.
+    Used by `GeoStruct.covariance_matrix()` and `Vario2d.covariance_matrix()`
+    """
+    if names is not None:
+        assert x.shape[0] == len(names)
+    else:
+        assert cov.shape[0] == x.shape[0]
+        names = cov.row_names
+        if cov.isdiagonal:
+            # the contributions are dense
+            cov = Cov(x=cov.as_2d, names=names)
+    if sparse or (cov is not None and cov.issparse):
+        cov_x = _covariance_array_sparse(variograms, x, y, nugget, dtype, cutoff)
+    else:
+        cov_x = _covariance_array(variograms, x, y, nugget, dtype)
+    if cov is None:
+        return Cov(x=cov_x, names=names)
+    if cov.issparse:
+        return Cov(x=cov.x + cov_x, names=names)
+    # add in place so that the passed cov is also updated
+    if sparse:
+        cov_x = cov_x.toarray()
+    cov.x[:, :] += cov_x
+    return cov
+
+
+def _covariance_tile(variograms, x, y, rows, cols, nugget=0.0):
+    """private: the covariance for one tile of pairs of points.  `rows` and
+    `cols` are slices of the points in `x` and `y`
+    """
+    dx = x[rows, None] - x[None, cols]
+    dy = y[rows, None] - y[None, cols]
+    tile = np.zeros(dx.shape)
+    if rows.start == cols.start:
+        # the diagonal of the matrix is the first diagonal of the tile
+        tile[np.diag_indices(min(tile.shape))] += nugget
+    for v in variograms:
+        dxx, dyy = v._apply_rotation(dx, dy)
+        h = dxx * dxx
+        h += dyy * dyy
+        h = v._h_function(np.sqrt(h, out=h))
+        if np.any(np.isnan(h)):
+            raise Exception("nans in h for rows {0}".format(rows))
+        tile += h
+    return tile
+
+
+def _covariance_array(variograms, x, y, nugget=0.0, dtype=float, tile_size=2 ** 18):
+    """private: a dense covariance array for points `x`, `y`.  The array
+    is filled in place one strip of rows (of about `tile_size` pairs) at a
+    time, only the upper triangle is calculated and mirrored
+    """
+    n = x.shape[0]
+    x = x.astype(float)
+    y = y.astype(float)
+    arr = np.empty((n, n), dtype=dtype)
+    i0 = 0
+    while i0 < n:
+        nrows = max(16, tile_size // (n - i0))
+        rows = slice(i0, min(n, i0 + nrows))
+        cols = slice(i0, n)
+        tile = _covariance_tile(variograms, x, y, rows, cols, nugget)
+        arr[rows, cols] = tile
+        arr[cols, rows] = tile.T
+        i0 = rows.stop
+    return arr
+
+
+def _covariance_array_sparse(
+    variograms, x, y, nugget=0.0, dtype=float, cutoff=0.0, tile_size=512
+):
+    """private: a sparse (csr) covariance matrix for points `x`, `y` that
+    only holds entries greater than `cutoff`.  If all the variograms have
+    compact support (`SphVario`), the points are ordered into spatially
+    compact tiles and tiles that are farther apart than the variogram range
+    are skipped
+    """
+    import scipy.sparse
+
+    n = x.shape[0]
+    x = x.astype(float)
+    y = y.astype(float)
+    max_h = None
+    if len(variograms) > 0 and all([isinstance(v, SphVario) for v in variograms]):
+        # h is never less than the distance times the smallest scaling
+        max_h = max([v.a / min(1.0, v.anisotropy) for v in variograms])
+    if max_h is not None and cutoff >= 0.0 and n > tile_size:
+        # sort the points into strips one range wide
+        strip = np.floor((y - y.min()) / max_h)
+        order = np.lexsort((x * np.where(strip % 2 == 0, 1.0, -1.0), strip))
+    else:
+        order = np.arange(n)
+    xo, yo = x[order], y[order]
+    bounds = []
+    for i0 in range(0, n, tile_size):
+        sl = slice(i0, min(n, i0 + tile_size))
+        bounds.append((sl, xo[sl].min(), xo[sl].max(), yo[sl].min(), yo[sl].max()))
+    irows, icols, vals = [], [], []
+    for i, (rows, rxmin, rxmax, rymin, rymax) in enumerate(bounds):
+        for cols, cxmin, cxmax, cymin, cymax in bounds[i:]:
+            if max_h is not None and cutoff >= 0.0:
+                gx = max(0.0, cxmin - rxmax, rxmin - cxmax)
+                gy = max(0.0, cymin - rymax, rymin - cymax)
+                if np.sqrt(gx * gx + gy * gy) > max_h:
+                    continue
+            tile = _covariance_tile(variograms, xo, yo, rows, cols, nugget)
+            r, c = np.nonzero(tile > cutoff)
+            v = tile[r, c].astype(dtype)
+            r, c = r + rows.start, c + cols.start
+            if rows.start != cols.start:
+                # the mirror of this tile
+                r, c, v = np.concatenate((r, c)), np.concatenate((c, r)), np.tile(v, 2)
+            irows.append(order[r])
+            icols.append(order[c])
+            vals.append(v)
+    if len(vals) == 0:
+        return scipy.sparse.csr_matrix((n, n), dtype=dtype)
+    return scipy.sparse.csr_matrix(
+        (np.concatenate(vals), (np.concatenate(irows), np.concatenate(icols))),
+        shape=(n, n),
+        dtype=dtype,
+    )
+
+
 def read_struct_file(struct_file, return_type=GeoStruct):
     """read an existing PEST-type structure file into a GeoStruct instance
 
@@ -2184,9 +3010,12 @@ def fac2real(
 
     Args:
         pp_file (`str`): PEST-type pilot points file
-        factors_file (`str`): PEST-style factors file
+        factors_file (`str`): PEST-style factors file or binary factors file
+            written by `OrdinaryKrige.to_grid_factors_file(binary=True)` or
+            `OrdinaryKrige.to_node_factors_file()`
         out_file (`str`): filename of array to write.  If None, array is returned, else
-            value of out_file is returned.  Default is "test.ref".
+            value of out_file is returned.  Default is "test.ref".  For node-based
+            factors files, the array is written with one node per line
         upper_lim (`float`): maximum interpolated value in the array.  Values greater than
             `upper_lim` are set to fill_value
         lower_lim (`float`): minimum interpolated value in the array.  Values less than
@@ -2195,10 +3024,16 @@ def fac2real(
 
 
     Returns:
-        `numpy.ndarray`: if out_file is None
+        `numpy.ndarray`: if out_file is None.  A 2-D (nrow,ncol) array for grid-based
+        factors files, a 1-D (nnode) array for node-based factors files
 
         `str`: if out_file it not None
 
+    Note:
+        the factors are applied to the pilot point values as a single
+        sparse matrix-vector product.  Pilot point values are matched to
+        the factors by name.  The parsed factors file is cached between calls
+
     Example::
 
         pyemu.utils.geostats.fac2real("hkpp.dat",out_file="hk_layer_1.ref")
@@ -2222,16 +3057,8 @@ def fac2real(
             )
         )
     assert os.path.exists(factors_file), "factors file not found"
-    f_fac = open(factors_file, "r")
-    fpp_file = f_fac.readline()
-    if pp_file is None and pp_data is None:
-        pp_data = pp_file_to_dataframe(fpp_file)
-        pp_data.loc[:, "name"] = pp_data.name.apply(lambda x: x.lower())
-
-    fzone_file = f_fac.readline()
-    ncol, nrow = [int(i) for i in f_fac.readline().strip().split()]
-    npp = int(f_fac.readline().strip())
-    pp_names = [f_fac.readline().strip().lower() for _ in range(npp)]
+    factors = _get_factors(factors_file)
+    pp_names = factors["pp_names"]
 
     # check that pp_names is sync'd with pp_data
     diff = set(list(pp_data.name)).symmetric_difference(set(pp_names))
@@ -2242,38 +3069,14 @@ def fac2real(
             + ",".join(list(diff))
         )
 
-    arr = np.zeros((nrow, ncol), dtype=np.float) + fill_value
-    pp_dict = {int(name): val for name, val in zip(pp_data.index, pp_data.parval1)}
-    try:
-        pp_dict_log = {
-            name: np.log10(val) for name, val in zip(pp_data.index, pp_data.parval1)
-        }
-    except:
-        pp_dict_log = {}
-    # for i in range(nrow):
-    #    for j in range(ncol):
-    while True:
-        line = f_fac.readline()
-        if len(line) == 0:
-            # raise Exception("unexpected EOF in factors file")
-            break
-        try:
-            inode, itrans, fac_data = _parse_factor_line(line)
-        except Exception as e:
-            raise Exception("error parsing factor line {0}:{1}".format(line, str(e)))
-        # fac_prods = [pp_data.loc[pp,"value"]*fac_data[pp] for pp in fac_data]
-        if itrans == 0:
-            fac_sum = sum([pp_dict[pp] * fac_data[pp] for pp in fac_data])
-        else:
-            fac_sum = sum([pp_dict_log[pp] * fac_data[pp] for pp in fac_data])
-        if itrans != 0:
-            fac_sum = 10 ** fac_sum
-        # col = ((inode - 1) // nrow) + 1
-        # row = inode - ((col - 1) * nrow)
-        row = ((inode - 1) // ncol) + 1
-        col = inode - ((row - 1) * ncol)
-        # arr[row-1,col-1] = np.sum(np.array(fac_prods))
-        arr[row - 1, col - 1] = fac_sum
+    pp_vals = dict(zip(pp_data.name, pp_data.parval1))
+    pp_vals = np.array([pp_vals[name] for name in pp_names], dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pp_vals_log = np.log10(pp_vals)
+    fac_sum = _apply_factors(factors, pp_vals, pp_vals_log)
+
+    arr = np.zeros(factors["shape"], dtype=float) + fill_value
+    arr.ravel()[factors["cells"]] = fac_sum
     arr[arr < lower_lim] = lower_lim
     arr[arr > upper_lim] = upper_lim
 
@@ -2285,17 +3088,310 @@ def fac2real(
     return arr
 
 
-def _parse_factor_line(line):
-    """function to parse a factor file line.  Used by fac2real()"""
-
-    raw = line.strip().split()
-    inode, itrans, nfac = [int(i) for i in raw[:3]]
-    fac_data = {
-        int(raw[ifac]) - 1: float(raw[ifac + 1]) for ifac in range(4, 4 + nfac * 2, 2)
-    }
-    # fac_data = {}
-    # for ifac in range(4,4+nfac*2,2):
-    #     pnum = int(raw[ifac]) - 1 #zero based to sync with pandas
-    #     fac = float(raw[ifac+1])
-    #     fac_data[pnum] = fac
-    return inode, itrans, fac_data
+def fac2real_ensemble(
+    factors,
+    pp_values,
+    par_names=None,
+    upper_lim=1.0e30,
+    lower_lim=-1.0e30,
+    fill_value=1.0e30,
+    filename=None,
+    chunk=100,
+):
+    """apply kriging factors to many pilot point vectors (e.g. the
+    realizations of a parameter ensemble) at once
+
+    Args:
+        factors (`str` or `dict`): a (text or binary) factors file or the factors
+            returned by `pyemu.geostats.read_factors_file()`
+        pp_values (`numpy.ndarray`, `pandas.DataFrame` or `pyemu.ParameterEnsemble`):
+            the pilot point values, one realization per row.  If an ndarray, the
+            columns must be in the pilot point order of the factors file
+        par_names ([`str`]): the column names of `pp_values` that correspond to the
+            pilot points in the factors file (in factors file order).  If None and
+            `pp_values` has column names, the columns are matched to the pilot point
+            names in the factors file.  Default is None
+        upper_lim (`float`): maximum interpolated value in the arrays.
+        lower_lim (`float`): minimum interpolated value in the arrays.
+        fill_value (`float`): the value to assign array nodes that are not interpolated
+        filename (`str`): an optional ".npy" file to hold the result as a memory-mapped
+            array.  Useful for large ensembles.  Default is None
+        chunk (`int`): the number of realizations to interpolate at a time.  Default
+            is 100
+
+    Returns:
+        `numpy.ndarray`: a (nreal, nrow, ncol) array of interpolated values (or
+        (nreal, nnode) for node-based factors).  If `filename` is not None, a
+        `numpy.memmap` of `filename`
+
+    Note:
+        if `pp_values` is a transformed `ParameterEnsemble`, the values are back
+        transformed before interpolation.  If scipy is available, each chunk is
+        interpolated with one sparse matrix-matrix product
+
+    Example::
+
+        pe = pyemu.ParameterEnsemble.from_binary(pst=pst,filename="prior.jcb")
+        pp_pars = pst.parameter_data.loc[pst.parameter_data.pargp=="hkpp","parnme"]
+        arrs = pyemu.geostats.fac2real_ensemble("hkpp.fac",pe,par_names=pp_pars)
+
+    """
+    from pyemu.en import Ensemble
+
+    if isinstance(factors, str):
+        assert os.path.exists(factors), "factors file not found"
+        factors = _get_factors(factors)
+    pp_names = factors["pp_names"]
+    if isinstance(pp_values, Ensemble):
+        if pp_values.istransformed:
+            pp_values = pp_values.copy()
+            pp_values.back_transform()
+        pp_values = pp_values._df
+    if isinstance(pp_values, pd.DataFrame):
+        if par_names is None:
+            cols = {str(c).lower(): c for c in pp_values.columns}
+            missing = [name for name in pp_names if name not in cols]
+            if len(missing) > 0:
+                raise Exception(
+                    "the following pilot point names are not in pp_values: "
+                    + ",".join(missing)
+                )
+            par_names = [cols[name] for name in pp_names]
+        pp_values = pp_values.loc[:, list(par_names)].values
+    elif par_names is not None:
+        raise Exception("par_names can only be used with DataFrame pp_values")
+    pp_values = np.atleast_2d(np.asarray(pp_values, dtype=float))
+    if pp_values.shape[1] != len(pp_names):
+        raise Exception(
+            "pp_values has {0} columns, factors file has {1} pilot points".format(
+                pp_values.shape[1], len(pp_names)
+            )
+        )
+
+    nreal = pp_values.shape[0]
+    shape = (nreal,) + tuple(factors["shape"])
+    if filename is not None:
+        arr = np.lib.format.open_memmap(filename, mode="w+", dtype=float, shape=shape)
+    else:
+        arr = np.empty(shape, dtype=float)
+    log_cell = factors["itrans"] != 0
+    try:
+        import scipy.sparse
+    except ImportError:
+        weights = None
+    else:
+        # one sparse (cell by pilot point) matrix for the cells of each transform
+        indptr = factors["indptr"]
+        weights = []
+        for cells in [np.flatnonzero(~log_cell), np.flatnonzero(log_cell)]:
+            counts = indptr[cells + 1] - indptr[cells]
+            entries = np.repeat(indptr[cells] - np.cumsum(counts) + counts, counts)
+            entries += np.arange(entries.shape[0])
+            w = scipy.sparse.csr_matrix(
+                (
+                    factors["weights"][entries],
+                    factors["indices"][entries],
+                    np.concatenate(([0], np.cumsum(counts))),
+                ),
+                shape=(cells.shape[0], len(pp_names)),
+            )
+            weights.append((factors["cells"][cells], w))
+    arr2d = arr.reshape(nreal, -1)
+    chunk = max(1, int(chunk))
+    for istart in range(0, nreal, chunk):
+        vals = pp_values[istart : istart + chunk]
+        block = arr2d[istart : istart + chunk]
+        block[:] = fill_value
+        with np.errstate(divide="ignore", invalid="ignore"):
+            vals_log = np.log10(vals) if log_cell.any() else vals
+        if weights is None:
+            block[:, factors["cells"]] = [
+                _apply_factors(factors, v, vl) for v, vl in zip(vals, vals_log)
+            ]
+        else:
+            (lin_cells, lin_w), (log_cells, log_w) = weights
+            if lin_cells.shape[0] > 0:
+                block[:, lin_cells] = (lin_w @ vals.T).T
+            if log_cells.shape[0] > 0:
+                fac_sum = (log_w @ vals_log.T).T
+                block[:, log_cells] = np.power(10.0, fac_sum, out=fac_sum)
+        block[block < lower_lim] = lower_lim
+        block[block > upper_lim] = upper_lim
+    if filename is not None:
+        arr.flush()
+    return arr
+
+
+def _apply_factors(factors, pp_vals, pp_vals_log):
+    """private: interpolate pilot point values with a CSR factors dict.
+    Returns the interpolated value for each cell in `factors["cells"]`
+    """
+    ncell = factors["cells"].shape[0]
+    rows = factors["rows"]
+    log_entry = factors["itrans"][rows] != 0
+    vals = np.where(
+        log_entry, pp_vals_log[factors["indices"]], pp_vals[factors["indices"]]
+    )
+    fac_sum = np.bincount(rows, weights=vals * factors["weights"], minlength=ncell)
+    log_cell = factors["itrans"] != 0
+    fac_sum[log_cell] = 10 ** fac_sum[log_cell]
+    return fac_sum
+
+
+# magic bytes of the zip (npz) container used for binary factors files
+_BINARY_FACTORS_MAGIC = b"PK\x03\x04"
+
+# parsed factors files, keyed by absolute path.  Only a few are kept since
+# each holds the interpolation arrays for every grid cell
+_factors_file_cache = _FileCache(max_entries=8)
+
+
+def _get_factors(factors_file):
+    """private: read a (text or binary) factors file, using a cached
+    version if the file has not changed since it was last read
+    """
+    return _factors_file_cache.get(factors_file, read_factors_file)
+
+
+def read_factors_file(factors_file):
+    """read a PEST-style text factors file or a binary factors file into a
+    compact CSR-style representation
+
+    Args:
+        factors_file (`str`): text or binary factors file
+
+    Returns:
+        `dict`: the factors with keys "points_file", "zone_file", "shape"
+        ((nrow, ncol) or (nnode,) for node-based factors), "nrow", "ncol"
+        (nnode and 1 for node-based factors), "pp_names" (lower case),
+        "cells" (zero-based flattened cell
+        index of each interpolated cell), "itrans" (transform flag of
+        each cell), "indptr" (start of each cell's entries), "indices"
+        (zero-based pilot point index of each entry), "weights" (factor
+        of each entry) and "rows" (position in "cells" of each entry)
+
+    Example::
+
+        factors = pyemu.geostats.read_factors_file("factors.dat")
+
+    """
+    with open(factors_file, "rb") as f:
+        magic = f.read(len(_BINARY_FACTORS_MAGIC))
+    if magic == _BINARY_FACTORS_MAGIC:
+        with np.load(factors_file, allow_pickle=False) as npz:
+            points_file, zone_file = [str(s) for s in npz["header"]]
+            shape = tuple([int(i) for i in npz["shape"]])
+            factors = {
+                "points_file": points_file,
+                "zone_file": zone_file,
+                "shape": shape,
+                "nrow": shape[0],
+                "ncol": shape[1] if len(shape) > 1 else 1,
+                "pp_names": [str(s).lower() for s in npz["pp_names"]],
+                "cells": npz["cells"].astype(np.int64),
+                "itrans": npz["itrans"].astype(np.int8),
+                "indptr": npz["indptr"].astype(np.int64),
+                "indices": npz["indices"].astype(np.int64),
+                "weights": npz["weights"].astype(float),
+            }
+    else:
+        with open(factors_file, "r") as f:
+            points_file = f.readline().strip()
+            zone_file = f.readline().strip()
+            ncol, nrow = [int(i) for i in f.readline().strip().split()]
+            npp = int(f.readline().strip())
+            pp_names = [f.readline().strip().lower() for _ in range(npp)]
+            cells, itrans, nfacs, entries = [], [], [], []
+            for line in f:
+                raw = line.strip().split()
+                if len(raw) == 0:
+                    continue
+                try:
+                    inode, itran, nfac = [int(i) for i in raw[:3]]
+                    if len(raw) < 4 + nfac * 2:
+                        raise Exception("too few entries")
+                except Exception as e:
+                    raise Exception(
+                        "error parsing factor line {0}:{1}".format(line, str(e))
+                    )
+                entries.extend(raw[4 : 4 + nfac * 2])
+                cells.append(inode - 1)
+                itrans.append(itran)
+                nfacs.append(nfac)
+        entries = np.array(entries, dtype=float).reshape(-1, 2)
+        factors = {
+            "points_file": points_file,
+            "zone_file": zone_file,
+            "shape": (nrow, ncol),
+            "nrow": nrow,
+            "ncol": ncol,
+            "pp_names": pp_names,
+            "cells": np.array(cells, dtype=np.int64),
+            "itrans": np.array(itrans, dtype=np.int8),
+            "indptr": np.concatenate(([0], np.cumsum(nfacs))).astype(np.int64),
+            "indices": entries[:, 0].astype(np.int64) - 1,
+            "weights": entries[:, 1],
+        }
+    factors["rows"] = np.repeat(
+        np.arange(factors["cells"].shape[0]), np.diff(factors["indptr"])
+    )
+    return factors
+
+
+def _write_factors_file(filename, factors, binary=False):
+    """private: write a CSR-style factors dict to a PEST-style text
+    factors file or a binary factors file
+    """
+    if binary:
+        with open(filename, "wb") as f:
+            np.savez(
+                f,
+                header=np.array([factors["points_file"], factors["zone_file"]]),
+                shape=np.array(factors["shape"], dtype=np.int64),
+                pp_names=np.array(factors["pp_names"], dtype=str),
+                cells=factors["cells"].astype(np.int32),
+                itrans=factors["itrans"].astype(np.int8),
+                indptr=factors["indptr"].astype(np.int64),
+                indices=factors["indices"].astype(np.int32),
+                weights=factors["weights"].astype(float),
+            )
+        return
+    if len(factors["shape"]) != 2:
+        raise Exception(
+            "node-based factors can only be written to binary factors files"
+        )
+    indptr = factors["indptr"]
+    indices = factors["indices"]
+    weights = factors["weights"]
+    with open(filename, "w") as f:
+        f.write(factors["points_file"] + "\n")
+        f.write(factors["zone_file"] + "\n")
+        f.write("{0} {1}\n".format(factors["ncol"], factors["nrow"]))
+        f.write("{0}\n".format(len(factors["pp_names"])))
+        [f.write("{0}\n".format(name)) for name in factors["pp_names"]]
+        for i, (cell, t) in enumerate(zip(factors["cells"], factors["itrans"])):
+            s, e = indptr[i], indptr[i + 1]
+            f.write("{0} {1} {2} {3:8.5e} ".format(cell + 1, t, e - s, 0.0))
+            [
+                f.write("{0} {1:12.8g} ".format(ii + 1, w))
+                for ii, w in zip(indices[s:e], weights[s:e])
+            ]
+            f.write("\n")
+
+
+def convert_factors_file(factors_file, out_file, binary=True):
+    """convert between PEST-style text factors files and binary factors files
+
+    Args:
+        factors_file (`str`): existing text or binary factors file
+        out_file (`str`): the factors file to write
+        binary (`bool`): flag to write `out_file` as a binary factors file.  If
+            False, a PEST-style text factors file is written.  Default is True
+
+    Example::
+
+        pyemu.geostats.convert_factors_file("pp.fac","pp.fac.bin")
+
+    """
+    factors = read_factors_file(factors_file)
+    _write_factors_file(out_file, factors, binary=binary)
@@ -28,10 +28,17 @@ except:
 
 import pyemu
 from pyemu.utils.os_utils import run, start_workers
+from pyemu.utils import os_utils
 
 
 def geostatistical_draws(
-    pst, struct_dict, num_reals=100, sigma_range=4, verbose=True, scale_offset=True
+    pst,
+    struct_dict,
+    num_reals=100,
+    sigma_range=4,
+    verbose=True,
+    scale_offset=True,
+    seed=None,
 ):
     """construct a parameter ensemble from a prior covariance matrix
     implied by geostatistical structure(s) and parameter bounds.
@@ -53,6 +60,10 @@ def geostatistical_draws(
         scale_offset (`bool`,optional): flag to apply scale and offset to parameter bounds
             when calculating variances - this is passed through to `pyemu.Cov.from_parameter_data()`.
             Default is True.
+        seed (`int`, `numpy.random.SeedSequence` or `numpy.random.Generator`): seed
+            for reproducible draws.  Each geostatistical structure zone (and the remaining
+            uncorrelated parameters) is drawn from its own child stream of `seed`.  If
+            None, the global `numpy.random` stream is used.  Default is None
 
     Returns
         `pyemu.ParameterEnsemble`: the realized parameter ensemble.
@@ -91,6 +102,13 @@ def geostatistical_draws(
     par = pst.parameter_data
     par_ens = []
     pars_in_cov = set()
+    seed_seq = pyemu.en._seed_sequence(seed)
+
+    def next_seed():
+        # a child stream of seed_seq for each draw
+        if seed_seq is None:
+            return None
+        return pyemu.en._child_seeds(seed_seq, len(par_ens) + 1, len(par_ens))[0]
     keys = list(struct_dict.keys())
     keys.sort()
 
@@ -173,12 +191,15 @@ def geostatistical_draws(
 
                 if verbose:
                     print("scaling full cov by diag var cov")
-                # cov.x *= tpl_var
-                for i in range(cov.shape[0]):
-                    cov.x[i, :] *= tpl_var
+                cov.x[:, :] *= tpl_var
                 # no fixed values here
                 pe = pyemu.ParameterEnsemble.from_gaussian_draw(
-                    pst=pst, cov=cov, num_reals=num_reals, by_groups=False, fill=False
+                    pst=pst,
+                    cov=cov,
+                    num_reals=num_reals,
+                    by_groups=False,
+                    fill=False,
+                    seed=next_seed(),
                 )
                 # df = pe.iloc[:,:]
                 par_ens.append(pe._df)
@@ -195,7 +216,7 @@ def geostatistical_draws(
         # cov = full_cov.get(diff,diff)
         # here we fill in the fixed values
         pe = pyemu.ParameterEnsemble.from_gaussian_draw(
-            pst, cov, num_reals=num_reals, fill=False
+            pst, cov, num_reals=num_reals, fill=False, seed=next_seed()
         )
         par_ens.append(pe._df)
     par_ens = pd.concat(par_ens, axis=1)
@@ -204,7 +225,13 @@ def geostatistical_draws(
 
 
 def geostatistical_prior_builder(
-    pst, struct_dict, sigma_range=4, verbose=False, scale_offset=False
+    pst,
+    struct_dict,
+    sigma_range=4,
+    verbose=False,
+    scale_offset=False,
+    filename=None,
+    sparse=False,
 ):
     """construct a full prior covariance matrix using geostastical structures
     and parameter bounds information.
@@ -223,6 +250,12 @@ def geostatistical_prior_builder(
         scale_offset (`bool`): a flag to apply scale and offset to parameter upper and lower bounds
             before applying log transform.  Passed to pyemu.Cov.from_parameter_data().  Default
             is False
+        filename (`str`): a PEST-compatible binary file to write the prior to.  If passed, each
+            geostatistical block is written to the file as soon as it is built so that
+            the full prior is never held in memory.  A lazily-loaded, sparse `Cov` of the
+            file is returned.  Default is None
+        sparse (`bool`): flag to return the prior as a block-diagonal `Cov` with sparse
+            storage instead of a dense `Cov`.  Default is False
 
     Returns:
         `pyemu.Cov`: a covariance matrix that includes all adjustable parameters in the control
@@ -235,13 +268,21 @@ def geostatistical_prior_builder(
         sigma_range. Most users will want to sill of the geostruct to sum to 1.0 so that the resulting
         covariance matrices have variance proportional to the parameter bounds. Sounds complicated...
 
+        With `filename` or `sparse`, each parameter can only be in one geostatistical
+        block.  The block-diagonal prior can be passed directly to `pyemu.Schur` and
+        `pyemu.ParameterEnsemble.from_gaussian_draw()`
+
     Example::
 
         pst = pyemu.Pst("my.pst")
         sd = {"struct.dat":["hkpp.dat.tpl","vka.dat.tpl"]}
-        cov = pyemu.helpers.geostatistical_draws(pst,struct_dict=sd}
+        cov = pyemu.helpers.geostatistical_prior_builder(pst,struct_dict=sd}
         cov.to_binary("prior.jcb")
 
+        # for large problems, write the prior straight to disk
+        cov = pyemu.helpers.geostatistical_prior_builder(pst,struct_dict=sd,
+                                                         filename="prior.jcb")
+
     """
 
     if isinstance(pst, str):
@@ -254,9 +295,33 @@ def geostatistical_prior_builder(
     full_cov = pyemu.Cov.from_parameter_data(
         pst, sigma_range=sigma_range, scale_offset=scale_offset
     )
+    if filename is None and not sparse:
+        for cov in _geostatistical_prior_blocks(
+            pst, struct_dict, full_cov, verbose=verbose
+        ):
+            if verbose:
+                print("replace in full cov")
+            full_cov.replace(cov)
+        return full_cov
+
+    # block-diagonal prior, the remaining (non-geostatistical) parameters
+    # are one diagonal block
+    blocks = _geostatistical_prior_blocks(
+        pst, struct_dict, full_cov, verbose=verbose, remaining=True
+    )
+    return pyemu.Cov.from_blocks(blocks, names=full_cov.row_names, filename=filename)
+
 
+def _geostatistical_prior_blocks(
+    pst, struct_dict, full_cov, verbose=False, remaining=False
+):
+    """private: generator of the scaled geostatistical covariance block for
+    each structure and zone used by `geostatistical_prior_builder()`.  If
+    `remaining`, a final diagonal block of the parameters in `full_cov` that
+    are not in any geostatistical block is also yielded
+    """
     full_cov_dict = {n: float(v) for n, v in zip(full_cov.col_names, full_cov.x)}
-    # full_cov = None
+    in_blocks = set()
     par = pst.parameter_data
     for gs, items in struct_dict.items():
         if verbose:
@@ -329,7 +394,7 @@ def geostatistical_prior_builder(
                 # tpl_var = tpl_var.max()
                 if verbose:
                     print("scaling full cov by diag var cov")
-                cov *= tpl_var
+                cov.x[:, :] *= tpl_var
                 if verbose:
                     print("test for inversion")
                 try:
@@ -337,15 +402,16 @@ def geostatistical_prior_builder(
                 except:
                     df_zone.to_csv("prior_builder_crash.csv")
                     raise Exception("error inverting cov {0}".format(cov.row_names[:3]))
-
-                    if verbose:
-                        print("replace in full cov")
-                full_cov.replace(cov)
-                # d = np.diag(full_cov.x)
-                # idx = np.argwhere(d==0.0)
-                # for i in idx:
-                #     print(full_cov.names[i])
-    return full_cov
+                in_blocks.update(cov.row_names)
+                yield cov
+    if remaining:
+        names = [name for name in full_cov.row_names if name not in in_blocks]
+        if len(names) > 0:
+            yield pyemu.Cov(
+                x=np.atleast_2d(np.array([full_cov_dict[name] for name in names])).T,
+                names=names,
+                isdiagonal=True,
+            )
 
 
 def _rmse(v1, v2):
@@ -962,15 +1028,19 @@ def pst_from_parnames_obsnames(
     )
 
 
-def read_pestpp_runstorage(filename, irun=0, with_metadata=False):
+def read_pestpp_runstorage(filename, irun=0, with_metadata=False, completed_only=False):
     """read pars and obs from a specific run in a pest++ serialized
     run storage file into dataframes.
 
     Args:
         filename (`str`): the name of the run storage file
         irun (`int`): the run id to process. If 'all', then all runs are
-            read. Default is 0
+            read.  A sequence of run ids can also be passed to read just those
+            runs. Default is 0
         with_metadata (`bool`): flag to return run stats and info txt as well
+        completed_only (`bool`): flag to only return runs that completed
+            successfully.  Only used when `irun` is 'all' or a sequence of
+            run ids.  Default is False
 
     Returns:
         tuple containing
@@ -979,120 +1049,107 @@ def read_pestpp_runstorage(filename, irun=0, with_metadata=False):
         - **pandas.DataFrame**: observation information
         - **pandas.DataFrame**: optionally run status and info txt.
 
-    """
+    Note:
+        When reading more than one run, the returned dataframes are indexed
+        by run id and have one column per parameter/observation.  The run
+        records are memory-mapped, so only the selected runs are read from
+        the file.
 
-    header_dtype = np.dtype(
-        [
-            ("n_runs", np.int64),
-            ("run_size", np.int64),
-            ("p_name_size", np.int64),
-            ("o_name_size", np.int64),
-        ]
-    )
+    Example::
 
-    try:
-        irun = int(irun)
-    except:
-        if irun.lower() == "all":
-            irun = irun.lower()
-        else:
+        par_df, obs_df = pyemu.helpers.read_pestpp_runstorage("pest.rns", irun="all",
+                                                              completed_only=True)
+
+    """
+
+    multiple = False
+    if isinstance(irun, str):
+        if irun.lower() != "all":
+            raise Exception(
+                "unrecognized 'irun': should be int or 'all', not '{0}'".format(irun)
+            )
+        multiple = True
+    elif np.ndim(irun) > 0:
+        multiple = True
+    else:
+        try:
+            irun = int(irun)
+        except:
             raise Exception(
                 "unrecognized 'irun': should be int or 'all', not '{0}'".format(irun)
             )
 
     def status_str(r_status):
-        if r_status == 0:
-            return "not completed"
-        if r_status == 1:
-            return "completed"
-        if r_status == -100:
-            return "canceled"
-        else:
-            return "failed"
+        return np.select(
+            [r_status == 0, r_status == 1, r_status == -100],
+            ["not completed", "completed", "canceled"],
+            "failed",
+        )
 
-    assert os.path.exists(filename)
-    f = open(filename, "rb")
-    header = np.fromfile(f, dtype=header_dtype, count=1)
-    p_name_size, o_name_size = header["p_name_size"][0], header["o_name_size"][0]
-    par_names = (
-        struct.unpack("{0}s".format(p_name_size), f.read(p_name_size))[0]
-        .strip()
-        .lower()
-        .decode()
-        .split("\0")[:-1]
-    )
-    obs_names = (
-        struct.unpack("{0}s".format(o_name_size), f.read(o_name_size))[0]
-        .strip()
-        .lower()
-        .decode()
-        .split("\0")[:-1]
-    )
-    n_runs, run_size = header["n_runs"][0], header["run_size"][0]
-    run_start = f.tell()
-
-    def _read_run(irun):
-        f.seek(run_start + (irun * run_size))
-        r_status = np.fromfile(f, dtype=np.int8, count=1)
-        info_txt = struct.unpack("41s", f.read(41))[0].strip().lower().decode()
-        par_vals = np.fromfile(f, dtype=np.float64, count=len(par_names) + 1)[1:]
-        obs_vals = np.fromfile(f, dtype=np.float64, count=len(obs_names) + 1)[:-1]
-        par_df = pd.DataFrame({"parnme": par_names, "parval1": par_vals})
-
-        par_df.index = par_df.pop("parnme")
-        obs_df = pd.DataFrame({"obsnme": obs_names, "obsval": obs_vals})
-        obs_df.index = obs_df.pop("obsnme")
-        return r_status, info_txt, par_df, obs_df
-
-    if irun == "all":
-        par_dfs, obs_dfs = [], []
-        r_stats, txts = [], []
-        for irun in range(n_runs):
-            # print(irun)
-            r_status, info_txt, par_df, obs_df = _read_run(irun)
-            par_dfs.append(par_df)
-            obs_dfs.append(obs_df)
-            r_stats.append(r_status)
-            txts.append(info_txt)
-        par_df = pd.concat(par_dfs, axis=1).T
-        par_df.index = np.arange(n_runs)
-        obs_df = pd.concat(obs_dfs, axis=1).T
-        obs_df.index = np.arange(n_runs)
-        meta_data = pd.DataFrame({"r_status": r_stats, "info_txt": txts})
-        meta_data.loc[:, "status"] = meta_data.r_status.apply(status_str)
+    par_names, obs_names, runs = _memmap_pestpp_runstorage(filename)
+    n_runs = runs.shape[0]
+
+    if multiple:
+        if isinstance(irun, str):
+            run_ids = np.arange(n_runs)
+        else:
+            run_ids = np.asarray(irun, dtype=np.int64).ravel()
+            if run_ids.shape[0] > 0 and (run_ids.min() < 0 or run_ids.max() >= n_runs):
+                raise Exception(
+                    "'irun' values must be between 0 and {0}".format(n_runs - 1)
+                )
+        # filter on the status field before touching the par and obs blocks
+        r_stats = runs["r_status"][run_ids]
+        if completed_only:
+            keep = r_stats == 1
+            run_ids, r_stats = run_ids[keep], r_stats[keep]
+        par_df = pd.DataFrame(runs["par"][run_ids], index=run_ids, columns=par_names)
+        obs_df = pd.DataFrame(runs["obs"][run_ids], index=run_ids, columns=obs_names)
+        txts = [t.strip().lower().decode() for t in runs["info_txt"][run_ids]]
+        meta_data = pd.DataFrame({"r_status": r_stats, "info_txt": txts}, index=run_ids)
 
     else:
-        assert irun <= n_runs
-        r_status, info_txt, par_df, obs_df = _read_run(irun)
-        meta_data = pd.DataFrame({"r_status": [r_status], "info_txt": [info_txt]})
-        meta_data.loc[:, "status"] = meta_data.r_status.apply(status_str)
-    f.close()
+        if irun < 0 or irun >= n_runs:
+            raise Exception(
+                "'irun' {0} out of range, file has {1} runs".format(irun, n_runs)
+            )
+        run = runs[irun]
+        par_df = pd.DataFrame(
+            {"parval1": np.array(run["par"])}, index=pd.Index(par_names, name="parnme")
+        )
+        obs_df = pd.DataFrame(
+            {"obsval": np.array(run["obs"])}, index=pd.Index(obs_names, name="obsnme")
+        )
+        meta_data = pd.DataFrame(
+            {
+                "r_status": [run["r_status"]],
+                "info_txt": [run["info_txt"].strip().lower().decode()],
+            }
+        )
+    meta_data.loc[:, "status"] = status_str(meta_data.r_status.values)
+    del runs
     if with_metadata:
         return par_df, obs_df, meta_data
     else:
         return par_df, obs_df
 
 
-def jco_from_pestpp_runstorage(rnj_filename, pst_filename):
-    """read pars and obs from a pest++ serialized run storage
-    file (e.g., .rnj) and return jacobian matrix instance
+def _memmap_pestpp_runstorage(filename):
+    """memory-map the run records of a pest++ serialized run storage file
 
     Args:
-        rnj_filename (`str`): the name of the run storage file
-        pst_filename (`str`): the name of the pst file
-
-    Note:
-        This can then be passed to Jco.to_binary or Jco.to_coo, etc., to write jco
-        file in a subsequent step to avoid memory resource issues associated
-        with very large problems.
-
+        filename (`str`): the name of the run storage file
 
     Returns:
-        `pyemu.Jco`: a jacobian matrix constructed from the run results and
-        pest control file information.
+        tuple containing
 
-    """
+        - **[`str`]**: parameter names
+        - **[`str`]**: observation names
+        - **numpy.memmap**: structured array of runs with fields "r_status",
+          "info_txt", "par" and "obs".  The "par" and "obs" fields are 2-D
+          views of shape (n_runs, npar) and (n_runs, nobs).
 
+    """
     header_dtype = np.dtype(
         [
             ("n_runs", np.int64),
@@ -1101,58 +1158,168 @@ def jco_from_pestpp_runstorage(rnj_filename, pst_filename):
             ("o_name_size", np.int64),
         ]
     )
+    assert os.path.exists(filename)
+    with open(filename, "rb") as f:
+        header = np.fromfile(f, dtype=header_dtype, count=1)
+        p_name_size, o_name_size = header["p_name_size"][0], header["o_name_size"][0]
+        par_names = f.read(p_name_size).strip().lower().decode().split("\0")[:-1]
+        obs_names = f.read(o_name_size).strip().lower().decode().split("\0")[:-1]
+        run_start = f.tell()
+    n_runs, run_size = int(header["n_runs"][0]), int(header["run_size"][0])
+    npar, nobs = len(par_names), len(obs_names)
+    # each run: status, info txt, info value, par values, obs values
+    run_dtype = np.dtype(
+        {
+            "names": ["r_status", "info_txt", "par", "obs"],
+            "formats": [np.int8, "S41", (np.float64, npar), (np.float64, nobs)],
+            "offsets": [0, 1, 50, 50 + (8 * npar)],
+            "itemsize": run_size,
+        }
+    )
+    if n_runs == 0:
+        return par_names, obs_names, np.zeros(0, dtype=run_dtype)
+    runs = np.memmap(
+        filename, dtype=run_dtype, mode="r", offset=run_start, shape=(n_runs,)
+    )
+    return par_names, obs_names, runs
+
+
+def jco_from_pestpp_runstorage(
+    rnj_filename, pst_filename, jco_filename=None, chunk=1000, droptol=None
+):
+    """read pars and obs from a pest++ serialized run storage
+    file (e.g., .rnj) and return jacobian matrix instance
+
+    Args:
+        rnj_filename (`str`): the name of the run storage file
+        pst_filename (`str`): the name of the pst file
+        jco_filename (`str`, optional): a PEST-format binary jacobian file
+            to write the columns to as they are calculated.  If `None`, the
+            jacobian is assembled in memory.  Default is `None`
+        chunk (`int`): number of runs (jacobian columns) to process at once.
+            Default is 1000
+        droptol (`float`, optional): absolute value tolerance to make derivatives
+            smaller than `droptol` zero when writing `jco_filename`. Default is None
+
+    Note:
+        All runs in the run storage file must have completed successfully, otherwise
+        an exception is raised.
+
+        The run storage file is memory-mapped and read in a single pass.  Passing
+        `jco_filename` avoids memory resource issues associated with very large
+        problems since only `chunk` columns are ever held in memory.
+
+
+    Returns:
+        `pyemu.Jco`: a jacobian matrix constructed from the run results and
+        pest control file information.  If `jco_filename` is passed, the
+        returned `Jco` is lazily loaded from `jco_filename`.
+
+    Example::
+
+        jco = pyemu.helpers.jco_from_pestpp_runstorage("pest.rnj","pest.pst",
+                                                        jco_filename="pest.jcb")
+
+    """
 
     pst = pyemu.Pst(pst_filename)
     par = pst.parameter_data
-    log_pars = set(par.loc[par.partrans == "log", "parnme"].values)
-    with open(rnj_filename, "rb") as f:
-        header = np.fromfile(f, dtype=header_dtype, count=1)
-
-    try:
-        base_par, base_obs = read_pestpp_runstorage(rnj_filename, irun=0)
-    except:
+    par_names, obs_names, runs = _memmap_pestpp_runstorage(rnj_filename)
+    n_runs = runs.shape[0]
+    if n_runs < 1:
         raise Exception("couldn't get base run...")
-    par = par.loc[base_par.index, :]
-    li = base_par.index.map(lambda x: par.loc[x, "partrans"] == "log")
-    base_par.loc[li] = base_par.loc[li].apply(np.log10)
-    jco_cols = {}
-    for irun in range(1, int(header["n_runs"])):
-        par_df, obs_df = read_pestpp_runstorage(rnj_filename, irun=irun)
-        par_df.loc[li] = par_df.loc[li].apply(np.log10)
-        obs_diff = base_obs - obs_df
-        par_diff = base_par - par_df
-        # check only one non-zero element per col(par)
-        if len(par_diff[par_diff.parval1 != 0]) > 1:
-            raise Exception(
-                "more than one par diff - looks like the file wasn't created during jco filling..."
-            )
-        parnme = par_diff[par_diff.parval1 != 0].index[0]
-        parval = par_diff.parval1.loc[parnme]
-
-        # derivatives
-        jco_col = obs_diff / parval
-        # some tracking, checks
-        print("processing par {0}: {1}...".format(irun, parnme))
-        print(
-            "%nzsens: {0}%...".format(
-                (jco_col[abs(jco_col.obsval) > 1e-8].shape[0] / jco_col.shape[0])
-                * 100.0
-            )
-        )
+    nobs, ncol = len(obs_names), n_runs - 1
+    log_idx = (par.loc[par_names, "partrans"] == "log").values
 
-        jco_cols[parnme] = jco_col.obsval
-
-    jco_cols = pd.DataFrame.from_records(
-        data=jco_cols, index=list(obs_diff.index.values)
-    )
+    # failed runs would give garbage derivatives
+    not_complete = np.flatnonzero(runs["r_status"] != 1)
+    if not_complete.shape[0] > 0:
+        raise Exception(
+            "runs not completed: {0}".format(",".join([str(i) for i in not_complete]))
+        )
 
-    jco_cols = pyemu.Jco.from_dataframe(jco_cols)
+    base_par = np.array(runs["par"][0])
+    base_par[log_idx] = np.log10(base_par[log_idx])
+    base_obs = np.array(runs["obs"][0])
 
-    # write # memory considerations important here for very large matrices - break into chunks...
-    # jco_fnam = "{0}".format(filename[:-4]+".jco")
-    # jco_cols.to_binary(filename=jco_fnam, droptol=None, chunk=None)
+    if jco_filename is None:
+        x = np.zeros((nobs, ncol))
+    else:
+        f = open(jco_filename, "wb")
+        # placeholder header, nnz is patched at the end
+        header = np.array((-ncol, -nobs, 0), dtype=pyemu.Matrix.binary_header_dt)
+        header.tofile(f)
+        nnz = 0
+    jco_par_names, jco_par_set = [], set()
+    try:
+        for start in range(1, n_runs, chunk):
+            end = min(n_runs, start + chunk)
+            print("processing runs {0} to {1} of {2}...".format(start, end - 1, ncol))
+            block = runs[start:end]
+            par_vals = np.array(block["par"])
+            par_vals[:, log_idx] = np.log10(par_vals[:, log_idx])
+            par_diff = base_par - par_vals
+            # check only one non-zero element per run(par)
+            nz_count = (par_diff != 0.0).sum(axis=1)
+            if np.any(nz_count > 1):
+                raise Exception(
+                    "more than one par diff - looks like the file wasn't created during jco filling..."
+                )
+            if np.any(nz_count == 0):
+                raise Exception(
+                    "no par diff for run {0}".format(
+                        start + np.where(nz_count == 0)[0][0]
+                    )
+                )
+            ipar = np.argmax(par_diff != 0.0, axis=1)
+            parval = par_diff[np.arange(ipar.shape[0]), ipar]
+            for i in ipar:
+                if par_names[i] in jco_par_set:
+                    raise Exception(
+                        "par '{0}' was perturbed in more than one run".format(
+                            par_names[i]
+                        )
+                    )
+                jco_par_set.add(par_names[i])
+                jco_par_names.append(par_names[i])
 
-    return jco_cols
+            # derivatives, one column per run
+            jco_block = (base_obs[:, None] - block["obs"].T) / parval[None, :]
+            print(
+                "%nzsens: {0}%...".format(
+                    (np.abs(jco_block) > 1e-8).sum() / float(jco_block.size) * 100.0
+                )
+            )
+            if jco_filename is None:
+                x[:, start - 1 : end - 1] = jco_block
+                continue
+            if droptol is not None:
+                jco_block[np.abs(jco_block) < droptol] = 0.0
+            # column-major order, same as PEST
+            col_idxs, row_idxs = np.nonzero(jco_block.T)
+            icount = row_idxs + 1 + (col_idxs + start - 1).astype(np.int64) * nobs
+            pyemu.Matrix._pack_records(
+                pyemu.Matrix.binary_rec_dt, [icount, jco_block[row_idxs, col_idxs]]
+            ).tofile(f)
+            nnz += row_idxs.shape[0]
+    except Exception:
+        # don't leave a truncated jco file behind
+        if jco_filename is not None:
+            f.close()
+            os.remove(jco_filename)
+        raise
+    del runs
+
+    if jco_filename is None:
+        return pyemu.Jco(x=x, row_names=obs_names, col_names=jco_par_names)
+    pyemu.Matrix._encode_name_table(
+        jco_par_names, obs_names, pyemu.Matrix.par_length, pyemu.Matrix.obs_length
+    ).tofile(f)
+    header["icount"] = nnz
+    f.seek(0)
+    header.tofile(f)
+    f.close()
+    return pyemu.Jco.from_binary(jco_filename, lazy=True)
 
 
 def parse_dir_for_io_files(d, prepend_path=False):
@@ -3578,6 +3745,9 @@ def apply_list_and_array_pars(arr_par_file="mult2model_info.csv", chunk_len=50):
         PstFrom during a forward run
 
         Should be added to the forward_run.py script
+
+        The array multipliers are applied with the shared executor - see
+        `pyemu.os_utils.set_executor()`
     """
     df = pd.read_csv(arr_par_file, index_col=0)
     arr_pars = df.loc[df.index_cols.isna()].copy()
@@ -3599,6 +3769,7 @@ def _process_chunk_fac2real(chunk, i):
 
 
 def _process_chunk_model_files(chunk, i, df):
+    df = os_utils._get_shared(df)
     for model_file in chunk:
         _process_model_file(model_file, df)
     print("process", i, " processed ", len(chunk), "process_model_file calls")
@@ -3669,11 +3840,14 @@ def apply_array_pars(arr_par="arr_pars.csv", arr_par_file=None, chunk_len=50):
         This function should be added to the forward_run.py script but can
         be called on any correctly formatted csv
 
-        This function using multiprocessing, spawning one process for each
-        model input array (and optionally pp files).  This speeds up
-        execution time considerably but means you need to make sure your
-        forward run script uses the proper multiprocessing idioms for
-        freeze support and main thread handling.
+        This function uses the executor from `pyemu.os_utils.get_executor()`
+        (by default a persistent process pool, started on first use) to
+        process chunks of model input arrays (and optionally pp files).  This
+        speeds up execution time considerably but means you need to make sure
+        your forward run script uses the proper multiprocessing idioms for
+        freeze support and main thread handling.  Use
+        `pyemu.os_utils.set_executor()` to switch to threads or serial
+        execution or to change the number of workers.
 
     """
     if arr_par_file is not None:
@@ -3718,21 +3892,9 @@ def apply_array_pars(arr_par="arr_pars.csv", arr_par_file=None, chunk_len=50):
         remainder = np.array(pp_args)[num_chunk_floor * chunk_len :].tolist()
         chunks = main_chunks + [remainder]
 
-        pool = mp.Pool()
-        x = [
-            pool.apply_async(_process_chunk_fac2real, args=(chunk, i))
-            for i, chunk in enumerate(chunks)
-        ]
-        [xx.get() for xx in x]
-        pool.close()
-        pool.join()
-        # procs = []
-        # for chunk in chunks:
-        #     p = mp.Process(target=_process_chunk_fac2real, args=[chunk])
-        #     p.start()
-        #     procs.append(p)
-        # for p in procs:
-        #     p.join()
+        os_utils._run_tasks(
+            _process_chunk_fac2real, [(chunk, i) for i, chunk in enumerate(chunks)]
+        )
 
         print("finished fac2real", datetime.now())
 
@@ -3747,22 +3909,15 @@ def apply_array_pars(arr_par="arr_pars.csv", arr_par_file=None, chunk_len=50):
     )  # the list of files broken down into chunks
     remainder = uniq[num_chunk_floor * chunk_len :].tolist()  # remaining files
     chunks = main_chunks + [remainder]
-    # procs = []
-    # for chunk in chunks:  # now only spawn processor for each chunk
-    #     p = mp.Process(target=_process_chunk_model_files, args=[chunk, df])
-    #     p.start()
-    #     procs.append(p)
-    # for p in procs:
-    #     r = p.get(False)
-    #     p.join()
-    pool = mp.Pool()
-    x = [
-        pool.apply_async(_process_chunk_model_files, args=(chunk, i, df))
-        for i, chunk in enumerate(chunks)
-    ]
-    [xx.get() for xx in x]
-    pool.close()
-    pool.join()
+    # the workers read df from shared memory instead of a pickle per chunk
+    shared_df = os_utils._share(df)
+    try:
+        os_utils._run_tasks(
+            _process_chunk_model_files,
+            [(chunk, i, shared_df) for i, chunk in enumerate(chunks)],
+        )
+    finally:
+        os_utils._unshare(shared_df)
     print("finished arr mlt", datetime.now())
 
 
@@ -6,10 +6,22 @@ import platform
 import shutil
 import subprocess as sp
 import multiprocessing as mp
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+try:
+    from concurrent.futures import BrokenExecutor
+except ImportError:
+    from concurrent.futures.process import BrokenProcessPool as BrokenExecutor
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    # python < 3.8 - tables are pickled to the workers instead
+    shared_memory = None
 import warnings
 import socket
 import time
 from datetime import datetime
+import numpy as np
 import pandas as pd
 from ..pyemu_warnings import PyemuWarning
 
@@ -360,3 +372,284 @@ def start_workers(
                         "unable to remove slavr dir{0}:{1}".format(d, str(e)),
                         PyemuWarning,
                     )
+
+
+# settings for the executor shared by the forward-run helpers - see set_executor()
+_executor_config = {"mode": "processes", "num_workers": None}
+_executor = None
+# shared tables already loaded by this (worker) process, keyed on segment name
+_shared_cache = {}
+
+
+def set_executor(mode="processes", num_workers=None):
+    """configure the executor used by the pyemu forward-run helpers
+    (`pst_utils.write_input_files()`, `helpers.apply_array_pars()` and
+    `helpers.apply_list_and_array_pars()`) and by
+    `geostats.OrdinaryKrige.calc_factors()` when `num_threads` > 1
+
+    Args:
+        mode (`str`): how to run the work: "processes", "threads" or "serial".
+            Default is "processes"
+        num_workers (`int`): the number of workers.  If None, the number of
+            cpus is used.  Default is None
+
+    Note:
+        The executor is started the first time it is needed and then reused,
+        so the cost of starting worker processes is only paid once per python
+        session instead of once per call.  Calling this function shuts down
+        any running executor.
+
+        In "processes" mode, large read-only tables (e.g. the parameter values
+        or the multiplier information) are passed to the workers through
+        shared memory instead of being pickled for every chunk.
+
+    Example::
+
+        pyemu.os_utils.set_executor("threads", num_workers=8)
+        pyemu.helpers.apply_list_and_array_pars()
+
+    """
+    mode = mode.lower()
+    if mode not in ["processes", "threads", "serial"]:
+        raise Exception(
+            "set_executor(): 'mode' must be 'processes', 'threads' or 'serial', "
+            + "not '{0}'".format(mode)
+        )
+    if num_workers is not None:
+        num_workers = int(num_workers)
+        if num_workers < 1:
+            raise Exception("set_executor(): 'num_workers' must be > 0")
+    shutdown_executor()
+    _executor_config["mode"] = mode
+    _executor_config["num_workers"] = num_workers
+
+
+def get_executor():
+    """get the executor used by the pyemu forward-run helpers, starting it if
+    needed.
+
+    Returns:
+        `concurrent.futures.Executor`: the shared executor
+
+    Note:
+        see `set_executor()` for configuration
+
+    """
+    global _executor
+    if _executor is None:
+        mode, num_workers = _executor_config["mode"], _executor_config["num_workers"]
+        if mode == "processes":
+            _executor = ProcessPoolExecutor(max_workers=num_workers)
+        elif mode == "threads":
+            _executor = ThreadPoolExecutor(max_workers=num_workers)
+        else:
+            _executor = _SerialExecutor()
+    return _executor
+
+
+def shutdown_executor(wait=True):
+    """shut down the executor used by the pyemu forward-run helpers.  It is
+    restarted the next time it is needed.
+
+    Args:
+        wait (`bool`): flag to wait for running work to finish.  Default is True
+
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=wait)
+        _executor = None
+
+
+class _SerialExecutor(Executor):
+    """an executor that runs the work in the calling thread"""
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+def _run_in_dir(cwd, func, args):
+    """run `func(*args)` in `cwd` - persistent worker processes don't follow
+    the parent's working directory"""
+    if os.getcwd() != cwd:
+        os.chdir(cwd)
+    return func(*args)
+
+
+def _run_tasks(func, tasks):
+    """run `func(*args)` for each tuple of args in `tasks` on the shared
+    executor and return the results in order"""
+    executor = get_executor()
+    try:
+        if isinstance(executor, ProcessPoolExecutor):
+            cwd = os.getcwd()
+            futures = [executor.submit(_run_in_dir, cwd, func, args) for args in tasks]
+        else:
+            futures = [executor.submit(func, *args) for args in tasks]
+        return [f.result() for f in futures]
+    except BrokenExecutor:
+        # a worker died - start fresh next time
+        shutdown_executor(wait=False)
+        raise
+
+
+def _share(data):
+    """make a read-only `pandas.DataFrame`, `pandas.Series` or numeric
+    `numpy.ndarray` available to the executor workers.  In "processes" mode
+    the data are copied into shared memory once and a small handle is
+    returned, otherwise `data` is returned as is.  Pass the result to
+    `_unshare()` when done."""
+    if shared_memory is None or not isinstance(get_executor(), ProcessPoolExecutor):
+        return data
+    if isinstance(data, np.ndarray):
+        if data.dtype.kind not in "biufc":
+            return data
+        return _SharedArray(data)
+    try:
+        return _SharedFrame(data)
+    except TypeError:
+        # columns that can't be stored as fixed width strings
+        return data
+
+
+def _unshare(shared):
+    """release shared memory created by `_share()`"""
+    if isinstance(shared, (_SharedFrame, _SharedArray)):
+        shared.unlink()
+
+
+def _get_shared(shared):
+    """get the data behind a `_share()` result, loading (and caching) it from
+    shared memory if needed"""
+    if not isinstance(shared, (_SharedFrame, _SharedArray)):
+        return shared
+    if shared.name not in _shared_cache:
+        # only the current table is needed
+        _shared_cache.clear()
+        _shared_cache[shared.name] = shared.load()
+    return _shared_cache[shared.name]
+
+
+class _SharedFrame(object):
+    """picklable handle to a copy of a `pandas.DataFrame` or `pandas.Series`
+    held in a shared memory segment.  Numeric columns are stored as is and
+    string columns as fixed width unicode, with missing values as ''.
+
+    """
+
+    def __init__(self, data):
+        self.is_series = isinstance(data, pd.Series)
+        df = data.to_frame() if self.is_series else data
+        self.series_name = data.name if self.is_series else None
+        self.columns = list(df.columns)
+        self.index_name = df.index.name
+        arrays = [_fixed_width(df.index.values)]
+        arrays.extend([_fixed_width(df.iloc[:, i].values) for i in range(df.shape[1])])
+        self.str_fields = [i for i, a in enumerate(arrays) if a.dtype.kind == "U"]
+        self.dtype = np.dtype(
+            [("f{0}".format(i), a.dtype) for i, a in enumerate(arrays)]
+        )
+        self.nrow = df.shape[0]
+        shm = shared_memory.SharedMemory(
+            create=True, size=max(1, self.dtype.itemsize * self.nrow)
+        )
+        self.name = shm.name
+        rec = np.ndarray((self.nrow,), dtype=self.dtype, buffer=shm.buf)
+        for i, a in enumerate(arrays):
+            rec["f{0}".format(i)] = a
+        del rec
+        self._shm = shm
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_shm"] = None
+        return state
+
+    def load(self):
+        """copy the data out of shared memory"""
+        # pool workers share the parent's resource tracker, so attaching
+        # here doesn't hand ownership of the segment to this process
+        shm = shared_memory.SharedMemory(name=self.name)
+        rec = np.ndarray((self.nrow,), dtype=self.dtype, buffer=shm.buf)
+        arrays = []
+        for i in range(len(self.dtype)):
+            a = rec["f{0}".format(i)].copy()
+            if i in self.str_fields:
+                a = a.astype(object)
+                a[a == ""] = np.NaN
+            arrays.append(a)
+        del rec
+        shm.close()
+        index = pd.Index(arrays[0], name=self.index_name)
+        if self.is_series:
+            return pd.Series(arrays[1], index=index, name=self.series_name)
+        return pd.DataFrame(
+            {c: a for c, a in zip(self.columns, arrays[1:])},
+            index=index,
+            columns=self.columns,
+        )
+
+    def unlink(self):
+        """release the shared memory segment"""
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+
+class _SharedArray(object):
+    """picklable handle to a copy of a numeric `numpy.ndarray` held in a
+    shared memory segment
+
+    """
+
+    def __init__(self, data):
+        data = np.ascontiguousarray(data)
+        self.shape = data.shape
+        self.dtype = data.dtype
+        shm = shared_memory.SharedMemory(create=True, size=max(1, data.nbytes))
+        self.name = shm.name
+        np.ndarray(self.shape, dtype=self.dtype, buffer=shm.buf)[...] = data
+        self._shm = shm
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_shm"] = None
+        return state
+
+    def load(self):
+        """copy the data out of shared memory"""
+        shm = shared_memory.SharedMemory(name=self.name)
+        data = np.ndarray(self.shape, dtype=self.dtype, buffer=shm.buf).copy()
+        shm.close()
+        return data
+
+    def unlink(self):
+        """release the shared memory segment"""
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+
+def _fixed_width(values):
+    """cast an array to a shared-memory friendly dtype: numeric arrays
+    are returned as is, all-string (or missing) object arrays as fixed
+    width unicode"""
+    values = np.asarray(values)
+    if values.dtype.kind in "biufc":
+        return values
+    if values.dtype.kind == "U":
+        return values
+    isnull = pd.isna(values)
+    for v in values[~isnull]:
+        if not isinstance(v, str):
+            raise TypeError("can't share values of type {0}".format(type(v)))
+    out = values.copy()
+    out[isnull] = ""
+    return out.astype(str)